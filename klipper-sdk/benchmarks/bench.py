@@ -0,0 +1,351 @@
+"""
+Micro-benchmarks for the SDK hot paths.
+
+Usage (from the klipper-sdk directory)::
+
+    python benchmarks/bench.py                      # run and print results
+    python benchmarks/bench.py --quick              # smaller sizes, for CI smoke runs
+    python benchmarks/bench.py --save               # record benchmarks/baseline.json
+    python benchmarks/bench.py --check              # fail on regressions vs the baseline
+    python benchmarks/bench.py --check --threshold 0.5 -k prism
+
+Each case reports the best per-operation time over several repeats. With
+``--check`` the run exits non-zero when a case is slower than its baseline
+by more than ``--threshold`` (a fraction, 0.25 = 25%). Baselines are
+machine-specific: record them on the machine that runs the check.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from klipper_sdk.bridge import NeuronalCluster, PrismProtocol  # noqa: E402
+from klipper_sdk.client import KlipperClient  # noqa: E402
+from klipper_sdk.transport import Transport  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+KB = 1024
+MB = 1024 * KB
+
+# (full, quick) parameter sets per benchmark family
+PAYLOAD_SIZES = ([1, KB, 64 * KB, MB, 10 * MB], [1, KB, MB])
+LISTENER_COUNTS = ([10, 100, 1000, 10000], [10, 1000])
+HISTORY_SIZES = ([100, 10000, 100000], [100, 10000])
+REPLY_SIZES = ([1, KB, MB], [1, KB])
+BATCH_SIZES = ([1, 100, 1000], [1, 100])
+CACHED_SIZES = ([1, KB, 64 * KB], [1, KB])
+SPILLED_COUNTS = ([1, 10], [1])
+
+
+@dataclass
+class Result:
+    """Timing of one benchmark case."""
+    name: str
+    seconds_per_op: float
+    ops_per_second: float
+    iterations: int
+
+
+@dataclass
+class Regression:
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def slowdown(self) -> float:
+        return self.current / self.baseline - 1
+
+
+# Registry of benchmark families: name -> (params, factory). A factory takes
+# one parameter and returns the operation to time (a zero-argument callable).
+_FAMILIES: List[Tuple[str, Tuple[List[Any], List[Any]], Callable[[Any], Callable[[], Any]]]] = []
+
+
+def benchmark(name: str, params: Tuple[List[Any], List[Any]]):
+    def register(factory):
+        _FAMILIES.append((name, params, factory))
+        return factory
+    return register
+
+
+def _label(value: Any) -> str:
+    if isinstance(value, int) and value >= MB and value % MB == 0:
+        return f"{value // MB}MB"
+    if isinstance(value, int) and value >= KB and value % KB == 0:
+        return f"{value // KB}KB"
+    return str(value)
+
+
+def cases(quick: bool = False, pattern: Optional[str] = None) -> Iterator[Tuple[str, Callable[[], Callable[[], Any]]]]:
+    """Yields ``(case name, setup)`` pairs; ``setup()`` returns the operation to time."""
+    for family, params, factory in _FAMILIES:
+        for param in params[1] if quick else params[0]:
+            name = f"{family}[{_label(param)}]"
+            if pattern and pattern not in name:
+                continue
+            yield name, (lambda factory=factory, param=param: factory(param))
+
+
+# --- BENCHMARKS ---
+
+class _NoopListener:
+    def on_pulse(self, pulse):
+        pass
+
+
+class _StaticTransport(Transport):
+    """Answers every call with a fixed payload, without touching a bus."""
+
+    name = "static"
+
+    def __init__(self, reply: Any):
+        super().__init__(KlipperClient.BUS_NAME, KlipperClient.OBJECT_PATH, KlipperClient.INTERFACE)
+        self.reply = reply
+
+    async def connect(self):
+        pass
+
+    async def call(self, method: str, *args: Any) -> Any:
+        return self.reply
+
+    async def close(self):
+        pass
+
+
+@benchmark("prism.ingest", PAYLOAD_SIZES)
+def bench_prism_ingest(size: int):
+    prism = PrismProtocol(scan_window=KlipperClient.PRISM_SCAN_WINDOW)
+    payload = "x" * size
+    return lambda: prism.integrate(prism.ingest(payload))
+
+
+@benchmark("prism.ingest_cached", CACHED_SIZES)
+def bench_prism_ingest_cached(size: int):
+    prism = PrismProtocol(scan_window=KlipperClient.PRISM_SCAN_WINDOW, cache_size=KlipperClient.PRISM_CACHE_SIZE)
+    payload = "Error: " + "x" * size
+    return lambda: prism.integrate(prism.ingest(payload))
+
+
+@benchmark("cluster.emit", LISTENER_COUNTS)
+def bench_cluster_emit(listeners: int):
+    cluster = NeuronalCluster(node_id="bench")
+    for _ in range(listeners):
+        cluster.subscribe(_NoopListener())
+    return lambda: cluster.emit("payload", vector="clipboard_change")
+
+
+@benchmark("cluster.stream", BATCH_SIZES)
+def bench_cluster_stream(size: int):
+    cluster = NeuronalCluster(node_id="bench")
+    loop = asyncio.new_event_loop()
+    stream = cluster.stream("clipboard_change").map(lambda p: p.payload).filter(bool).batch(size)
+    iterator = stream.__aiter__()
+
+    async def burst():
+        for _ in range(size):
+            cluster.emit("payload", vector="clipboard_change")
+        await iterator.__anext__()
+
+    def op():
+        loop.run_until_complete(burst())
+    op.batch = size
+    return op
+
+
+def _searchable_history(items: int, spilled: int = 0, **options: Any):
+    """A client whose history holds ``items`` URLs (and ``spilled`` 1 MB texts), indexed."""
+    client = KlipperClient(transport=_StaticTransport(""), history_path=":memory:", **options)
+    for i in range(spilled):
+        client.history.record("lorem ipsum dolor sit amet " * (MB // 27) + f" document {i}")
+    for i in range(items):
+        client.history.record(f"clipboard entry {i} https://example.com/item/{i}")
+    loop = asyncio.new_event_loop()
+    # Bring the index up to date outside the timed region
+    loop.run_until_complete(client.history.search("entry"))
+    return client, loop
+
+
+@benchmark("history.search", HISTORY_SIZES)
+def bench_history_search(items: int):
+    """A selective term: one entry matches."""
+    client, loop = _searchable_history(items)
+    query = f"item/{items // 2}"
+    return lambda: loop.run_until_complete(client.history.search(query, limit=10))
+
+
+@benchmark("history.search_common", HISTORY_SIZES)
+def bench_history_search_common(items: int):
+    """A term every entry contains: the newest ten are returned."""
+    client, loop = _searchable_history(items)
+    return lambda: loop.run_until_complete(client.history.search("example", limit=10))
+
+
+@benchmark("history.search_short", HISTORY_SIZES)
+def bench_history_search_short(items: int):
+    """One- and two-character terms, answered without a trigram."""
+    client, loop = _searchable_history(items)
+    return lambda: loop.run_until_complete(client.history.search("m/ 7", limit=10))
+
+
+@benchmark("history.search_spilled", SPILLED_COUNTS)
+def bench_history_search_spilled(spilled: int):
+    """A term nothing contains, over 10000 entries and ``spilled`` texts kept in spill files."""
+    client, loop = _searchable_history(10000, spilled, history_spill_threshold=64 * KB)
+    return lambda: loop.run_until_complete(client.history.search("nowhere", limit=10))
+
+
+@benchmark("history.page", HISTORY_SIZES)
+def bench_history_page(items: int):
+    client = KlipperClient(transport=_StaticTransport(""), history_path=":memory:")
+    for i in range(items):
+        client.history.record(f"clipboard entry {i}")
+    loop = asyncio.new_event_loop()
+    # A page in the middle of the history, as deep infinite scrolling would reach
+    cursor = loop.run_until_complete(client.history.get_page(items // 2)).next_cursor
+    return lambda: loop.run_until_complete(client.history.get_page(50, cursor))
+
+
+@benchmark("client.call", REPLY_SIZES)
+def bench_client_call(size: int):
+    client = KlipperClient(transport=_StaticTransport("x" * size), history_path=":memory:")
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(client.connect())
+    batch = 100
+
+    async def calls():
+        for _ in range(batch):
+            await client._call_dbus_method("getClipboardContents")
+
+    def op():
+        loop.run_until_complete(calls())
+    op.batch = batch
+    return op
+
+
+# --- RUNNER ---
+
+def measure(op: Callable[[], Any], min_time: float = 0.2, repeat: int = 5) -> Tuple[float, int]:
+    """
+    Returns ``(best seconds per op, iterations per repeat)``. The iteration count
+    is calibrated so that one repeat takes at least ``min_time``.
+    """
+    batch = getattr(op, "batch", 1)
+    op()  # warm up caches and lazy state
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        best = min(best, time.perf_counter() - start)
+    return best / (number * batch), number * batch
+
+
+def run(quick: bool = False, pattern: Optional[str] = None, min_time: float = 0.2,
+        repeat: int = 5, report: Optional[Callable[[Result], None]] = None) -> List[Result]:
+    results = []
+    for name, setup in cases(quick, pattern):
+        seconds, iterations = measure(setup(), min_time=min_time, repeat=repeat)
+        result = Result(name, seconds, 1 / seconds if seconds else float("inf"), iterations)
+        if report:
+            report(result)
+        results.append(result)
+    return results
+
+
+def compare(results: List[Result], baseline: Dict[str, float], threshold: float) -> List[Regression]:
+    """Cases slower than their baseline by more than ``threshold`` (a fraction)."""
+    regressions = []
+    for result in results:
+        reference = baseline.get(result.name)
+        if reference and result.seconds_per_op > reference * (1 + threshold):
+            regressions.append(Regression(result.name, reference, result.seconds_per_op))
+    return regressions
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, float]:
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def save_baseline(results: List[Result], path: str = BASELINE_PATH):
+    try:
+        recorded = load_baseline(path)
+    except FileNotFoundError:
+        recorded = {}
+    recorded.update({r.name: r.seconds_per_op for r in results})
+    document = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": dict(sorted(recorded.items())),
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+        f.write("\n")
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Klipper SDK hot-path benchmarks")
+    parser.add_argument("-k", dest="pattern", help="only run cases whose name contains this string")
+    parser.add_argument("--quick", action="store_true", help="smaller parameter sets")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per repeat")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="record results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 on regressions vs the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline) if args.check else {}
+
+    def report(result: Result):
+        if args.json:
+            return
+        line = f"{result.name:<28} {_format_time(result.seconds_per_op):>12}/op {result.ops_per_second:>14,.0f} ops/s"
+        reference = baseline.get(result.name)
+        if reference:
+            line += f"  ({result.seconds_per_op / reference - 1:+.0%} vs baseline)"
+        print(line, flush=True)
+
+    results = run(args.quick, args.pattern, args.min_time, args.repeat, report)
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    if args.save:
+        save_baseline(results, args.baseline)
+    if args.check:
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression.name}: {regression.slowdown:+.0%} "
+                  f"({_format_time(regression.baseline)} -> {_format_time(regression.current)})")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Memory footprint and construction cost of the SDK's per-event objects.
+
+Usage (from the klipper-sdk directory)::
+
+    python benchmarks/footprint.py
+
+Allocates many instances of each type with tracemalloc running and reports
+the retained bytes per instance (including its id string and containers,
+excluding the shared payload), and times construction in a separate untraced pass.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from klipper_sdk.bridge import NeuronalCluster, PrismResult, Pulse, Signal  # noqa: E402
+from klipper_sdk.controllers import HistoryItem  # noqa: E402
+
+COUNT = 100_000
+PAYLOAD = "clipboard payload"
+
+_cluster = NeuronalCluster(node_id="footprint")
+
+FACTORIES: Dict[str, Callable[[], Any]] = {
+    "Pulse": lambda: _cluster._make_pulse(PAYLOAD, "clipboard_change", 0.8),
+    "Signal": lambda: Signal(raw_payload=PAYLOAD, source="bench", timestamp=0.0),
+    "PrismResult": lambda: PrismResult(core_truth=PAYLOAD),
+    "HistoryItem": lambda: HistoryItem(content=PAYLOAD),
+}
+
+
+def footprint(factory: Callable[[], Any], count: int = COUNT) -> Dict[str, float]:
+    """Bytes retained per instance and construction time per instance."""
+    start = time.perf_counter()
+    objects: List[Any] = [factory() for _ in range(count)]
+    elapsed = time.perf_counter() - start
+    del objects
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [factory() for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    # The list holding the objects is not part of their footprint
+    retained -= sys.getsizeof(objects)
+    return {"bytes": retained / count, "seconds": elapsed / count}
+
+
+def main() -> int:
+    print(f"{'type':<14} {'bytes/obj':>10} {'ns/obj':>10}")
+    for name, factory in FACTORIES.items():
+        result = footprint(factory)
+        print(f"{name:<14} {result['bytes']:>10.1f} {result['seconds'] * 1e9:>10.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
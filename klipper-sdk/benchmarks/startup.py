@@ -0,0 +1,157 @@
+"""
+Startup cost of the SDK, as paid by short-lived processes (CLI hooks).
+
+Usage (from the klipper-sdk directory)::
+
+    python benchmarks/startup.py            # median time and module count per stage
+    python benchmarks/startup.py --check    # exit 1 when a stage exceeds its budget
+
+Each stage runs in a fresh interpreter and is timed from inside it, so
+interpreter startup itself is excluded:
+
+- ``import``: ``import klipper_sdk``
+- ``client``: importing ``KlipperClient`` and constructing one
+- ``first_call``: the above, then connecting and reading the clipboard through
+  an in-process fake Klipper
+
+Time budgets are in milliseconds and deliberately loose; scale them for
+slow machines with ``KLIPPER_SDK_STARTUP_BUDGET_SCALE`` (e.g. ``2``). Each
+stage also has a budget for the number of modules loaded (counted with those
+of the interpreter and the probe), which does not depend on machine load, so
+the default test suite checks it.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+STAGES: Dict[str, str] = {
+    "import": "import klipper_sdk",
+    "client": "from klipper_sdk import KlipperClient\nKlipperClient()",
+    "first_call": (
+        "import asyncio\n"
+        "from klipper_sdk import KlipperClient\n"
+        "from klipper_sdk.testing import FakeKlipper, FakeKlipperTransport\n"
+        "async def first_call():\n"
+        "    client = KlipperClient(transport=FakeKlipperTransport(FakeKlipper(clipboard='x')), history_path=':memory:')\n"
+        "    await client.get_clipboard_contents()\n"
+        "    await client.shutdown()\n"
+        "asyncio.run(first_call())"
+    ),
+}
+
+BUDGETS_MS: Dict[str, float] = {
+    "import": 25.0,
+    "client": 300.0,
+    "first_call": 600.0,
+}
+
+# Loaded modules, including the ~60 of the bare interpreter and the probe;
+# asyncio alone adds about 40
+MODULE_BUDGETS: Dict[str, int] = {
+    "import": 80,
+    "client": 220,
+    "first_call": 250,
+}
+
+# Modules a stage must not load: optional backends and components that are
+# only built on first use.
+FORBIDDEN: Dict[str, List[str]] = {
+    "import": ["asyncio", "klipper_sdk.client"],
+    "client": [
+        "dbus", "gi", "sqlite3",
+        "klipper_sdk.bridge", "klipper_sdk.store", "klipper_sdk.controllers", "klipper_sdk.index",
+    ],
+    "first_call": ["dbus", "gi"],
+}
+
+_PROBE = """\
+import time
+_start = time.perf_counter()
+{code}
+_elapsed = time.perf_counter() - _start
+import json, sys
+print(json.dumps({{"seconds": _elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+@dataclass
+class StartupResult:
+    """Median cost of one startup stage."""
+    stage: str
+    milliseconds: float
+    modules: List[str]
+
+    @property
+    def budget(self) -> float:
+        return BUDGETS_MS[self.stage] * float(os.environ.get("KLIPPER_SDK_STARTUP_BUDGET_SCALE", "1"))
+
+    @property
+    def over_budget(self) -> bool:
+        return self.milliseconds > self.budget
+
+    @property
+    def module_budget(self) -> int:
+        return MODULE_BUDGETS[self.stage]
+
+    @property
+    def over_module_budget(self) -> bool:
+        return len(self.modules) > self.module_budget
+
+    @property
+    def forbidden_modules(self) -> List[str]:
+        """Forbidden modules (or their submodules) that the stage loaded."""
+        loaded = set(self.modules)
+        return [name for name in FORBIDDEN[self.stage]
+                if name in loaded or any(m.startswith(name + ".") for m in loaded)]
+
+
+def probe(stage: str) -> Dict:
+    """Runs one stage in a fresh interpreter; returns its timing and ``sys.modules``."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SRC, env.get("PYTHONPATH")]))
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(code=STAGES[stage])],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def measure(stage: str, repeat: int = 5) -> StartupResult:
+    """Median of ``repeat`` fresh-interpreter runs of ``stage``."""
+    runs = [probe(stage) for _ in range(repeat)]
+    seconds = statistics.median(run["seconds"] for run in runs)
+    return StartupResult(stage, seconds * 1000, runs[-1]["modules"])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Klipper SDK startup cost")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="exit 1 when a stage exceeds its budget")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for stage in STAGES:
+        result = measure(stage, args.repeat)
+        problems = []
+        if result.over_budget:
+            problems.append(f"over budget of {result.budget:.0f} ms")
+        if result.over_module_budget:
+            problems.append(f"over budget of {result.module_budget} modules")
+        if result.forbidden_modules:
+            problems.append("loaded " + ", ".join(result.forbidden_modules))
+        failed = failed or bool(problems)
+        print(f"{stage:<12} {result.milliseconds:>8.1f} ms {len(result.modules):>5} modules"
+              + (f"  FAIL: {'; '.join(problems)}" if problems else ""))
+    return 1 if args.check and failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,11 @@
-from .client import KlipperClient
-
 __all__ = ["KlipperClient"]
 __version__ = "0.1.0"
+
+
+def __getattr__(name: str):
+    # KlipperClient (and asyncio, the executor and the transports behind it)
+    # is imported on first access, so `import klipper_sdk` stays cheap.
+    if name == "KlipperClient":
+        from .client import KlipperClient
+        return KlipperClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
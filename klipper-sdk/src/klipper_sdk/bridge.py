@@ -1,21 +1,64 @@
+import asyncio
+import collections
+import heapq
+import inspect
+import itertools
 import logging
-import uuid
+import threading
+import time
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Protocol, Tuple
+from typing import (
+    Any, AsyncIterable, AsyncIterator, Awaitable, Deque, Dict, FrozenSet, Iterable, Iterator,
+    List, Optional, Protocol, Set, Tuple, Union, TYPE_CHECKING,
+)
+
+from .cache import RefractionCache
+from .ids import IdSequence
+from .metrics import (
+    CLUSTER_DELIVERY_SECONDS, CLUSTER_LISTENER_ERRORS, PRISM_ENTROPY, PRISM_INGEST_SECONDS,
+    PRISM_INTEGRATIONS, PRISM_REFRACTIONS, REGISTRY,
+)
+from .refraction import RefractionRule, RuleEngine, default_rules
+
+if TYPE_CHECKING:
+    from .offload import OffloadPool
+    from .streams import PulseStream
 
 # Logger
 logger = logging.getLogger(__name__)
 
 # --- PRISM OF COHERENCE ---
 
-@dataclass
+@dataclass(slots=True)
 class PrismResult:
     """Outcome of a Prism refraction."""
     core_truth: Any
     entropy_wrapper: Optional[Dict[str, Any]] = None
     is_coherent: bool = True
 
+    def copy(self) -> "PrismResult":
+        """A copy whose dicts (wrapper and extracted core truth) are copies too."""
+        core_truth = self.core_truth
+        wrapper = self.entropy_wrapper
+        return PrismResult(
+            dict(core_truth) if type(core_truth) is dict else core_truth,
+            dict(wrapper) if wrapper is not None else None,
+            self.is_coherent,
+        )
+
 @dataclass
+class IntegrationSummary:
+    """Aggregate outcome of integrating a batch of PrismResults."""
+    total: int = 0
+    integrated: int = 0
+    coherent: int = 0
+    entropy: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def rejected(self) -> int:
+        return self.total - self.integrated
+
+@dataclass(slots=True)
 class Signal:
     """Represents a raw input signal to the PRISM_OF_COHERENCE protocol."""
     raw_payload: Any
@@ -33,7 +76,26 @@ class PrismProtocol:
     Operates at Integrity Layer 5D (Cognitive/Orchestrative).
     
     Principle: "The Shadow is not the enemy. It is the Diagnose-Mechanism for missing integrity."
+
+    Refraction is driven by a pluggable rule engine (see ``refraction.py``).
+    ``scan_window`` bounds how many characters of a string the built-in keyword
+    rule inspects; ``register_rule`` adds custom entropy rules.
+
+    With ``cache_size`` results are memoized in a ``cache.RefractionCache``
+    (LRU, optionally expiring after ``cache_ttl`` seconds), so a repeated
+    payload or exception costs a lookup instead of a refraction.
     """
+
+    def __init__(self, rules: Optional[Iterable[RefractionRule]] = None, scan_window: Optional[int] = None,
+                 cache_size: int = 0, cache_ttl: Optional[float] = None):
+        self.rules = RuleEngine(default_rules(scan_window) if rules is None else rules)
+        self.cache: Optional[RefractionCache] = RefractionCache(cache_size, cache_ttl) if cache_size else None
+
+    def register_rule(self, rule: RefractionRule, first: bool = False):
+        """Adds a custom refraction rule (evaluated after the built-in ones unless ``first``)."""
+        self.rules.register(rule, first=first)
+        if self.cache is not None:
+            self.cache.clear()
     
     def ingest(self, signal: Any) -> PrismResult:
         """
@@ -53,19 +115,89 @@ class PrismProtocol:
             if not isinstance(signal, Signal):
                 signal = Signal(raw_payload=signal)
             
-            logger.debug(f"Prism Ingestion: {type(signal.raw_payload).__name__}")
-            return self._refract(signal)
+            if not REGISTRY.enabled:
+                logger.debug("Prism Ingestion: %s", type(signal.raw_payload).__name__)
+                return self._refract(signal)
+
+            payload_type = type(signal.raw_payload).__name__
+            logger.debug("Prism Ingestion: %s", payload_type)
+            start = time.perf_counter()
+            result = self._refract(signal)
+            PRISM_INGEST_SECONDS.observe(payload_type, time.perf_counter() - start)
+            PRISM_REFRACTIONS.inc(payload_type)
+            return result
         except Exception as e:
-            # Even the failure of the Prism is data
-            return PrismResult(
-                core_truth=None,
-                entropy_wrapper={
-                    "error": str(e),
-                    "origin": "PrismInternal",
-                    "stage": "ingestion"
-                },
-                is_coherent=False
-            )
+            return self._internal_failure(e)
+
+    def ingest_many(self, signals: Iterable[Any], batch_size: int = 256) -> Iterator[PrismResult]:
+        """
+        Stage 1 for many signals at once.
+
+        Classifies signals in batches and yields results lazily, in input order.
+        Raw payloads are refracted without being wrapped in ``Signal`` objects,
+        payload types that can only ever be coherent are remembered per batch,
+        and one debug line is logged per batch instead of per signal.
+
+        Args:
+            signals: Raw payloads and/or Signal objects
+            batch_size: Number of signals classified between log lines
+
+        Yields:
+            One PrismResult per input signal
+        """
+        iterator = iter(signals)
+        while True:
+            batch = list(itertools.islice(iterator, batch_size))
+            if not batch:
+                return
+            plain_types: Dict[type, bool] = {}
+            instrumented = REGISTRY.enabled
+            for signal in batch:
+                payload = signal.raw_payload if isinstance(signal, Signal) else signal
+                kind = type(payload)
+                if instrumented:
+                    PRISM_REFRACTIONS.inc(kind.__name__)
+                plain = plain_types.get(kind)
+                if plain is None:
+                    plain = plain_types[kind] = not self.rules.rules_for(kind)
+                if plain:
+                    yield PrismResult(core_truth=payload)
+                    continue
+                try:
+                    yield self._refract_payload(payload)
+                except Exception as e:
+                    yield self._internal_failure(e)
+            logger.debug("Prism Ingestion: batch of %d signals", len(batch))
+
+    async def ingest_stream(self, signals: AsyncIterable[Any], batch_size: int = 256) -> AsyncIterator[PrismResult]:
+        """
+        Stage 1 for an async stream of signals.
+
+        Signals are collected into batches of ``batch_size`` (the last batch may
+        be smaller) and classified with :meth:`ingest_many`; results are yielded
+        lazily, in input order.
+        """
+        batch: List[Any] = []
+        async for signal in signals:
+            batch.append(signal)
+            if len(batch) >= batch_size:
+                for result in self.ingest_many(batch, batch_size):
+                    yield result
+                batch = []
+        for result in self.ingest_many(batch, batch_size):
+            yield result
+
+    def _internal_failure(self, error: Exception) -> PrismResult:
+        # Even the failure of the Prism is data
+        return PrismResult(
+            core_truth=None,
+            entropy_wrapper={
+                "error": str(error),
+                "origin": "PrismInternal",
+                "stage": "ingestion"
+            },
+            is_coherent=False
+        )
 
     def _refract(self, signal: Signal) -> PrismResult:
         """
@@ -80,19 +212,34 @@ class PrismProtocol:
         Returns:
             PrismResult with separated core truth and entropy wrapper
         """
-        payload = signal.raw_payload
-        
-        # Handle Exception signals (high entropy)
-        if isinstance(payload, Exception):
-            return self._process_entropy(payload, f"Exception:{type(payload).__name__}")
-        
-        # Handle error-like signals
-        if isinstance(payload, str) and ("error" in payload.lower() or "exception" in payload.lower()):
-            return self._process_entropy(payload, "StringError")
-        
-        # Handle None or empty signals
-        if payload is None or (isinstance(payload, (str, list, dict)) and not payload):
-            return self._process_entropy(payload, "EmptySignal")
+        return self._refract_payload(signal.raw_payload)
+
+    def _refract_payload(self, payload: Any) -> PrismResult:
+        """Refraction of a bare payload (see :meth:`_refract`), memoized if caching is on."""
+        cache = self.cache
+        if cache is None:
+            return self._classify(payload)
+        key = cache.key(payload)
+        if key is None:
+            return self._classify(payload)
+        result = cache.get(key)
+        if result is not None:
+            if result.entropy_wrapper is not None and REGISTRY.enabled:
+                PRISM_ENTROPY.inc(result.entropy_wrapper["type"])
+            # Every caller gets its own result to change
+            return result.copy()
+        result = self._classify(payload)
+        if result.is_coherent and not isinstance(payload, str):
+            # No keyword scan to save for a coherent non-string; caching it would only pin the payload
+            return result
+        cache.put(key, result.copy())
+        return result
+
+    def _classify(self, payload: Any) -> PrismResult:
+        # Exceptions, error-like strings, None/empty signals and custom rules
+        entropy_type = self.rules.classify(payload)
+        if entropy_type is not None:
+            return self._process_entropy(payload, entropy_type)
         
         # Default: Treat as coherent signal
         return PrismResult(core_truth=payload)
@@ -108,6 +255,9 @@ class PrismProtocol:
         Returns:
             PrismResult with entropy wrapper and potential core truth
         """
+        if REGISTRY.enabled:
+            PRISM_ENTROPY.inc(entropy_type)
+
         entropy_wrapper = {
             "type": entropy_type,
             "payload": str(entropy_payload) if not isinstance(entropy_payload, dict) else entropy_payload,
@@ -175,25 +325,57 @@ class PrismProtocol:
         """
         # Acknowledge entropy (diagnostic logging)
         if prism_result.entropy_wrapper:
-            logger.info(f"Prism Integration: Acknowledging entropy - {prism_result.entropy_wrapper['type']}")
+            logger.info("Prism Integration: Acknowledging entropy - %s", prism_result.entropy_wrapper['type'])
             # Entropy dissipates upon acknowledgment
         
         # Integrate core truth
         if prism_result.core_truth is not None:
-            logger.debug(f"Prism Integration: Integrating core truth - {type(prism_result.core_truth).__name__}")
+            logger.debug("Prism Integration: Integrating core truth - %s", type(prism_result.core_truth).__name__)
             # In a real system, this would update the system model
             # For now, we just log and return success
+            if REGISTRY.enabled:
+                PRISM_INTEGRATIONS.inc("integrated")
             return True
         
+        if REGISTRY.enabled:
+            PRISM_INTEGRATIONS.inc("rejected")
         return False
 
+    def integrate_many(self, prism_results: Iterable[PrismResult]) -> IntegrationSummary:
+        """
+        Stage 3 for many results at once.
+
+        Integrates every result and returns aggregate counts; entropy is
+        acknowledged with a single summary log line instead of one per result.
+        """
+        summary = IntegrationSummary()
+        entropy = summary.entropy
+        for prism_result in prism_results:
+            summary.total += 1
+            wrapper = prism_result.entropy_wrapper
+            if wrapper:
+                entropy_type = wrapper.get("type", wrapper.get("origin", "Unknown"))
+                entropy[entropy_type] = entropy.get(entropy_type, 0) + 1
+            else:
+                summary.coherent += 1
+            if prism_result.core_truth is not None:
+                summary.integrated += 1
+        if entropy:
+            logger.info("Prism Integration: Acknowledging entropy - %s", entropy)
+        if REGISTRY.enabled:
+            if summary.integrated:
+                PRISM_INTEGRATIONS.inc("integrated", summary.integrated)
+            if summary.rejected:
+                PRISM_INTEGRATIONS.inc("rejected", summary.rejected)
+        return summary
+
 
 # --- NEURONAL CLUSTERS ---
 
-@dataclass
+@dataclass(slots=True)
 class Pulse:
     """A signal emitted by a node in the cluster."""
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = field(default_factory=IdSequence())
     payload: Any = None
     vector: str = "broadcast"  # targeted or broadcast
     intensity: float = 1.0     # Importance (0.0 - 1.0)
@@ -201,37 +383,632 @@ class Pulse:
 
 class PulseListener(Protocol):
     def on_pulse(self, pulse: Pulse):
+        """May be a plain method or a coroutine function."""
         ...
 
+@dataclass
+class SchedulerStats:
+    """Counters of a PulseScheduler, keyed by intensity level (rounded to 0.1)."""
+    backlog: int = 0
+    max_backlog: int = 0
+    overloaded: bool = False
+    max_wait: float = 0.0
+    delivered: Dict[float, int] = field(default_factory=dict)
+    shed: Dict[float, int] = field(default_factory=dict)
+
+class PulseScheduler:
+    """
+    Intensity-aware priority scheduling for NeuronalCluster.emit.
+
+    Pulses wait in a backlog ordered by intensity (FIFO within a level) and are
+    dispatched on the running loop in batches, highest intensity first. Load
+    shedding protects high-importance pulses when the node is saturated:
+
+    - Backlog above ``max_backlog``: the lowest-intensity pulse is shed.
+    - Queueing delay above ``max_latency`` seconds: pulses below ``shed_below``
+      are shed (``shed_policy="drop"``) or only one in ``sample_every`` is kept
+      (``shed_policy="sample"``).
+
+    Without a running loop pulses are dispatched inline.
+    """
+
+    SHED_POLICIES = ("drop", "sample")
+
+    def __init__(self, max_backlog: int = 1000, max_latency: Optional[float] = 0.05,
+                 shed_below: float = 0.5, shed_policy: str = "drop", sample_every: int = 10,
+                 batch_size: int = 64):
+        if shed_policy not in self.SHED_POLICIES:
+            raise ValueError(f"Unknown shed policy {shed_policy!r}; choose one of {self.SHED_POLICIES}")
+        self.max_backlog = max_backlog
+        self.max_latency = max_latency
+        self.shed_below = shed_below
+        self.shed_policy = shed_policy
+        self.sample_every = sample_every
+        self.batch_size = batch_size
+        self.cluster: Optional["NeuronalCluster"] = None
+        # The backlog as two heaps over the same pulses: highest intensity (oldest
+        # first) for dispatch, lowest intensity (newest first) for shedding.
+        # Entries leaving one heap stay in the other until popped or compacted;
+        # _live holds the sequence numbers still queued.
+        self._backlog: List[Tuple[float, int, float, Pulse]] = []
+        self._lowest: List[Tuple[float, int]] = []
+        self._live: Set[int] = set()
+        self._seq = 0
+        self._scheduled = False
+        self._samples: Dict[float, int] = {}
+        self._stats = SchedulerStats()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    @property
+    def stats(self) -> SchedulerStats:
+        """A copy of the scheduler counters."""
+        stats = self._stats
+        return SchedulerStats(
+            backlog=len(self._live), max_backlog=stats.max_backlog,
+            overloaded=stats.overloaded, max_wait=stats.max_wait,
+            delivered=dict(stats.delivered), shed=dict(stats.shed),
+        )
+
+    def bind(self, cluster: "NeuronalCluster"):
+        self.cluster = cluster
+
+    def submit(self, pulse: Pulse):
+        """Queues a pulse for prioritized dispatch."""
+        self._seq += 1
+        seq = self._seq
+        live = self._live
+        if len(live) >= self.max_backlog:
+            lowest = self._lowest
+            while -lowest[0][1] not in live:
+                heapq.heappop(lowest)
+            if (pulse.intensity, -seq) < lowest[0]:
+                self._count(self._stats.shed, pulse.intensity)
+                return
+            intensity, negative_seq = heapq.heappop(lowest)
+            live.discard(-negative_seq)
+            self._count(self._stats.shed, intensity)
+        heapq.heappush(self._backlog, (-pulse.intensity, seq, time.monotonic(), pulse))
+        heapq.heappush(self._lowest, (pulse.intensity, -seq))
+        live.add(seq)
+        self._stats.max_backlog = max(self._stats.max_backlog, len(live))
+        self._compact()
+        self._schedule()
+
+    def clear(self):
+        """Drops the backlog."""
+        self._backlog.clear()
+        self._lowest.clear()
+        self._live.clear()
+
+    def _compact(self):
+        """Drops the entries of pulses that left the backlog once they make up most of a heap."""
+        live = self._live
+        slack = 2 * len(live) + self.batch_size
+        if len(self._backlog) > slack:
+            self._backlog = [entry for entry in self._backlog if entry[1] in live]
+            heapq.heapify(self._backlog)
+        if len(self._lowest) > slack:
+            self._lowest = [entry for entry in self._lowest if -entry[1] in live]
+            heapq.heapify(self._lowest)
+
+    def _schedule(self):
+        if self._scheduled:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            while self._live:
+                self._dispatch()
+            return
+        self._scheduled = True
+        loop.call_soon(self._run)
+
+    def _run(self):
+        self._scheduled = False
+        self._dispatch()
+        if self._live:
+            self._schedule()
+
+    def _dispatch(self):
+        """Delivers up to one batch, shedding low-intensity pulses while overloaded."""
+        stats = self._stats
+        backlog, live = self._backlog, self._live
+        now = time.monotonic()
+        taken = 0
+        while taken < self.batch_size and live:
+            negative_intensity, seq, queued_at, pulse = heapq.heappop(backlog)
+            if seq not in live:
+                # Already shed
+                continue
+            live.remove(seq)
+            taken += 1
+            intensity = -negative_intensity
+            wait = now - queued_at
+            stats.max_wait = max(stats.max_wait, wait)
+            stats.overloaded = self.max_latency is not None and wait > self.max_latency
+            if stats.overloaded and intensity < self.shed_below and not self._keep_sample(intensity):
+                self._count(stats.shed, intensity)
+                continue
+            self._count(stats.delivered, intensity)
+            self.cluster._propagate(pulse)
+        self._compact()
+
+    def _keep_sample(self, intensity: float) -> bool:
+        if self.shed_policy != "sample":
+            return False
+        level = round(intensity, 1)
+        self._samples[level] = self._samples.get(level, 0) + 1
+        return self._samples[level] % self.sample_every == 1 % self.sample_every
+
+    @staticmethod
+    def _count(counters: Dict[float, int], intensity: float):
+        level = round(intensity, 1)
+        counters[level] = counters.get(level, 0) + 1
+
+class _Mailbox:
+    """Per-listener ordered delivery queue, consumed by its own task."""
+
+    def __init__(self, cluster: "NeuronalCluster", subscription: "_Subscription", maxsize: int = 0):
+        self.cluster = cluster
+        self.subscription = subscription
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def put(self, pulse: Pulse):
+        if self.task is None:
+            # Raises RuntimeError without a running loop, before any state is kept
+            loop = asyncio.get_running_loop()
+            self.queue = asyncio.Queue(self.maxsize)
+            self.task = loop.create_task(self._run())
+        if self.queue.full():
+            # Bounded mailbox: the oldest undelivered pulse makes room
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.dropped += 1
+        self.queue.put_nowait(pulse)
+
+    async def _run(self):
+        while True:
+            pulse = await self.queue.get()
+            try:
+                result = self.cluster._invoke(self.subscription, pulse)
+                if result is not None:
+                    await result
+            finally:
+                self.queue.task_done()
+
+    async def join(self):
+        if self.queue is not None:
+            await self.queue.join()
+
+    def close(self):
+        if self.task is not None:
+            self.task.cancel()
+        self.queue = None
+        self.task = None
+
+@dataclass
+class _Subscription:
+    listener: PulseListener
+    mailbox: Optional[_Mailbox] = None      # or an offload channel
+    vectors: FrozenSet[str] = frozenset()   # exact vectors; empty with no prefixes = everything
+    prefixes: Tuple[str, ...] = ()          # from wildcard vectors such as "clipboard_*"
+    min_intensity: float = 0.0
+
+    @property
+    def catch_all(self) -> bool:
+        return not self.vectors and not self.prefixes
+
+    def matches(self, vector: str) -> bool:
+        return (
+            self.catch_all
+            or vector in self.vectors
+            or any(vector.startswith(prefix) for prefix in self.prefixes)
+        )
+
+def _make_subscription(listener: Any, vectors: Optional[Union[str, Iterable[str]]],
+                       min_intensity: float = 0.0) -> _Subscription:
+    """Parses vector patterns (exact, ``"prefix*"`` or ``"*"``) into a subscription."""
+    exact, prefixes = set(), []
+    for vector in ([] if vectors is None else [vectors] if isinstance(vectors, str) else vectors):
+        if vector == "*":
+            exact, prefixes = set(), []
+            break
+        if vector.endswith("*"):
+            prefixes.append(vector[:-1])
+        else:
+            exact.add(vector)
+    return _Subscription(
+        listener=listener,
+        vectors=frozenset(exact),
+        prefixes=tuple(prefixes),
+        min_intensity=min_intensity,
+    )
+
 class NeuronalCluster:
     """
     Manages the P2P mesh topology.
-    Currently implements a local Observer pattern as V1 of the Cluster.
-    Future V2: D-Bus Signal bridging.
+    Implements a local Observer pattern; ``ipc.PulseHub`` and
+    ``ipc.PulseSubscriber`` carry pulses to clusters in other processes.
+
+    Listeners may be synchronous or define ``async def on_pulse``. Coroutine
+    listeners are fanned out concurrently (``emit_async`` awaits them all;
+    ``emit`` schedules them on the running loop). Listeners subscribed with
+    ``mailbox=True`` receive pulses strictly in order from their own queue;
+    those subscribed with ``offload=pool`` run in an ``offload.OffloadPool``.
+    ``drain()`` waits until every scheduled delivery has finished.
+
+    Subscriptions may be narrowed to vectors and a minimum intensity. Pulses
+    are routed through a per-vector index of matching subscriptions, so an
+    emit costs O(matching listeners). ``"broadcast"`` pulses reach everyone.
+
+    With a ``PulseScheduler``, ``emit`` queues pulses by intensity and sheds
+    low-intensity ones under load; ``emit_async`` always delivers directly.
     """
+
+    BROADCAST = "broadcast"
+    _ROUTE_CACHE_LIMIT = 1024
     
-    def __init__(self, node_id: str):
+    def __init__(self, node_id: str, scheduler: Optional[PulseScheduler] = None):
         self.node_id = node_id
+        self.scheduler = scheduler
+        if scheduler is not None:
+            scheduler.bind(self)
         self.listeners: List[PulseListener] = []
+        self._subscriptions: List[_Subscription] = []
+        self._routes: Dict[str, List[_Subscription]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._streams: Set["PulseStream"] = set()
+
+    def subscribe(self, listener: PulseListener, vectors: Optional[Iterable[str]] = None,
+                  min_intensity: float = 0.0, mailbox: bool = False, mailbox_size: int = 0,
+                  offload: Optional["OffloadPool"] = None):
+        """
+        Adds a listener to the synaptic gap.
+
+        Args:
+            listener: Object with a (sync or async) ``on_pulse`` method.
+            vectors: Vectors to receive, e.g. ``["clipboard_change"]``. A trailing ``*``
+                matches by prefix (``"clipboard_*"``); ``None`` or ``"*"`` receives all.
+                Broadcast pulses are always delivered.
+            min_intensity: Pulses below this intensity are not delivered.
+            mailbox: Deliver through a per-listener queue, in order, off the emit path.
+            mailbox_size: Bound of that queue (0 = unbounded); the oldest pulse is dropped when full.
+            offload: Run ``on_pulse`` in this process pool (see ``offload.py``). The
+                listener must be picklable; results come back to its ``on_result``.
 
-    def subscribe(self, listener: PulseListener):
-        """Adds a listener to the synaptic gap."""
+        Raises:
+            ValueError: If both ``mailbox`` and ``offload`` are given.
+            TypeError: If an offloaded listener cannot be pickled.
+        """
+        if mailbox and offload is not None:
+            raise ValueError("A listener is either delivered by mailbox or offloaded, not both")
+        subscription = _make_subscription(listener, vectors, min_intensity)
+        if offload is not None:
+            # The pool channel stands in for the mailbox: same put/join/close
+            subscription.mailbox = offload.channel(self, subscription)
+        elif mailbox:
+            subscription.mailbox = _Mailbox(self, subscription, mailbox_size)
+        self._subscriptions.append(subscription)
         self.listeners.append(listener)
+        self._routes.clear()
+
+    def unsubscribe(self, listener: PulseListener):
+        """Removes a listener (and closes its mailbox)."""
+        for subscription in [s for s in self._subscriptions if s.listener is listener]:
+            if subscription.mailbox is not None:
+                subscription.mailbox.close()
+            self._subscriptions.remove(subscription)
+        self.listeners = [l for l in self.listeners if l is not listener]
+        self._streams.discard(listener)
+        self._routes.clear()
+
+    def stream(self, vector: Optional[Union[str, Iterable[str]]] = None, min_intensity: float = 0.0,
+               maxsize: int = 0) -> "PulseStream":
+        """
+        Subscribes an async iterator of pulses (see ``streams.py`` for its operators)::
 
-    def emit(self, payload: Any, vector: str = "broadcast", intensity: float = 1.0):
-        """Fires a Pulse into the cluster."""
-        pulse = Pulse(
+            async for pulse in cluster.stream("clipboard_change").debounce(0.3):
+                ...
+
+        Args:
+            vector: Vector(s) to receive, as for :meth:`subscribe`; ``None`` receives all.
+            min_intensity: Pulses below this intensity are not delivered.
+            maxsize: Bound of the stream's output queue (0 = unbounded); the oldest value is dropped when full.
+        """
+        from .streams import PulseStream
+        stream = PulseStream(self, maxsize=maxsize)
+        self.subscribe(stream, vectors=vector, min_intensity=min_intensity)
+        self._streams.add(stream)
+        return stream
+
+    def deliver(self, pulse: Pulse):
+        """Propagates an existing pulse, e.g. one received from another process, keeping its id and source."""
+        if self.scheduler is not None:
+            self.scheduler.submit(pulse)
+        else:
+            self._propagate(pulse)
+
+    def emit(self, payload: Any, vector: str = "broadcast", intensity: float = 1.0) -> Pulse:
+        """Fires a Pulse into the cluster. Coroutine listeners are scheduled, not awaited."""
+        pulse = self._make_pulse(payload, vector, intensity)
+        if self.scheduler is not None:
+            self.scheduler.submit(pulse)
+        else:
+            self._propagate(pulse)
+        return pulse
+
+    async def emit_async(self, payload: Any, vector: str = "broadcast", intensity: float = 1.0) -> Pulse:
+        """
+        Fires a Pulse and waits for all direct listeners concurrently, so delivery
+        takes as long as the slowest listener rather than the sum of all of them.
+        Mailbox listeners are enqueued; use drain() to wait for them.
+        """
+        pulse = self._make_pulse(payload, vector, intensity)
+        pending = []
+        for subscription in self._route(pulse.vector):
+            if pulse.intensity < subscription.min_intensity:
+                continue
+            if subscription.mailbox is not None:
+                subscription.mailbox.put(pulse)
+                continue
+            result = self._invoke(subscription, pulse)
+            if result is not None:
+                pending.append(result)
+        if pending:
+            await asyncio.gather(*pending)
+        return pulse
+
+    async def drain(self):
+        """Waits until the scheduler backlog, async deliveries and mailboxes are empty."""
+        while True:
+            while self.scheduler is not None and len(self.scheduler):
+                await asyncio.sleep(0)
+            tasks = list(self._tasks)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            for subscription in list(self._subscriptions):
+                if subscription.mailbox is not None:
+                    await subscription.mailbox.join()
+            if not self._tasks and not (self.scheduler is not None and len(self.scheduler)):
+                return
+
+    def close(self):
+        """Cancels outstanding deliveries and mailbox workers, and ends open streams."""
+        for stream in list(self._streams):
+            stream.close()
+        if self.scheduler is not None:
+            self.scheduler.clear()
+        for task in list(self._tasks):
+            task.cancel()
+        for subscription in self._subscriptions:
+            if subscription.mailbox is not None:
+                subscription.mailbox.close()
+
+    def _make_pulse(self, payload: Any, vector: str, intensity: float) -> Pulse:
+        return Pulse(
             payload=payload,
             vector=vector,
             intensity=intensity,
             source_node=self.node_id
         )
-        self._propagate(pulse)
 
     def _propagate(self, pulse: Pulse):
         """Internal propagation loop."""
-        for listener in self.listeners:
+        for subscription in self._route(pulse.vector):
+            if pulse.intensity < subscription.min_intensity:
+                continue
+            if subscription.mailbox is not None:
+                try:
+                    subscription.mailbox.put(pulse)
+                except RuntimeError:
+                    # No running loop: deliver inline instead
+                    self._run_detached(subscription, pulse)
+                continue
+            result = self._invoke(subscription, pulse)
+            if result is not None:
+                self._schedule(result, subscription)
+
+    def _route(self, vector: str) -> List[_Subscription]:
+        """Subscriptions interested in a vector, in subscription order (cached per vector)."""
+        route = self._routes.get(vector)
+        if route is None:
+            if vector == self.BROADCAST:
+                route = list(self._subscriptions)
+            else:
+                route = [s for s in self._subscriptions if s.matches(vector)]
+            if len(self._routes) >= self._ROUTE_CACHE_LIMIT:
+                self._routes.clear()
+            self._routes[vector] = route
+        return route
+
+    def _invoke(self, subscription: _Subscription, pulse: Pulse) -> Optional[Awaitable[None]]:
+        """Calls the listener; returns a guarded awaitable if it is a coroutine listener."""
+        listener = subscription.listener
+        instrumented = REGISTRY.enabled
+        if instrumented:
+            start = time.perf_counter()
+        try:
+            result = listener.on_pulse(pulse)
+        except Exception as e:
+            logger.error("Synapse failure in listener %s: %s", listener, e)
+            if instrumented:
+                CLUSTER_LISTENER_ERRORS.inc(type(listener).__name__)
+            return None
+        if inspect.isawaitable(result):
+            return self._guard(result, listener, start if instrumented else None)
+        if instrumented:
+            CLUSTER_DELIVERY_SECONDS.observe(type(listener).__name__, time.perf_counter() - start)
+        return None
+
+    async def _guard(self, awaitable: Awaitable[Any], listener: PulseListener, start: Optional[float] = None):
+        try:
+            await awaitable
+        except Exception as e:
+            logger.error("Synapse failure in listener %s: %s", listener, e)
+            if start is not None:
+                CLUSTER_LISTENER_ERRORS.inc(type(listener).__name__)
+        else:
+            if start is not None:
+                CLUSTER_DELIVERY_SECONDS.observe(type(listener).__name__, time.perf_counter() - start)
+
+    def _schedule(self, awaitable: Awaitable[None], subscription: _Subscription):
+        try:
+            task = asyncio.get_running_loop().create_task(awaitable)
+        except RuntimeError:
+            awaitable.close()
+            logger.error("Async listener %s needs a running event loop; pulse skipped", subscription.listener)
+            return
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _run_detached(self, subscription: _Subscription, pulse: Pulse):
+        result = self._invoke(subscription, pulse)
+        if result is not None:
+            result.close()
+            logger.error("Async listener %s needs a running event loop; pulse skipped", subscription.listener)
+
+
+# --- PULSE BRIDGE ---
+
+@dataclass
+class BridgeStats:
+    """Counters of a PulseBridge."""
+    submitted: int = 0
+    delivered: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    blocked: int = 0
+    depth: int = 0
+    max_depth: int = 0
+    total_lag: float = 0.0
+    max_lag: float = 0.0
+
+    @property
+    def avg_lag(self) -> float:
+        return self.total_lag / self.delivered if self.delivered else 0.0
+
+
+class PulseBridge:
+    """
+    Moves pulses from foreign threads (e.g. the GLib signal thread) onto the
+    cluster's asyncio loop through a bounded queue.
+
+    Producers never run listeners themselves: ``submit`` enqueues and schedules
+    a single drain on the loop via ``call_soon_threadsafe``. When the queue is
+    full the overflow policy decides:
+
+    - ``"drop_oldest"``: discard the oldest queued pulse.
+    - ``"block"``: wait up to ``block_timeout`` for space, then drop the oldest.
+      Producers on the loop thread itself never block.
+    - ``"coalesce"``: keep only the newest pending pulse per vector (applied on
+      every submit, so copy storms collapse to their latest value).
+
+    Without an attached loop, pulses are emitted inline.
+    """
+
+    OVERFLOW_POLICIES = ("drop_oldest", "block", "coalesce")
+
+    def __init__(self, cluster: "NeuronalCluster", maxsize: int = 1024,
+                 overflow: str = "drop_oldest", block_timeout: float = 1.0):
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow!r}; choose one of {self.OVERFLOW_POLICIES}")
+        self.cluster = cluster
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._queue: Deque[Tuple[Any, str, float, float]] = collections.deque()
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._scheduled = False
+        self._stats = BridgeStats()
+
+    @property
+    def stats(self) -> BridgeStats:
+        """A copy of the bridge counters, including the live queue depth."""
+        with self._lock:
+            self._stats.depth = len(self._queue)
+            return BridgeStats(**vars(self._stats))
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        """Binds the bridge to the loop that owns the cluster. Call from that loop."""
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+
+    def detach(self):
+        """Delivers anything still queued inline and stops bridging."""
+        self._loop = None
+        self._loop_thread = None
+        self._drain()
+
+    def submit(self, payload: Any, vector: str = "broadcast", intensity: float = 1.0) -> bool:
+        """
+        Queues a pulse for delivery on the loop. Safe to call from any thread.
+
+        Returns:
+            False if a queued pulse had to be dropped to make room.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self._stats.submitted += 1
+            self._stats.delivered += 1
+            self.cluster.emit(payload, vector=vector, intensity=intensity)
+            return True
+
+        accepted = True
+        entry = (payload, vector, intensity, time.monotonic())
+        with self._lock:
+            stats = self._stats
+            stats.submitted += 1
+            queue = self._queue
+            if self.overflow == "coalesce":
+                for i, pending in enumerate(queue):
+                    if pending[1] == vector:
+                        del queue[i]
+                        stats.coalesced += 1
+                        break
+            if len(queue) >= self.maxsize and self.overflow == "block" \
+                    and threading.get_ident() != self._loop_thread:
+                stats.blocked += 1
+                self._not_full.wait_for(lambda: len(queue) < self.maxsize, self.block_timeout)
+            if len(queue) >= self.maxsize:
+                queue.popleft()
+                stats.dropped += 1
+                accepted = False
+            queue.append(entry)
+            stats.max_depth = max(stats.max_depth, len(queue))
+            schedule = not self._scheduled
+            self._scheduled = True
+
+        if schedule:
+            if threading.get_ident() == self._loop_thread:
+                loop.call_soon(self._drain)
+            else:
+                loop.call_soon_threadsafe(self._drain)
+        return accepted
+
+    def _drain(self):
+        """Delivers every queued pulse to the cluster (runs on the loop)."""
+        with self._lock:
+            batch = list(self._queue)
+            self._queue.clear()
+            self._scheduled = False
+            self._not_full.notify_all()
+
+        now = time.monotonic()
+        stats = self._stats
+        for payload, vector, intensity, queued_at in batch:
+            lag = now - queued_at
+            stats.total_lag += lag
+            stats.max_lag = max(stats.max_lag, lag)
+            stats.delivered += 1
             try:
-                listener.on_pulse(pulse)
+                self.cluster.emit(payload, vector=vector, intensity=intensity)
             except Exception as e:
-                logger.error(f"Synapse failure in listener {listener}: {e}")
+                logger.error("Pulse bridge delivery failure: %s", e)
@@ -0,0 +1,192 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    """Counters of a ClipboardCache."""
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0
+    refreshes: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ClipboardCache:
+    """
+    Signal-invalidated read-through cache for the current clipboard value.
+
+    The ``clipboardContentChanged`` signal refreshes the cached value and
+    ``setClipboardContents`` writes through to it, so reads are served locally
+    while the signal stream is healthy. ``max_age`` bounds staleness should
+    signals be lost; ``None`` trusts the signal stream indefinitely.
+
+    Refreshes may arrive from the GLib signal thread while the event loop reads.
+    """
+
+    def __init__(self, max_age: Optional[float] = 5.0):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entry: Tuple[Any, float] = (_MISSING, 0.0)
+        self._generation = 0
+        self._stats = CacheStats()
+
+    @property
+    def stats(self) -> CacheStats:
+        """A copy of the hit/miss counters."""
+        return CacheStats(**vars(self._stats))
+
+    @property
+    def generation(self) -> int:
+        """Bumped on every refresh or invalidation; see :meth:`fill`."""
+        return self._generation
+
+    def lookup(self) -> Tuple[bool, Any]:
+        """Returns ``(True, value)`` on a fresh hit, ``(False, None)`` otherwise."""
+        value, stored_at = self._entry
+        if value is _MISSING:
+            self._stats.misses += 1
+            return False, None
+        if self.max_age is not None and time.monotonic() - stored_at > self.max_age:
+            self._stats.stale += 1
+            self._stats.misses += 1
+            return False, None
+        self._stats.hits += 1
+        return True, value
+
+    def refresh(self, value: Any):
+        """Stores a value known to be current (change signal or write-through)."""
+        with self._lock:
+            self._entry = (value, time.monotonic())
+            self._generation += 1
+            self._stats.refreshes += 1
+
+    def fill(self, value: Any, generation: int) -> bool:
+        """
+        Stores a value read from D-Bus, unless a refresh or invalidation happened
+        since ``generation`` was taken (the read may be older than the signal).
+        """
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._entry = (value, time.monotonic())
+            return True
+
+    def invalidate(self):
+        """Drops the cached value."""
+        with self._lock:
+            self._entry = (_MISSING, 0.0)
+            self._generation += 1
+            self._stats.invalidations += 1
+
+
+@dataclass
+class RefractionCacheStats:
+    """Counters of a RefractionCache."""
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    evictions: int = 0
+    uncacheable: int = 0
+    size: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+# Payload types whose refraction depends only on their value
+_VALUE_TYPES = (str, bytes, int, float, bool, type(None))
+
+
+class RefractionCache:
+    """
+    Bounded LRU/TTL memo of Prism refraction results.
+
+    Scalars, strings and bytes are keyed by type and value; exceptions by
+    type and message (so rules must not inspect other exception attributes).
+    Other payloads (dicts, lists, arbitrary objects) are mutable or
+    unhashable and always refracted. Strings and bytes longer than
+    ``max_payload`` are not cached either: past the Prism scan window, hashing
+    them costs about as much as refracting them, and entries would pin them
+    in memory.
+
+    The Prism stores a copy of each result and hands out a copy on every hit,
+    so callers may change the results they get.
+
+    Args:
+        maxsize: Entries kept; the least recently used is evicted beyond that
+        ttl: Seconds an entry stays valid (``None`` = until evicted)
+        max_payload: Longest string/bytes payload cached
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None, max_payload: int = 64 * 1024):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_payload = max_payload
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._stats = RefractionCacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> RefractionCacheStats:
+        """A copy of the counters."""
+        return RefractionCacheStats(**{**vars(self._stats), "size": len(self._entries)})
+
+    def key(self, payload: Any) -> Optional[Hashable]:
+        """The fingerprint of a payload, or ``None`` if it is not cacheable."""
+        kind = type(payload)
+        if kind in _VALUE_TYPES:
+            if kind in (str, bytes) and len(payload) > self.max_payload:
+                self._stats.uncacheable += 1
+                return None
+            return kind, payload
+        if isinstance(payload, BaseException):
+            return kind, str(payload)
+        self._stats.uncacheable += 1
+        return None
+
+    def get(self, key: Hashable) -> Any:
+        """The cached result for ``key``, or ``None``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            result, stored_at = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self._stats.expired += 1
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return result
+
+    def put(self, key: Hashable, result: Any):
+        with self._lock:
+            self._entries[key] = (result, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
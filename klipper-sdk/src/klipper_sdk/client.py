@@ -1,21 +1,23 @@
 import asyncio
-import threading
 import logging
-from typing import Optional, Union, Any, Dict, List
-
-try:
-    import dbus
-    import dbus.mainloop.glib
-except ImportError:
-    dbus = None
+import threading
+import time
+from typing import Optional, Union, Any, Callable, Dict, List, TYPE_CHECKING
 
-try:
-    from gi.repository import GLib
-except ImportError:
-    GLib = None
+from .cache import ClipboardCache
+from .connection import SharedTransport
+from .executor import CallStats, DBusCallExecutor
+from .metrics import DBUS_CALL_ERRORS, DBUS_CALL_SECONDS, DBUS_CIRCUIT_REJECTIONS, REGISTRY, MetricsRegistry
+from .resilience import Backoff, CircuitBreaker, CircuitOpenError
+from .transport import Transport, create_transport
 
-from .bridge import PrismProtocol, NeuronalCluster
-from .controllers import ClipboardController, HistoryManager
+# The bridge layer, the history store (sqlite3) and the controllers (search
+# index) are imported when the client first needs them, keeping
+# `import klipper_sdk` and client construction cheap for short-lived processes.
+if TYPE_CHECKING:
+    from .bridge import PrismProtocol, NeuronalCluster, PulseBridge, PulseScheduler
+    from .controllers import ClipboardController, HistoryManager
+    from .store import HistoryStore
 
 # Logger
 logger = logging.getLogger(__name__)
@@ -31,166 +33,401 @@ class KlipperClient:
     OBJECT_PATH = "/klipper"
     INTERFACE = "org.kde.klipper.klipper"
 
-    def __init__(self, app_id: str = "klipper-sdk"):
+    # Prism keyword rules only scan this many characters of a D-Bus return value,
+    # so classifying a multi-megabyte paste costs the same as a short one.
+    PRISM_SCAN_WINDOW = 64 * 1024
+
+    # Memoized refractions: repeated return values and recurring errors skip the Prism rules
+    PRISM_CACHE_SIZE = 256
+
+    # Same as HistoryStore.SPILL_THRESHOLD, restated so the store module can load lazily
+    HISTORY_SPILL_THRESHOLD = 1024 * 1024
+
+    # Retention of the local history log: the oldest entries beyond this are pruned
+    HISTORY_MAX_ENTRIES = 10000
+
+    def __init__(self, app_id: str = "klipper-sdk", history_path: Optional[str] = None,
+                 history_spill_threshold: Optional[int] = HISTORY_SPILL_THRESHOLD,
+                 history_max_entries: Optional[int] = HISTORY_MAX_ENTRIES,
+                 history_max_age: Optional[float] = None,
+                 transport: Union[str, Transport] = "asyncio",
+                 call_executor: Optional[DBusCallExecutor] = None,
+                 clipboard_cache: Optional[ClipboardCache] = None,
+                 pulse_queue_size: int = 1024,
+                 pulse_overflow: str = "drop_oldest",
+                 pulse_scheduler: Optional["PulseScheduler"] = None,
+                 share_connection: bool = True,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 reconnect_backoff: Optional[Backoff] = None):
         self.app_id = app_id
-        self._loop = asyncio.get_event_loop()
-        self._glib_loop = GLib.MainLoop() if GLib else None
-        self._glib_thread: Optional[threading.Thread] = None
-        self._session_bus: Optional[dbus.SessionBus] = None
-        self._proxy: Optional[dbus.Interface] = None
         self._connected = False
-        
-        # OCS Bridge Layer
-        self.prism = PrismProtocol()
-        self.cluster = NeuronalCluster(node_id=app_id)
-        
-        # Controllers
-        self._clipboard = ClipboardController(self)
-        self._history = HistoryManager(self)
+
+        # Opt-in local cache of the current clipboard value, kept fresh by change signals
+        self.clipboard_cache = clipboard_cache
+
+        # Dedicated, bounded executor for D-Bus calls (in-flight limit, timeouts, queue metrics)
+        self._calls = call_executor or DBusCallExecutor()
+
+        # Per-method circuits fail calls fast while Klipper is unreachable; a background
+        # task reconnects with jittered backoff until a probe call succeeds
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self._backoff = reconnect_backoff or Backoff()
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # D-Bus transport: "asyncio" (native, on the running loop), "glib" (dbus-python) or an instance.
+        # Named backends share one bus connection and signal subscription per process
+        # (per loop for asyncio) unless share_connection is False.
+        if isinstance(transport, str) and share_connection:
+            self._transport = SharedTransport(transport, self.BUS_NAME, self.OBJECT_PATH, self.INTERFACE)
+        else:
+            self._transport = create_transport(transport, self.BUS_NAME, self.OBJECT_PATH, self.INTERFACE)
+        self._transport.on_signal("clipboardContentChanged", self._on_clipboard_changed_signal)
+        self._transport.on_disconnect(self._on_connection_lost)
+        self._transport.executor = self._calls
+
+        # Everything below is built on first access (see _lazy)
+        self._pulse_scheduler = pulse_scheduler
+        self._pulse_queue_size = pulse_queue_size
+        self._pulse_overflow = pulse_overflow
+        self._history_path = history_path
+        self._history_spill_threshold = history_spill_threshold
+        self._history_max_entries = history_max_entries
+        self._history_max_age = history_max_age
+        self._lazy_lock = threading.RLock()
+        self._prism: Optional["PrismProtocol"] = None
+        self._cluster: Optional["NeuronalCluster"] = None
+        self._pulse_bridge: Optional["PulseBridge"] = None
+        self._history_store: Optional["HistoryStore"] = None
+        self._clipboard: Optional["ClipboardController"] = None
+        self._history: Optional["HistoryManager"] = None
+
+    def _lazy(self, attr: str, factory: Callable[[], Any]) -> Any:
+        """Returns ``self.<attr>``, building it with ``factory`` exactly once. Factories may nest."""
+        value = getattr(self, attr)
+        if value is None:
+            with self._lazy_lock:
+                value = getattr(self, attr)
+                if value is None:
+                    value = factory()
+                    setattr(self, attr, value)
+        return value
+
+    # --- OCS Bridge Layer ---
+
+    def _make_prism(self) -> "PrismProtocol":
+        from .bridge import PrismProtocol
+        return PrismProtocol(scan_window=self.PRISM_SCAN_WINDOW, cache_size=self.PRISM_CACHE_SIZE)
+
+    def _make_cluster(self) -> "NeuronalCluster":
+        from .bridge import NeuronalCluster
+        return NeuronalCluster(node_id=self.app_id, scheduler=self._pulse_scheduler)
+
+    def _make_pulse_bridge(self) -> "PulseBridge":
+        from .bridge import PulseBridge
+        # Signal pulses reach the cluster on the owning loop through a bounded queue
+        return PulseBridge(self.cluster, maxsize=self._pulse_queue_size, overflow=self._pulse_overflow)
+
+    def _make_history_store(self) -> "HistoryStore":
+        from .store import HistoryStore, default_history_path
+        # Local history log, fed by clipboardContentChanged and kept across restarts under
+        # $XDG_DATA_HOME unless another path (or ":memory:") is given; payloads above the
+        # spill threshold live in memory-mapped files
+        return HistoryStore(self._history_path or default_history_path(),
+                            spill_threshold=self._history_spill_threshold,
+                            max_entries=self._history_max_entries, max_age=self._history_max_age)
 
     @property
-    def clipboard(self) -> ClipboardController:
+    def prism(self) -> "PrismProtocol":
+        """Classifies every D-Bus reply and failure."""
+        return self._lazy("_prism", self._make_prism)
+
+    @property
+    def cluster(self) -> "NeuronalCluster":
+        """Pulse fan-out to subscribed listeners."""
+        return self._lazy("_cluster", self._make_cluster)
+
+    @property
+    def pulse_bridge(self) -> "PulseBridge":
+        """Bounded queue carrying signal pulses onto the cluster's loop."""
+        return self._lazy("_pulse_bridge", self._make_pulse_bridge)
+
+    @property
+    def history_store(self) -> "HistoryStore":
+        """Local clipboard history log."""
+        return self._lazy("_history_store", self._make_history_store)
+
+    # --- Controllers ---
+
+    def _make_clipboard(self) -> "ClipboardController":
+        from .controllers import ClipboardController
+        return ClipboardController(self)
+
+    def _make_history(self) -> "HistoryManager":
+        from .controllers import HistoryManager
+        return HistoryManager(self)
+
+    @property
+    def clipboard(self) -> "ClipboardController":
         """Access to current clipboard operations."""
-        return self._clipboard
+        return self._lazy("_clipboard", self._make_clipboard)
 
     @property
-    def history(self) -> HistoryManager:
+    def history(self) -> "HistoryManager":
         """Access to history operations."""
-        return self._history
+        return self._lazy("_history", self._make_history)
+
+    @property
+    def transport(self) -> Transport:
+        """The D-Bus transport backing this client."""
+        return self._transport
+
+    @property
+    def metrics(self) -> MetricsRegistry:
+        """The process-wide metrics registry (disabled unless enabled)."""
+        return REGISTRY
+
+    @property
+    def call_stats(self) -> CallStats:
+        """Live queue depth, wait time and latency of D-Bus calls."""
+        return self._calls.stats
 
     async def connect(self):
         """Initializes the D-Bus connection."""
         if self._connected:
             return
 
-        if not dbus or not GLib:
-             logger.warning("D-Bus or GLib not available. Running in offline/mock mode.")
+        if not self._transport.is_available():
+             logger.warning("D-Bus transport '%s' not available. Running in offline/mock mode.", self._transport.name)
              return
 
-        # Setup GLib MainLoop integration for dbus-python
-        dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
-        
+        self._loop = asyncio.get_running_loop()
+        self.pulse_bridge.attach(self._loop)
         try:
-            self._session_bus = dbus.SessionBus()
-            obj = self._session_bus.get_object(self.BUS_NAME, self.OBJECT_PATH)
-            self._proxy = dbus.Interface(obj, self.INTERFACE)
-            
-            # Subscribe to Signals
-            self._proxy.connect_to_signal("clipboardContentChanged", self._on_clipboard_changed_signal)
-            
-            self._connected = True
-            logger.info("Connected to Klipper D-Bus interface.")
-            
-            # Start GLib loop in background thread for signals
-            self._start_background_loop()
-            
-        except dbus.DBusException as e:
+            await self._transport.connect()
+        except ConnectionError as e:
             # Prism: Treat connection failure as high entropy
             self.prism.ingest(e)
-            logger.error(f"Failed to connect to Klipper: {e}")
+            logger.error("Failed to connect to Klipper: %s", e)
             raise ConnectionError(f"Could not connect to Klipper D-Bus service: {e}")
 
-    def _start_background_loop(self):
-        """Starts the GLib MainLoop in a separate thread."""
-        if not self._glib_loop:
-            return
+        self._connected = True
+        logger.info("Connected to Klipper D-Bus interface (%s transport).", self._transport.name)
 
-        def run_loop():
-            logger.debug("Starting GLib MainLoop...")
-            self._glib_loop.run()
-            logger.debug("GLib MainLoop stopped.")
+        await self._seed_history()
 
-        self._glib_thread = threading.Thread(target=run_loop, daemon=True, name="KlipperSDK-GLib")
-        self._glib_thread.start()
+    async def _seed_history(self):
+        """Records the clipboard content present at connect time in the local history."""
+        generation = self.clipboard_cache.generation if self.clipboard_cache is not None else 0
+        try:
+            current = await self._call_dbus_method("getClipboardContents", raw=True)
+        except Exception:
+            return
+        if self.clipboard_cache is not None:
+            self.clipboard_cache.fill(current, generation)
+        if current:
+            self.history_store.append(current)
 
     def _on_clipboard_changed_signal(self, content: str):
         """
         Callback for D-Bus signal 'clipboardContentChanged'.
-        Runs in the GLib thread. Emits a Pulse to the Neuronal Cluster.
+        Runs on the event loop (asyncio transport) or in the GLib thread (glib transport).
+        Emits a Pulse to the Neuronal Cluster.
         """
-        # We bridge this back to the main loop to ensure thread safety for the cluster if needed,
-        # or emit directly if Cluster is thread-safe. Our Cluster V1 is simple list iteration.
+        # The pulse is bridged onto the owning loop, so listeners never run on
+        # (or stall) the D-Bus signal thread.
         try:
+            if self.clipboard_cache is not None:
+                self.clipboard_cache.refresh(content)
+            # The echo of HistoryManager.add_item comes back as a plain string
+            # whatever the added payload was; it is the same clipboard entry
+            if not self.history_store.latest_is_text(content):
+                self.history_store.append(content)
+
             # Emit Pulse: "I sensed a change"
-            self.cluster.emit(
+            self.pulse_bridge.submit(
                 payload=content, 
                 vector="clipboard_change", 
                 intensity=0.8
             )
-            logger.debug("Bridge: Cluster Pulse emitted for clipboard change.")
+            logger.debug("Bridge: Cluster Pulse queued for clipboard change.")
         except Exception as e:
-            logger.error(f"Bridge Signal Error: {e}")
+            logger.error("Bridge Signal Error: %s", e)
 
     async def get_clipboard_contents(self) -> str:
-        """Retrieves the current clipboard content."""
+        """
+        Retrieves the current clipboard content (from the cache when enabled and fresh).
+        The content is returned as Klipper reports it, like the change signal carries it,
+        even when Prism classifies it as entropy (e.g. an empty clipboard).
+        """
+        cache = self.clipboard_cache
+        if cache is not None:
+            hit, value = cache.lookup()
+            if hit:
+                return value
+
         if not self._connected:
             await self.connect()
         
-        if not self._proxy:
+        if not self._connected:
             return ""
 
-        return await self._call_dbus_method("getClipboardContents")
+        if cache is None:
+            return await self._call_dbus_method("getClipboardContents", raw=True)
+
+        generation = cache.generation
+        content = await self._call_dbus_method("getClipboardContents", raw=True)
+        cache.fill(content, generation)
+        return content
 
     async def set_clipboard_contents(self, content: str):
         """Sets the current clipboard content."""
         if not self._connected:
             await self.connect()
             
-        if not self._proxy:
+        if not self._connected:
             return
 
-        await self._call_dbus_method("setClipboardContents", content)
+        try:
+            await self._call_dbus_method("setClipboardContents", content)
+        except Exception:
+            if self.clipboard_cache is not None:
+                self.clipboard_cache.invalidate()
+            raise
+        if self.clipboard_cache is not None:
+            self.clipboard_cache.refresh(content)
 
-    async def get_history(self) -> List[str]:
+    async def get_history(self, limit: Optional[int] = None, offset: int = 0) -> List[str]:
         """
-        Retrieves clipboard history.
+        Retrieves clipboard history, newest first.
+        Served from the local history store; does not touch D-Bus.
         """
-        if not self._connected:
-            await self.connect()
-
-        try:
-           # Hypothetical fallback or real call
-           current = await self.get_clipboard_contents()
-           return [current] if current else []
-        except Exception as e:
-            self.prism.ingest(e)
-            return []
+        return [item.content for item in self.history_store.items(limit=limit, offset=offset)]
 
     async def clear_history(self):
         """Clears the clipboard history."""
         if not self._connected:
             await self.connect()
         
-        if not self._proxy:
+        if not self._connected:
             return
 
         await self._call_dbus_method("clearClipboardHistory")
+        if self.clipboard_cache is not None:
+            self.clipboard_cache.invalidate()
+
+    async def _call_dbus_method(self, method_name: str, *args, raw: bool = False):
+        """
+        Executes a D-Bus method call through the transport. Wraps result in Prism.
 
-    async def _call_dbus_method(self, method_name: str, *args):
-        """Executes a D-Bus method call in an executor. Wraps result in Prism."""
-        if not self._proxy:
+        Args:
+            raw: Return the reply itself instead of Prism's core truth (it is refracted either way)
+
+        Raises:
+            CircuitOpenError: Without calling, while the method's circuit is open.
+        """
+        if not self._connected:
             raise ConnectionError("Not connected to Klipper")
-            
-        method = getattr(self._proxy, method_name)
-        
+
+        breaker = self.circuit_breaker
+        try:
+            breaker.before_call(method_name)
+        except CircuitOpenError:
+            if REGISTRY.enabled:
+                DBUS_CIRCUIT_REJECTIONS.inc(method_name)
+            raise
+
+        instrumented = REGISTRY.enabled
+        if instrumented:
+            start = time.perf_counter()
         try:
-            # Run synchronous D-Bus call in default executor
-            result = await self._loop.run_in_executor(None, method, *args)
+            result = await self._calls.run(self._transport.call, method_name, *args)
+            if instrumented:
+                DBUS_CALL_SECONDS.observe(method_name, time.perf_counter() - start)
             
+            breaker.record_success(method_name)
+
             # Prism Ingest: Coherent Code
             prism_result = self.prism.ingest(result)
             self.prism.integrate(prism_result)
-            return prism_result.core_truth
+            return result if raw else prism_result.core_truth
             
         except Exception as e:
+            if instrumented:
+                DBUS_CALL_SECONDS.observe(method_name, time.perf_counter() - start)
+                DBUS_CALL_ERRORS.inc(method_name)
             # Prism Ingest: Entropy/Shadow
             prism_result = self.prism.ingest(e)
             self.prism.integrate(prism_result)
-            logger.warning(f"Prism Refraction: {prism_result.entropy_wrapper}")
+            logger.warning("Prism Refraction: %s", prism_result.entropy_wrapper)
+            entropy_type = prism_result.entropy_wrapper["type"] if prism_result.entropy_wrapper else None
+            opened = breaker.record_failure(method_name, entropy_type, e)
+            # An opened circuit or a dropped connection: re-establish it in the background
+            if opened or isinstance(e, ConnectionError):
+                self._schedule_reconnect()
             raise e
+        except BaseException:
+            # Cancelled (or interrupted): no outcome, but a half-open probe must not stay in flight
+            breaker.abandon_call(method_name)
+            raise
+
+    # --- Reconnect ---
+
+    def _on_connection_lost(self, error: Exception):
+        """
+        Transport callback (event loop or GLib thread). Reconnects even when no
+        call notices the loss, e.g. for consumers that only listen to signals.
+        """
+        loop = self._loop
+        if not self._connected or loop is None or loop.is_closed():
+            return
+        logger.warning("Lost the Klipper D-Bus connection: %s", error)
+        loop.call_soon_threadsafe(self._schedule_reconnect)
+
+    def _schedule_reconnect(self):
+        """Starts the background reconnect loop unless it is already running."""
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect_loop())
+
+    async def _reconnect_loop(self):
+        """
+        Re-establishes the connection (proxy and signal subscription) with
+        jittered exponential backoff, until a probe call reaches Klipper.
+        """
+        attempt = 0
+        while self._connected:
+            await asyncio.sleep(self._backoff.delay(attempt))
+            attempt += 1
+            try:
+                await self._transport.reconnect()
+                await self._calls.run(self._transport.call, "getClipboardContents")
+            except Exception as e:
+                logger.debug("Reconnect attempt %d failed: %s", attempt, e)
+                continue
+            # Signals may have been missed while disconnected
+            if self.clipboard_cache is not None:
+                self.clipboard_cache.invalidate()
+            self.circuit_breaker.reset()
+            logger.info("Reconnected to Klipper after %d attempt(s).", attempt)
+            return
 
     async def shutdown(self):
-        """Stops the background loop and cleans up."""
-        if self._glib_loop and self._glib_loop.is_running():
-            self._glib_loop.quit()
+        """Closes the transport (and any background loop) and cleans up."""
+        task, self._reconnect_task = self._reconnect_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._connected:
+            await self._transport.close()
+        # Components that were never used need no teardown
+        if self._pulse_bridge is not None:
+            self._pulse_bridge.detach()
+        if self._cluster is not None:
+            self._cluster.close()
+        self._calls.shutdown()
+        if self.clipboard_cache is not None:
+            self.clipboard_cache.invalidate()
         self._connected = False
@@ -0,0 +1,222 @@
+"""
+Process-wide sharing of D-Bus connections between clients.
+
+Every ``KlipperClient`` created with a named transport gets a
+``SharedTransport``: a lease on a connection kept by the process-wide
+``CONNECTIONS`` manager. Leases with the same backend, remote object and
+signal set share one bus connection, one proxy and one signal subscription;
+each signal is received once and fanned out to every lease. The connection
+is opened by the first lease to connect and closed when the last one closes.
+
+Connections of loop-bound backends (asyncio) are shared per event loop.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Union
+
+from .executor import DBusCallExecutor
+from .transport import Transport, create_transport
+
+logger = logging.getLogger(__name__)
+
+BackendFactory = Callable[[], Transport]
+
+
+@dataclass
+class ConnectionStats:
+    """Snapshot of the connection manager."""
+    connections: int = 0
+    leases: int = 0
+    opened: int = 0
+    closed: int = 0
+
+
+class SharedConnection:
+    """One backend transport and the leases currently using it."""
+
+    def __init__(self, key: Hashable, backend: Transport, members: Tuple[str, ...]):
+        self.key = key
+        self.backend = backend
+        self.leases: List["SharedTransport"] = []
+        self.closing = False
+        # Resolved once the backend is connected; a concurrent future so
+        # leases on other loops (thread-safe backends) can wait on it too
+        self.ready: "concurrent.futures.Future[None]" = concurrent.futures.Future()
+        # Blocking backends run their calls here rather than on the pool of
+        # whichever client happened to connect first
+        backend.executor = DBusCallExecutor()
+        for member in members:
+            backend.on_signal(member, lambda *args, _member=member: self._fan_out(_member, args))
+        backend.on_disconnect(self._lost)
+
+    def _fan_out(self, member: str, args: Tuple[Any, ...]):
+        for lease in list(self.leases):
+            try:
+                lease._dispatch_signal(member, args)
+            except Exception as e:
+                logger.error("Shared signal handler failure for %s: %s", member, e)
+
+    def _lost(self, error: Exception):
+        for lease in list(self.leases):
+            lease._connection_lost(error)
+
+
+class ConnectionManager:
+    """Refcounted registry of shared backend connections."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connections: Dict[Hashable, SharedConnection] = {}
+        self._stats = ConnectionStats()
+
+    @property
+    def stats(self) -> ConnectionStats:
+        with self._lock:
+            return ConnectionStats(
+                connections=len(self._connections),
+                leases=sum(len(c.leases) for c in self._connections.values()),
+                opened=self._stats.opened,
+                closed=self._stats.closed,
+            )
+
+    async def acquire(self, lease: "SharedTransport") -> SharedConnection:
+        """
+        Attaches ``lease`` to the connection for its key, opening it if needed.
+
+        Raises:
+            ConnectionError: If the backend fails to connect. The failed
+                connection is forgotten, so a later acquire retries.
+        """
+        template = lease._backend
+        members = tuple(sorted(lease._signal_handlers))
+        key: Tuple[Hashable, ...] = (template.share_key(), members)
+        if template.loop_bound:
+            key += (asyncio.get_running_loop(),)
+
+        with self._lock:
+            connection = self._connections.get(key)
+            opener = connection is None
+            if opener:
+                # Every connection gets its own backend: one withdrawn by a
+                # reconnect stays open for the leases still using it
+                connection = SharedConnection(key, lease._factory(), members)
+                self._connections[key] = connection
+            connection.leases.append(lease)
+
+        if opener:
+            try:
+                await connection.backend.connect()
+            except BaseException as e:
+                with self._lock:
+                    self._connections.pop(key, None)
+                    connection.leases.remove(lease)
+                    # Never opened, so nothing to close when waiters detach
+                    connection.closing = True
+                connection.ready.set_exception(e)
+                connection.backend.executor.shutdown()
+                raise
+            with self._lock:
+                self._stats.opened += 1
+            connection.ready.set_result(None)
+            logger.debug("Opened shared %s connection", connection.backend.name)
+        else:
+            try:
+                await asyncio.wrap_future(connection.ready)
+            except BaseException:
+                self._detach(connection, lease)
+                raise
+        return connection
+
+    async def release(self, connection: SharedConnection, lease: "SharedTransport", discard: bool = False):
+        """
+        Detaches ``lease``; closes the connection when it was the last one.
+
+        With ``discard`` the connection is also withdrawn from sharing, so the
+        next acquire opens a fresh one while remaining leases finish with it.
+        """
+        if discard:
+            with self._lock:
+                if self._connections.get(connection.key) is connection:
+                    del self._connections[connection.key]
+        if self._detach(connection, lease):
+            await connection.backend.close()
+            connection.backend.executor.shutdown()
+            with self._lock:
+                self._stats.closed += 1
+            logger.debug("Closed shared %s connection", connection.backend.name)
+
+    def _detach(self, connection: SharedConnection, lease: "SharedTransport") -> bool:
+        """Removes the lease; returns True if the connection is now unused."""
+        with self._lock:
+            if lease in connection.leases:
+                connection.leases.remove(lease)
+            if connection.leases or connection.closing:
+                return False
+            connection.closing = True
+            if self._connections.get(connection.key) is connection:
+                del self._connections[connection.key]
+            return True
+
+
+# Process-wide manager used by KlipperClient
+CONNECTIONS = ConnectionManager()
+
+
+class SharedTransport(Transport):
+    """
+    A client's lease on a shared backend connection.
+
+    Args:
+        backend: Backend name (``"asyncio"``, ``"glib"``) or a factory
+            returning a fresh, unconnected Transport for the remote object
+        manager: Connection manager (defaults to the process-wide ``CONNECTIONS``)
+    """
+
+    def __init__(self, backend: Union[str, BackendFactory], bus_name: str, object_path: str, interface: str,
+                 manager: Optional[ConnectionManager] = None):
+        super().__init__(bus_name, object_path, interface)
+        if callable(backend):
+            self._factory: BackendFactory = backend
+        else:
+            self._factory = functools.partial(create_transport, backend, bus_name, object_path, interface)
+        # Never connected: describes the backend (name, availability, share key)
+        self._backend = self._factory()
+        self.name = self._backend.name
+        self.manager = manager or CONNECTIONS
+        self._connection: Optional[SharedConnection] = None
+
+    def is_available(self) -> bool:
+        return self._backend.is_available()
+
+    @property
+    def shared(self) -> bool:
+        """Whether another lease currently uses the same connection."""
+        return self._connection is not None and len(self._connection.leases) > 1
+
+    async def connect(self):
+        if self._connection is None:
+            self._connection = await self.manager.acquire(self)
+
+    async def call(self, method: str, *args: Any) -> Any:
+        connection = self._connection
+        if connection is None:
+            raise ConnectionError("Not connected to Klipper")
+        return await connection.backend.call(method, *args)
+
+    async def close(self):
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            await self.manager.release(connection, self)
+
+    async def reconnect(self):
+        """Leaves a (presumably broken) connection for a fresh shared one."""
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            await self.manager.release(connection, self, discard=True)
+        await self.connect()
+
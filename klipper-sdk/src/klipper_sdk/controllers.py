@@ -1,19 +1,58 @@
-from typing import List, Optional, Any, Union, Dict, TYPE_CHECKING
+from typing import AsyncIterator, List, Optional, Any, Union, Mapping, TYPE_CHECKING
+import asyncio
 from dataclasses import dataclass, field
-import uuid
+from types import MappingProxyType
 import time
 
+from .ids import IdSequence
+from .index import HistoryIndex
+from .mime import is_text_mime, mime_charset
+
 if TYPE_CHECKING:
     from .client import KlipperClient
 
-@dataclass
+# Shared by every HistoryItem created without metadata; pass a dict to attach some
+EMPTY_METADATA: Mapping[str, Any] = MappingProxyType({})
+
+Payload = Union[str, bytes, bytearray, memoryview]
+
+
+def decode_text(data: Payload, mime_type: str = "text/plain") -> str:
+    """
+    Decodes a text payload, honouring a ``charset`` parameter (UTF-8 by default).
+    Buffers are decoded in place, without an intermediate ``bytes`` copy.
+
+    Raises:
+        TypeError: ``mime_type`` is not a text type
+        ValueError: The payload is not valid in the declared charset, or the charset is unknown
+    """
+    if isinstance(data, str):
+        return data
+    if not is_text_mime(mime_type):
+        raise TypeError(f"Klipper's D-Bus interface only carries text, not {mime_type}")
+    charset = mime_charset(mime_type)
+    try:
+        return str(data, charset)
+    except LookupError:
+        raise ValueError(f"Unknown charset {charset!r} in {mime_type}") from None
+
+@dataclass(slots=True)
 class HistoryItem:
-    """Represents a single item in the clipboard history."""
-    content: Union[str, bytes]
-    uuid: str = field(default_factory=lambda: str(uuid.uuid4()))
+    """
+    Represents a single item in the clipboard history.
+    Items of large payloads loaded from the store read their content lazily.
+    """
+    content: Union[str, bytes, memoryview]
+    uuid: str = field(default_factory=IdSequence())
     mime_type: str = "text/plain"
     timestamp: float = field(default_factory=time.time)
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: Mapping[str, Any] = field(default_factory=lambda: EMPTY_METADATA)
+
+@dataclass
+class HistoryPage:
+    """One page of history, newest first, with the cursor of the next page."""
+    items: List[HistoryItem]
+    next_cursor: Optional[str] = None
 
 class ClipboardController:
     """
@@ -24,20 +63,20 @@ class ClipboardController:
         self.client = client
 
     async def get_content(self, mime_type: str = "text/plain") -> Union[str, bytes, None]:
-        """Retrieves current clipboard content."""
-        # TODO: Implement MIME type handling when supported by D-Bus
+        """Retrieves current clipboard content (always text: Klipper's D-Bus interface has no MIME types)."""
         try:
             content = await self.client.get_clipboard_contents()
             return content
         except Exception:
             return None
 
-    async def set_content(self, data: Union[str, bytes], mime_type: str = "text/plain"):
-        """Sets current clipboard content."""
-        # TODO: Implement MIME type handling
-        if isinstance(data, bytes):
-            data = data.decode('utf-8') # Basic fallback
-        await self.client.set_clipboard_contents(data)
+    async def set_content(self, data: Payload, mime_type: str = "text/plain"):
+        """
+        Sets current clipboard content. Binary text payloads are decoded with the
+        charset of ``mime_type``; non-text types raise TypeError, since Klipper's
+        D-Bus interface only accepts strings.
+        """
+        await self.client.set_clipboard_contents(decode_text(data, mime_type))
 
     async def clear(self):
         """Clears the clipboard."""
@@ -50,39 +89,99 @@ class HistoryManager:
     """
     def __init__(self, client: "KlipperClient"):
         self.client = client
+        self._index = HistoryIndex()
+        self._indexed_seq = 0
+        # Entries dropped by the store's retention limits leave the index too
+        client.history_store.on_prune(self._forget)
+
+    async def get_items(self, limit: int = 10, offset: int = 0, cursor: Optional[str] = None) -> List[HistoryItem]:
+        """
+        Retrieves history items with pagination, served from the local history store.
+        With a ``cursor`` (see :meth:`get_page`) the page starts below it and costs the
+        same at any depth; ``offset`` pagination scans the skipped rows.
+        """
+        if cursor is not None:
+            return (await self.get_page(offset + limit, cursor)).items[offset:]
+        return self.client.history_store.items(limit=limit, offset=offset)
+
+    async def get_page(self, limit: int = 10, cursor: Optional[str] = None) -> HistoryPage:
+        """
+        Retrieves one page of history, newest first. Pass ``next_cursor`` back to get
+        the following page; it is None after the last one. Cursors are opaque tokens.
+        """
+        items, next_cursor = self.client.history_store.page(limit, cursor)
+        return HistoryPage(items=items, next_cursor=next_cursor)
 
-    async def get_items(self, limit: int = 10, offset: int = 0) -> List[HistoryItem]:
-        """Retrieves history items with pagination."""
-        raw_history = await self.client.get_history()
-        
-        # Convert raw strings to HistoryItems
-        # In the future, this parsing will be more sophisticated
-        items = []
-        for text in raw_history:
-            items.append(HistoryItem(content=text))
-            
-        # Handle pagination
-        start = offset
-        end = offset + limit
-        return items[start:end]
-
-    async def add_item(self, data: Any, mime_type: str = "text/plain"):
-        """Manually adds an item to history."""
-        # Currently Klipper D-Bus just has setClipboardContents which adds to history implicitly
-        if isinstance(data, bytes):
-            data = data.decode('utf-8')
-        await self.client.set_clipboard_contents(data)
+    async def iter_items(self, page_size: int = 100, cursor: Optional[str] = None) -> AsyncIterator[HistoryItem]:
+        """
+        Streams the history newest first, one store page at a time, yielding to the
+        event loop between pages. Only the current page is held in memory.
+        """
+        while True:
+            page = await self.get_page(page_size, cursor)
+            for item in page.items:
+                yield item
+            if page.next_cursor is None:
+                return
+            cursor = page.next_cursor
+            await asyncio.sleep(0)
+
+    def record(self, data: Payload, mime_type: str = "text/plain") -> HistoryItem:
+        """
+        Records an observed clipboard entry in the local history store.
+        Consecutive duplicates (e.g. our own set followed by Klipper's change signal)
+        are collapsed into the existing entry.
+        """
+        return self.client.history_store.append(data, mime_type)
+
+    async def add_item(self, data: Payload, mime_type: str = "text/plain") -> HistoryItem:
+        """
+        Manually adds an item to history, keeping its MIME type. Buffers are stored
+        without copying. Text is also set as the clipboard content; binary types
+        stay local, as Klipper's D-Bus interface only accepts strings.
+        """
+        item = self.record(data, mime_type)
+        if is_text_mime(mime_type):
+            # Currently Klipper D-Bus just has setClipboardContents which adds to history implicitly
+            await self.client.set_clipboard_contents(decode_text(data, mime_type))
+        return item
+
+    async def bump_item(self, uuid: str) -> Optional[HistoryItem]:
+        """
+        Moves an existing item to the top of the history and, for text, makes it the
+        current clipboard content. Its payload is not stored again. Returns None if unknown.
+        """
+        item = self.client.history_store.bump(uuid)
+        if item is not None and is_text_mime(item.mime_type):
+            await self.client.set_clipboard_contents(decode_text(item.content, item.mime_type))
+        return item
 
     async def remove_item(self, uuid: str):
-        """Removes an item by UUID."""
-        # TODO: Implement when Klipper supports granular removal by ID
-        pass
+        """Removes an item by UUID from the local history (Klipper has no per-item removal over D-Bus)."""
+        self.client.history_store.remove(uuid)
+        self._index.remove(uuid)
+
+    async def search(self, query: str, limit: Optional[int] = None, prefix: bool = False) -> List[HistoryItem]:
+        """
+        Searches history content through the local trigram/token index.
+        All whitespace-separated terms must match; ``prefix=True`` matches word prefixes.
+        """
+        self._sync_index()
+        return self._index.search(query, limit=limit, prefix=prefix)
+
+    def _forget(self, uuids: List[str]):
+        for uuid in uuids:
+            self._index.remove(uuid)
 
-    async def search(self, query: str) -> List[HistoryItem]:
-        """Searches history content."""
-        all_items = await self.get_items(limit=100) # Arbitrary limit for now
-        return [item for item in all_items if query.lower() in str(item.content).lower()]
+    def _sync_index(self):
+        """Catches the search index up with entries appended to the history store."""
+        for seq, digest, item in self.client.history_store.entries_after(self._indexed_seq):
+            # Entries sharing a blob share their indexed text
+            self._index.add(item, content_hash=digest)
+            self._indexed_seq = seq
 
     async def clear_all(self):
         """Clears the entire history."""
         await self.client.clear_history()
+        self.client.history_store.clear()
+        self._index.clear()
@@ -0,0 +1,311 @@
+"""
+Minimal D-Bus wire protocol (marshalling) used by the pure-asyncio transport.
+
+Implements the message header and the type system needed to talk to a
+session bus without dbus-python: all basic types, arrays, dicts, structs
+and variants. Unix file descriptors are not supported.
+"""
+
+import struct
+from dataclasses import dataclass
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+# Message types
+METHOD_CALL = 1
+METHOD_RETURN = 2
+ERROR = 3
+SIGNAL = 4
+
+# Message flags
+NO_REPLY_EXPECTED = 0x1
+
+PROTOCOL_VERSION = 1
+
+# Header field codes
+_FIELD_PATH = 1
+_FIELD_INTERFACE = 2
+_FIELD_MEMBER = 3
+_FIELD_ERROR_NAME = 4
+_FIELD_REPLY_SERIAL = 5
+_FIELD_DESTINATION = 6
+_FIELD_SENDER = 7
+_FIELD_SIGNATURE = 8
+
+_HEADER_FIELDS = (
+    (_FIELD_PATH, "path", "o"),
+    (_FIELD_INTERFACE, "interface", "s"),
+    (_FIELD_MEMBER, "member", "s"),
+    (_FIELD_ERROR_NAME, "error_name", "s"),
+    (_FIELD_REPLY_SERIAL, "reply_serial", "u"),
+    (_FIELD_DESTINATION, "destination", "s"),
+    (_FIELD_SENDER, "sender", "s"),
+    (_FIELD_SIGNATURE, "signature", "g"),
+)
+_FIELDS_BY_CODE = {code: (name, sig) for code, name, sig in _HEADER_FIELDS}
+
+# type code -> (struct format, size/alignment)
+_FIXED = {
+    "y": ("B", 1),
+    "b": ("I", 4),
+    "n": ("h", 2),
+    "q": ("H", 2),
+    "i": ("i", 4),
+    "u": ("I", 4),
+    "x": ("q", 8),
+    "t": ("Q", 8),
+    "d": ("d", 8),
+    "h": ("I", 4),
+}
+_ALIGNMENT = {code: size for code, (_, size) in _FIXED.items()}
+_ALIGNMENT.update({"s": 4, "o": 4, "g": 1, "a": 4, "(": 8, "{": 8, "v": 1})
+
+
+class Variant(NamedTuple):
+    """An explicitly typed value for a ``v`` argument."""
+    signature: str
+    value: Any
+
+
+class ObjectPath(str):
+    """A string that marshals as a D-Bus object path (``o``)."""
+
+
+def split_signature(signature: str) -> List[str]:
+    """Splits a signature into its complete types."""
+    types = []
+    pos = 0
+    while pos < len(signature):
+        end = _complete_type_end(signature, pos)
+        types.append(signature[pos:end])
+        pos = end
+    return types
+
+
+def _complete_type_end(signature: str, pos: int) -> int:
+    code = signature[pos]
+    if code == "a":
+        return _complete_type_end(signature, pos + 1)
+    if code in "({":
+        closing = ")" if code == "(" else "}"
+        depth = 0
+        for end in range(pos, len(signature)):
+            if signature[end] == code:
+                depth += 1
+            elif signature[end] == closing:
+                depth -= 1
+                if depth == 0:
+                    return end + 1
+        raise ValueError(f"Unbalanced signature: {signature!r}")
+    if code in _ALIGNMENT:
+        return pos + 1
+    raise ValueError(f"Unknown type code {code!r} in signature {signature!r}")
+
+
+def signature_of(value: Any) -> str:
+    """Infers a D-Bus signature for a Python value."""
+    if isinstance(value, Variant):
+        return "v"
+    if isinstance(value, bool):
+        return "b"
+    if isinstance(value, int):
+        return "i" if -2**31 <= value < 2**31 else "x"
+    if isinstance(value, float):
+        return "d"
+    if isinstance(value, ObjectPath):
+        return "o"
+    if isinstance(value, str):
+        return "s"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "ay"
+    if isinstance(value, dict):
+        key, val = next(iter(value.items()), ("", ""))
+        return "a{" + signature_of(key) + signature_of(val) + "}"
+    if isinstance(value, list):
+        return "a" + (signature_of(value[0]) if value else "s")
+    if isinstance(value, tuple):
+        return "(" + "".join(signature_of(v) for v in value) + ")"
+    raise TypeError(f"Cannot infer a D-Bus signature for {type(value).__name__}")
+
+
+class _Writer:
+    def __init__(self):
+        self.buf = bytearray()
+
+    def align(self, n: int):
+        self.buf.extend(b"\0" * (-len(self.buf) % n))
+
+    def write(self, signature: str, value: Any):
+        code = signature[0]
+        if code in _FIXED:
+            fmt, size = _FIXED[code]
+            self.align(size)
+            if code == "b":
+                value = 1 if value else 0
+            self.buf += struct.pack("<" + fmt, value)
+        elif code in "so":
+            encoded = value.encode("utf-8")
+            self.align(4)
+            self.buf += struct.pack("<I", len(encoded))
+            self.buf += encoded
+            self.buf.append(0)
+        elif code == "g":
+            encoded = value.encode("ascii")
+            self.buf.append(len(encoded))
+            self.buf += encoded
+            self.buf.append(0)
+        elif code == "a":
+            self._write_array(signature[1:], value)
+        elif code == "(":
+            self.align(8)
+            for sub, item in zip(split_signature(signature[1:-1]), value, strict=True):
+                self.write(sub, item)
+        elif code == "v":
+            if not isinstance(value, Variant):
+                value = Variant(signature_of(value), value)
+            self.write("g", value.signature)
+            self.write(value.signature, value.value)
+        else:
+            raise ValueError(f"Cannot marshal type {signature!r}")
+
+    def _write_array(self, element: str, value: Any):
+        self.align(4)
+        length_pos = len(self.buf)
+        self.buf += b"\0\0\0\0"
+        self.align(_ALIGNMENT[element[0]])
+        start = len(self.buf)
+        if element == "y":
+            self.buf += value
+        elif element[0] == "{":
+            key_sig, value_sig = split_signature(element[1:-1])
+            for key, item in value.items():
+                self.align(8)
+                self.write(key_sig, key)
+                self.write(value_sig, item)
+        else:
+            for item in value:
+                self.write(element, item)
+        struct.pack_into("<I", self.buf, length_pos, len(self.buf) - start)
+
+
+class _Reader:
+    def __init__(self, data: bytes, endian: str, pos: int = 0):
+        self.data = data
+        self.endian = endian
+        self.pos = pos
+
+    def align(self, n: int):
+        self.pos += -self.pos % n
+
+    def read(self, signature: str) -> Any:
+        code = signature[0]
+        if code in _FIXED:
+            fmt, size = _FIXED[code]
+            self.align(size)
+            (value,) = struct.unpack_from(self.endian + fmt, self.data, self.pos)
+            self.pos += size
+            return bool(value) if code == "b" else value
+        if code in "so":
+            self.align(4)
+            (length,) = struct.unpack_from(self.endian + "I", self.data, self.pos)
+            start = self.pos + 4
+            self.pos = start + length + 1
+            return bytes(self.data[start:start + length]).decode("utf-8")
+        if code == "g":
+            length = self.data[self.pos]
+            start = self.pos + 1
+            self.pos = start + length + 1
+            return bytes(self.data[start:start + length]).decode("ascii")
+        if code == "a":
+            return self._read_array(signature[1:])
+        if code == "(":
+            self.align(8)
+            return tuple(self.read(sub) for sub in split_signature(signature[1:-1]))
+        if code == "v":
+            return self.read(self.read("g"))
+        raise ValueError(f"Cannot unmarshal type {signature!r}")
+
+    def _read_array(self, element: str) -> Any:
+        self.align(4)
+        (length,) = struct.unpack_from(self.endian + "I", self.data, self.pos)
+        self.pos += 4
+        self.align(_ALIGNMENT[element[0]])
+        end = self.pos + length
+        if element == "y":
+            value = bytes(self.data[self.pos:end])
+            self.pos = end
+            return value
+        if element[0] == "{":
+            key_sig, value_sig = split_signature(element[1:-1])
+            result: Dict[Any, Any] = {}
+            while self.pos < end:
+                self.align(8)
+                key = self.read(key_sig)
+                result[key] = self.read(value_sig)
+            return result
+        items = []
+        while self.pos < end:
+            items.append(self.read(element))
+        return items
+
+
+@dataclass
+class Message:
+    """A single D-Bus message."""
+    type: int
+    serial: int = 0
+    path: str = ""
+    interface: str = ""
+    member: str = ""
+    error_name: str = ""
+    reply_serial: int = 0
+    destination: str = ""
+    sender: str = ""
+    signature: str = ""
+    body: Tuple[Any, ...] = ()
+    flags: int = 0
+
+    def marshal(self) -> bytes:
+        """Serializes the message (little-endian)."""
+        body = _Writer()
+        for sub, value in zip(split_signature(self.signature), self.body, strict=True):
+            body.write(sub, value)
+
+        fields = []
+        for code, name, sig in _HEADER_FIELDS:
+            value = getattr(self, name)
+            if value:
+                fields.append((code, Variant(sig, value)))
+
+        header = _Writer()
+        header.buf += struct.pack("<BBBBII", ord("l"), self.type, self.flags, PROTOCOL_VERSION,
+                                  len(body.buf), self.serial)
+        header.write("a(yv)", fields)
+        header.align(8)
+        return bytes(header.buf + body.buf)
+
+    @classmethod
+    def unmarshal(cls, data: bytes) -> "Message":
+        """Parses a complete message as returned by :func:`message_length`."""
+        endian = "<" if data[0:1] == b"l" else ">"
+        msg_type, flags, _version, body_length, serial = struct.unpack_from(endian + "BBBII", data, 1)
+        reader = _Reader(data, endian, 12)
+        message = cls(type=msg_type, serial=serial, flags=flags)
+        for code, value in reader.read("a(yv)"):
+            field = _FIELDS_BY_CODE.get(code)
+            if field is not None:
+                setattr(message, field[0], value)
+        reader.align(8)
+        if message.signature:
+            body = _Reader(memoryview(data)[reader.pos:reader.pos + body_length], endian)
+            message.body = tuple(body.read(sub) for sub in split_signature(message.signature))
+        return message
+
+
+def message_length(prefix: bytes) -> int:
+    """Returns the total length of a message given its first 16 bytes."""
+    endian = "<" if prefix[0:1] == b"l" else ">"
+    (body_length,) = struct.unpack_from(endian + "I", prefix, 4)
+    (fields_length,) = struct.unpack_from(endian + "I", prefix, 12)
+    header_length = 16 + fields_length
+    header_length += -header_length % 8
+    return header_length + body_length
@@ -0,0 +1,194 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional, Set
+
+
+class _Slot:
+    """An admitted call and the blocking jobs it started (see run_blocking)."""
+    __slots__ = ("jobs",)
+
+    def __init__(self):
+        self.jobs: List[concurrent.futures.Future] = []
+
+
+# The slot of the call being run, so run_blocking can attach its thread to it
+_CURRENT_SLOT: "contextvars.ContextVar[Optional[_Slot]]" = contextvars.ContextVar(
+    "klipper_sdk_call_slot", default=None
+)
+
+
+@dataclass
+class CallStats:
+    """Snapshot of D-Bus call executor activity."""
+    in_flight: int = 0
+    queued: int = 0
+    max_in_flight: int = 0
+    completed: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    abandoned: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    @property
+    def calls(self) -> int:
+        return self.completed + self.failed + self.timed_out
+
+    @property
+    def avg_wait(self) -> float:
+        return self.total_wait / self.calls if self.calls else 0.0
+
+    @property
+    def avg_latency(self) -> float:
+        return self.total_latency / self.calls if self.calls else 0.0
+
+
+class DBusCallExecutor:
+    """
+    Dedicated, bounded executor for Klipper D-Bus calls.
+
+    Owns a private thread pool (used by blocking transports such as dbus-python)
+    so Klipper calls never compete with unrelated work in the loop's default
+    executor. At most ``max_in_flight`` calls run at once; further calls queue
+    on a semaphore. Each call is bounded by ``timeout`` seconds.
+
+    Blocking work goes through :meth:`run_blocking`, which never hands the
+    pool more jobs than it has threads, so every wait shows up in ``queued``
+    and ``wait`` stats. A blocking thread cannot be interrupted: when a call
+    times out, its slot stays taken (and counted ``in_flight``, and
+    ``abandoned``) until the thread actually finishes.
+
+    Args:
+        max_in_flight: Calls running at once
+        max_workers: Threads of the private pool (defaults to ``max_in_flight``)
+        timeout: Seconds a call may take (``None`` = unbounded)
+    """
+
+    def __init__(self, max_in_flight: int = 8, max_workers: Optional[int] = None,
+                 timeout: Optional[float] = 25.0):
+        self.max_in_flight = max_in_flight
+        self.max_workers = max_workers or max_in_flight
+        self.timeout = timeout
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._workers = asyncio.Semaphore(self.max_workers)
+        self._releases: Set[asyncio.Task] = set()
+        self._stats = CallStats(max_in_flight=max_in_flight)
+
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        """The private pool for blocking calls (created on first use)."""
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="KlipperSDK-DBus"
+            )
+        return self._thread_pool
+
+    @property
+    def stats(self) -> CallStats:
+        """A copy of the current counters, including live queue depth."""
+        return CallStats(**vars(self._stats))
+
+    async def run(self, call: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """
+        Runs ``call(*args)`` under the in-flight limit and timeout.
+
+        Raises:
+            TimeoutError: If the call does not finish within ``timeout`` seconds.
+        """
+        stats = self._stats
+        queued_at = time.perf_counter()
+        stats.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            stats.queued -= 1
+
+        started = time.perf_counter()
+        wait = started - queued_at
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+        stats.in_flight += 1
+        slot = _Slot()
+        token = _CURRENT_SLOT.set(slot)
+        try:
+            result = await asyncio.wait_for(call(*args), self.timeout)
+        except TimeoutError:
+            stats.timed_out += 1
+            raise
+        except Exception:
+            stats.failed += 1
+            raise
+        else:
+            stats.completed += 1
+            return result
+        finally:
+            _CURRENT_SLOT.reset(token)
+            latency = time.perf_counter() - started
+            stats.total_latency += latency
+            stats.max_latency = max(stats.max_latency, latency)
+            running = [job for job in slot.jobs if not job.done()]
+            if running:
+                # The caller gave up, but the thread still occupies the slot
+                stats.abandoned += 1
+                task = asyncio.get_running_loop().create_task(self._release_after(running))
+                self._releases.add(task)
+                task.add_done_callback(self._releases.discard)
+            else:
+                self._release()
+
+    async def run_blocking(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Runs the blocking ``fn(*args)`` on the private pool, waiting (counted in
+        ``queued``) while every thread is busy. Called from a call passed to
+        :meth:`run`, the call's slot is held until the thread finishes.
+        """
+        stats = self._stats
+        queued_at = time.perf_counter()
+        stats.queued += 1
+        try:
+            await self._workers.acquire()
+        finally:
+            stats.queued -= 1
+        wait = time.perf_counter() - queued_at
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+
+        loop = asyncio.get_running_loop()
+        try:
+            job = self.thread_pool.submit(fn, *args)
+        except BaseException:
+            self._workers.release()
+            raise
+        job.add_done_callback(lambda _: self._call_soon(loop, self._workers.release))
+        slot = _CURRENT_SLOT.get()
+        if slot is not None:
+            slot.jobs.append(job)
+        return await asyncio.wrap_future(job)
+
+    def _release(self):
+        self._stats.in_flight -= 1
+        self._semaphore.release()
+
+    async def _release_after(self, jobs: List[concurrent.futures.Future]):
+        try:
+            await asyncio.gather(*(asyncio.wrap_future(job) for job in jobs), return_exceptions=True)
+        finally:
+            self._release()
+
+    @staticmethod
+    def _call_soon(loop: asyncio.AbstractEventLoop, callback: Callable[[], Any]):
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(callback)
+
+    def shutdown(self):
+        """Releases the worker threads. The pool is recreated if used again."""
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+            self._thread_pool = None
@@ -0,0 +1,398 @@
+import bisect
+import codecs
+import hashlib
+import itertools
+import re
+import threading
+from typing import Dict, FrozenSet, Hashable, Iterable, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from .mime import is_text_mime, mime_charset
+
+if TYPE_CHECKING:
+    from .controllers import HistoryItem
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Characters of text lowercased and indexed at a time
+_CHUNK = 64 * 1024
+# Words longer than this are not kept as prefix-search tokens
+_MAX_TOKEN = 256
+
+
+def _text_chunks(item: "HistoryItem") -> Iterator[str]:
+    """
+    Yields the searchable text of a history item lowercased, chunk by chunk, so
+    large payloads are never lowercased (or decoded) as a whole. Non-text MIME
+    types have no searchable text.
+    """
+    if not is_text_mime(item.mime_type):
+        return
+    content = item.content
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        view = memoryview(content)
+        if view.format != "B" or view.ndim != 1:
+            view = view.cast("B")
+        try:
+            decoder = codecs.getincrementaldecoder(mime_charset(item.mime_type))("replace")
+        except LookupError:
+            # An unknown charset still gets its ASCII-compatible parts indexed
+            decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        for start in range(0, len(view), _CHUNK):
+            yield decoder.decode(view[start:start + _CHUNK]).lower()
+        yield decoder.decode(b"", True).lower()
+        return
+    if not isinstance(content, str):
+        content = str(content)
+    for start in range(0, len(content), _CHUNK):
+        yield content[start:start + _CHUNK].lower()
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _tail_grams(text: str) -> Set[str]:
+    """
+    The last two and the last character of a text. With its trigrams, every
+    substring of up to three characters starts one of these grams.
+    """
+    return {text[-2:], text[-1:]} if text else set()
+
+
+def _grams(text: str) -> Set[str]:
+    return _trigrams(text) | _tail_grams(text)
+
+
+def _scan(chunks: Iterable[str], keep: int) -> Tuple[Set[str], Set[str], str, bool]:
+    """
+    Collects the grams and word tokens of a text given in chunks.
+
+    Returns:
+        The grams, the tokens, the first ``keep`` characters, and whether the
+        text was longer than that
+    """
+    grams: Set[str] = set()
+    tokens: Set[str] = set()
+    head: List[str] = []
+    kept = 0
+    gram_tail = word_tail = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if kept <= keep:
+            head.append(chunk)
+            kept += len(chunk)
+        grams |= _trigrams(gram_tail + chunk)
+        gram_tail = (gram_tail + chunk)[-2:]
+        # A word running into the next chunk is completed there
+        words = word_tail + chunk
+        cut = len(words)
+        while cut > 0 and (words[cut - 1].isalnum() or words[cut - 1] == "_"):
+            cut -= 1
+            if len(words) - cut > _MAX_TOKEN:
+                break
+        tokens.update(_TOKEN_RE.findall(words, 0, cut))
+        word_tail = words[cut:] if len(words) - cut <= _MAX_TOKEN else ""
+    tokens.update(_TOKEN_RE.findall(word_tail))
+    grams |= _tail_grams(gram_tail)
+    text = "".join(head)
+    return grams, tokens, text[:keep], len(text) > keep
+
+
+def _content_key(item: "HistoryItem", content_hash: Optional[str] = None) -> Tuple[str, bool]:
+    """
+    Identifies an item's indexed text: its content hash (the store's blob hash
+    when given, BLAKE2b of the content otherwise) and whether it is text.
+    """
+    if content_hash is None:
+        content = item.content
+        data = content.encode("utf-8", "surrogatepass") if isinstance(content, str) else content
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            data = str(content).encode("utf-8", "surrogatepass")
+        digest = hashlib.blake2b(b"s" if isinstance(content, str) else b"b", digest_size=20)
+        digest.update(data)
+        content_hash = digest.hexdigest()
+    return content_hash, is_text_mime(item.mime_type)
+
+
+class HistoryIndex:
+    """
+    In-process n-gram/token index over clipboard history items.
+
+    Indexed text and postings are kept per distinct content (keyed by content
+    hash, refcounted by the entries that share it), so re-copying the same
+    snippet adds an entry id, not another copy of its text. Each distinct
+    content is lowercased and indexed exactly once, chunk by chunk, when it is
+    first added.
+
+    Contents are indexed by their trigrams and their last one and two
+    characters. A term of up to three characters is answered exactly from the
+    postings of the grams it starts (looked up in a sorted gram vocabulary,
+    like prefix terms in the token vocabulary); a longer term by intersecting
+    its trigram postings and verifying the survivors. Candidates are visited
+    newest first and verified lazily, so a query with a ``limit`` stops as
+    soon as it has enough matches.
+
+    Documents longer than ``max_indexed_chars`` are indexed in full (postings
+    and tokens) but their text is not kept; a longer term that survives the
+    trigram postings is verified against the item itself, so its payload
+    (possibly a spill file) is only read when it very likely matches.
+
+    The index is thread-safe: the D-Bus signal thread may add items while the
+    event loop is searching.
+    """
+
+    # A query walks the entries newest first unless its rarest gram is in fewer
+    # than 1/WALK_RATIO of the contents, in which case its postings are expanded
+    WALK_RATIO = 8
+
+    def __init__(self, max_indexed_chars: int = 64 * 1024):
+        self.max_indexed_chars = max_indexed_chars
+        self._lock = threading.RLock()
+        self._next_doc = 0
+        # Per entry, in insertion (oldest first) order: the item and the key of its content
+        self._items: Dict[int, "HistoryItem"] = {}
+        self._doc_keys: Dict[int, Hashable] = {}
+        self._docs_by_uuid: Dict[str, int] = {}
+        # Per distinct content: lowercased text, the entries sharing it, and postings
+        self._texts: Dict[Hashable, str] = {}
+        self._docs_by_key: Dict[Hashable, Set[int]] = {}
+        self._grams: Dict[str, Set[Hashable]] = {}
+        self._gram_vocabulary: List[str] = []
+        self._tokens: Dict[str, Set[Hashable]] = {}
+        self._vocabulary: List[str] = []
+        # Grams and tokens of contents whose text is not kept, to unindex them
+        self._oversized: Dict[Hashable, Tuple[FrozenSet[str], FrozenSet[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, uuid: str) -> bool:
+        return uuid in self._docs_by_uuid
+
+    @property
+    def unique_contents(self) -> int:
+        """Number of distinct contents indexed (entries sharing a content count once)."""
+        return len(self._docs_by_key)
+
+    def add(self, item: "HistoryItem", content_hash: Optional[str] = None) -> None:
+        """
+        Indexes an item as the newest entry.
+
+        Args:
+            item: The history item
+            content_hash: The store's hash of the item's content, if known;
+                computed from the content otherwise
+        """
+        key = _content_key(item, content_hash)
+        with self._lock:
+            if item.uuid in self._docs_by_uuid:
+                self._remove_doc(self._docs_by_uuid[item.uuid])
+            doc = self._next_doc
+            self._next_doc += 1
+            self._items[doc] = item
+            self._doc_keys[doc] = key
+            self._docs_by_uuid[item.uuid] = doc
+            docs = self._docs_by_key.get(key)
+            if docs is not None:
+                docs.add(doc)
+                return
+            self._docs_by_key[key] = {doc}
+            self._index_text(key, item)
+
+    def extend(self, items: Iterable["HistoryItem"]) -> None:
+        """Indexes items in order, oldest first."""
+        for item in items:
+            self.add(item)
+
+    def remove(self, uuid: str) -> bool:
+        """Removes an item by UUID. Returns True if it was indexed."""
+        with self._lock:
+            doc = self._docs_by_uuid.get(uuid)
+            if doc is None:
+                return False
+            self._remove_doc(doc)
+            return True
+
+    def clear(self) -> None:
+        """Drops every indexed item."""
+        with self._lock:
+            self._items.clear()
+            self._doc_keys.clear()
+            self._docs_by_uuid.clear()
+            self._texts.clear()
+            self._docs_by_key.clear()
+            self._grams.clear()
+            self._gram_vocabulary.clear()
+            self._tokens.clear()
+            self._vocabulary.clear()
+            self._oversized.clear()
+
+    def latest(self) -> Optional["HistoryItem"]:
+        """Returns the most recently indexed item, if any."""
+        with self._lock:
+            if not self._items:
+                return None
+            return self._items[next(reversed(self._items))]
+
+    def search(self, query: str, limit: Optional[int] = None, prefix: bool = False) -> List["HistoryItem"]:
+        """
+        Finds items matching every whitespace-separated term of the query.
+
+        Args:
+            query: Search terms (case-insensitive). An empty query matches everything.
+            limit: Maximum number of items to return (newest first).
+            prefix: Match terms against word prefixes instead of raw substrings.
+
+        Returns:
+            Matching HistoryItems, newest first.
+        """
+        terms = query.lower().split()
+        with self._lock:
+            if not terms or limit == 0:
+                return list(itertools.islice(reversed(self._items.values()), limit))
+            groups = []
+            verify = []
+            for term in terms:
+                if prefix:
+                    group = _starting_with(self._vocabulary, self._tokens, term)
+                elif len(term) <= 3:
+                    # Exact: a content contains the term iff it has a gram starting with it
+                    group = _starting_with(self._gram_vocabulary, self._grams, term)
+                else:
+                    group = [self._grams.get(gram) for gram in _trigrams(term)]
+                    if None in group:
+                        return []
+                    groups.extend([keys] for keys in group)
+                    verify.append(term)
+                    continue
+                if not group:
+                    return []
+                groups.append(group)
+            return self._collect(groups, verify, limit)
+
+    def _collect(self, groups: List[List[Set[Hashable]]], verify: List[str],
+                 limit: Optional[int]) -> List["HistoryItem"]:
+        """
+        Entries whose content is in at least one posting set of every group and
+        contains every ``verify`` term, newest first.
+        """
+        if limit is None:
+            # Every match is returned: intersect the postings outright
+            keys = set.intersection(*(set().union(*group) for group in groups))
+            if verify:
+                keys = {key for key in keys if self._verify(key, verify)}
+            docs = sorted((doc for key in keys for doc in self._docs_by_key[key]), reverse=True)
+            return [self._items[doc] for doc in docs]
+        # Check the most selective groups, and the largest sets within a group, first
+        groups.sort(key=lambda group: sum(map(len, group)))
+        for group in groups:
+            group.sort(key=len, reverse=True)
+        verified: Dict[Hashable, bool] = {}
+
+        def matches(key: Hashable) -> bool:
+            for group in groups:
+                if not any(key in keys for keys in group):
+                    return False
+            if not verify:
+                return True
+            result = verified.get(key)
+            if result is None:
+                result = verified[key] = self._verify(key, verify)
+            return result
+
+        if sum(map(len, groups[0])) * self.WALK_RATIO < len(self._docs_by_key):
+            # Few candidates: expand the rarest postings and order their entries
+            candidates = set().union(*groups.pop(0))
+            docs: Iterable[int] = sorted((doc for key in candidates for doc in self._docs_by_key[key]), reverse=True)
+        else:
+            # Common terms: most recent entries match, so walk them and stop at the limit
+            docs = reversed(self._items)
+        results = []
+        doc_keys = self._doc_keys
+        for doc in docs:
+            key = doc_keys[doc]
+            if matches(key):
+                results.append(self._items[doc])
+                if len(results) >= limit:
+                    break
+        return results
+
+    def _verify(self, key: Hashable, terms: List[str]) -> bool:
+        """Whether a content contains every term."""
+        if key not in self._oversized:
+            text = self._texts[key]
+            return all(term in text for term in terms)
+        # Stream the full text, keeping enough of each chunk to find terms spanning two
+        item = self._items[next(iter(self._docs_by_key[key]))]
+        overlap = max(map(len, terms)) - 1
+        missing = set(terms)
+        tail = ""
+        for chunk in _text_chunks(item):
+            window = tail + chunk
+            missing = {term for term in missing if term not in window}
+            if not missing:
+                return True
+            tail = window[-overlap:]
+        return False
+
+    def _index_text(self, key: Hashable, item: "HistoryItem") -> None:
+        grams, tokens, text, oversized = _scan(_text_chunks(item), self.max_indexed_chars)
+        if oversized:
+            self._oversized[key] = (frozenset(grams), frozenset(tokens))
+        else:
+            self._texts[key] = text
+        _post(self._gram_vocabulary, self._grams, grams, key)
+        _post(self._vocabulary, self._tokens, tokens, key)
+
+    def _remove_doc(self, doc: int) -> None:
+        item = self._items.pop(doc)
+        key = self._doc_keys.pop(doc)
+        self._docs_by_uuid.pop(item.uuid, None)
+        docs = self._docs_by_key[key]
+        docs.discard(doc)
+        if docs:
+            return
+        # Last entry with this content: drop its text and postings
+        del self._docs_by_key[key]
+        if key in self._oversized:
+            grams, tokens = self._oversized.pop(key)
+        else:
+            text = self._texts.pop(key)
+            grams, tokens = _grams(text), _TOKEN_RE.findall(text)
+        _unpost(self._gram_vocabulary, self._grams, grams, key)
+        _unpost(self._vocabulary, self._tokens, tokens, key)
+
+
+def _post(vocabulary: List[str], postings: Dict[str, Set[Hashable]], words: Iterable[str], key: Hashable) -> None:
+    """Adds a content key to the postings of words, keeping the sorted vocabulary of posted words."""
+    for word in words:
+        keys = postings.get(word)
+        if keys is None:
+            keys = postings[word] = set()
+            bisect.insort(vocabulary, word)
+        keys.add(key)
+
+
+def _unpost(vocabulary: List[str], postings: Dict[str, Set[Hashable]], words: Iterable[str], key: Hashable) -> None:
+    for word in words:
+        keys = postings.get(word)
+        if keys is None:
+            continue
+        keys.discard(key)
+        if not keys:
+            del postings[word]
+            pos = bisect.bisect_left(vocabulary, word)
+            if pos < len(vocabulary) and vocabulary[pos] == word:
+                del vocabulary[pos]
+
+
+def _starting_with(vocabulary: List[str], postings: Dict[str, Set[Hashable]], prefix: str) -> List[Set[Hashable]]:
+    """The posting sets of every vocabulary word starting with a prefix."""
+    group = []
+    for pos in range(bisect.bisect_left(vocabulary, prefix), len(vocabulary)):
+        word = vocabulary[pos]
+        if not word.startswith(prefix):
+            break
+        group.append(postings[word])
+    return group
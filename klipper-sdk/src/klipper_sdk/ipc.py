@@ -0,0 +1,447 @@
+"""
+Cross-process pulse fan-out over a Unix domain socket.
+
+One process (the one holding the Klipper D-Bus subscription) runs a
+``PulseHub`` on its cluster; worker processes attach a ``PulseSubscriber``
+to their own cluster and receive the same pulses::
+
+    hub = PulseHub(client.cluster, "/run/user/1000/klipper-pulses")
+    await hub.start()
+
+    # in each worker
+    cluster = NeuronalCluster(node_id="worker")
+    subscriber = PulseSubscriber(cluster, "/run/user/1000/klipper-pulses", vectors=["clipboard_*"])
+    await subscriber.connect()
+
+Each pulse is encoded once into a compact binary frame and written to every
+subscriber whose vector filter matches. Payloads above ``share_threshold``
+bytes are written once to a uniquely named file in shared memory
+(``/dev/shm`` where available) and subscribers receive a reference they
+memory-map: bytes arrive as a zero-copy ``memoryview``, text is decoded from
+the mapping. Each subscriber releases the file once mapped, and the hub
+unlinks it when every subscriber it was sent to has released it or gone away.
+
+Frame layout (big-endian)::
+
+    u32 length | u8 type | body
+    PULSE body:     f64 intensity | u8 payload kind | u16 len(id) | u16 len(vector)
+                    | u16 len(source) | id | vector | source | payload
+    SUBSCRIBE body: vector patterns, NUL-separated UTF-8 (empty = everything);
+                    the hub acknowledges with an empty SUBSCRIBE frame
+    RELEASE body:   name of a shared payload file the subscriber has mapped
+"""
+
+import asyncio
+import json
+import logging
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union, TYPE_CHECKING
+
+from .bridge import Pulse, _make_subscription, _Subscription
+
+if TYPE_CHECKING:
+    from .bridge import NeuronalCluster
+
+logger = logging.getLogger(__name__)
+
+FRAME_PULSE = 1
+FRAME_SUBSCRIBE = 2
+FRAME_RELEASE = 3
+
+PAYLOAD_NONE = 0
+PAYLOAD_TEXT = 1
+PAYLOAD_BYTES = 2
+PAYLOAD_JSON = 3
+PAYLOAD_SHARED_TEXT = 4
+PAYLOAD_SHARED_BYTES = 5
+
+_HEADER = struct.Struct(">IB")
+_PULSE = struct.Struct(">dBHHH")
+_SHARED = struct.Struct(">Q")
+
+SHARE_THRESHOLD = 64 * 1024
+MAX_FRAME = 64 * 1024 * 1024
+
+
+def _shm_base() -> str:
+    return "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else tempfile.gettempdir()
+
+
+def encode_pulse(pulse: Pulse, payload_kind: int, payload: Union[bytes, memoryview]) -> bytes:
+    """Builds a PULSE frame around an already encoded payload."""
+    ident = pulse.id.encode("utf-8")
+    vector = pulse.vector.encode("utf-8")
+    source = pulse.source_node.encode("utf-8")
+    body_length = 1 + _PULSE.size + len(ident) + len(vector) + len(source) + len(payload)
+    return b"".join((
+        _HEADER.pack(body_length, FRAME_PULSE),
+        _PULSE.pack(pulse.intensity, payload_kind, len(ident), len(vector), len(source)),
+        ident, vector, source, payload,
+    ))
+
+
+def decode_pulse(body: bytes) -> Tuple[Pulse, int, memoryview]:
+    """Splits a PULSE frame body into a payload-less Pulse, the payload kind and the raw payload."""
+    intensity, kind, id_length, vector_length, source_length = _PULSE.unpack_from(body)
+    view = memoryview(body)
+    offset = _PULSE.size
+    ident = str(view[offset:offset + id_length], "utf-8")
+    offset += id_length
+    vector = str(view[offset:offset + vector_length], "utf-8")
+    offset += vector_length
+    source = str(view[offset:offset + source_length], "utf-8")
+    offset += source_length
+    pulse = Pulse(id=ident, vector=vector, intensity=intensity, source_node=source)
+    return pulse, kind, view[offset:]
+
+
+def _encode_payload(payload: Any) -> Tuple[int, Union[bytes, memoryview]]:
+    if payload is None:
+        return PAYLOAD_NONE, b""
+    if isinstance(payload, str):
+        return PAYLOAD_TEXT, payload.encode("utf-8", "surrogatepass")
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        view = memoryview(payload)
+        return PAYLOAD_BYTES, view if view.contiguous and view.format == "B" else view.tobytes()
+    return PAYLOAD_JSON, json.dumps(payload).encode("utf-8")
+
+
+def _decode_payload(kind: int, data: memoryview) -> Any:
+    if kind == PAYLOAD_NONE:
+        return None
+    if kind == PAYLOAD_TEXT:
+        return str(data, "utf-8", "surrogatepass")
+    if kind == PAYLOAD_BYTES:
+        return bytes(data)
+    if kind == PAYLOAD_JSON:
+        return json.loads(str(data, "utf-8"))
+    if kind in (PAYLOAD_SHARED_TEXT, PAYLOAD_SHARED_BYTES):
+        size, path = _shared_reference(data)
+        return _map_shared(path, size, kind == PAYLOAD_SHARED_TEXT)
+    raise ValueError(f"Unknown payload kind {kind}")
+
+
+def _shared_reference(data: memoryview) -> Tuple[int, str]:
+    """The size and path of a shared payload."""
+    (size,) = _SHARED.unpack_from(data)
+    return size, str(data[_SHARED.size:], "utf-8")
+
+
+def _map_shared(path: str, size: int, text: bool) -> Union[str, memoryview]:
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+    if text:
+        try:
+            return str(mapping, "utf-8", "surrogatepass")
+        finally:
+            mapping.close()
+    # The view keeps the mapping (and so the data) alive after the hub unlinks the file
+    return memoryview(mapping)
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    header = await reader.readexactly(_HEADER.size)
+    length, frame_type = _HEADER.unpack(header)
+    if length < 1 or length > MAX_FRAME:
+        raise ConnectionError(f"Invalid pulse frame length {length}")
+    return frame_type, await reader.readexactly(length - 1)
+
+
+# --- HUB ---
+
+@dataclass
+class HubStats:
+    """Counters of a PulseHub."""
+    subscribers: int = 0
+    published: int = 0
+    frames: int = 0
+    dropped: int = 0
+    shared: int = 0
+    shared_bytes: int = 0
+    # Shared payload files not yet released by every subscriber they were sent to
+    shared_files: int = 0
+    errors: int = 0
+
+
+class _Peer:
+    __slots__ = ("writer", "subscription", "shared")
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.subscription: Optional[_Subscription] = None
+        # Names of shared payload files sent to this peer and not yet released
+        self.shared: Set[str] = set()
+
+
+class PulseHub:
+    """
+    Publishes a cluster's pulses to subscriber processes.
+
+    Args:
+        cluster: The cluster whose pulses are published
+        path: Unix socket path to listen on
+        vectors: Vectors to publish (as for ``NeuronalCluster.subscribe``; ``None`` = all)
+        share_threshold: Payloads larger than this many bytes go through shared memory
+        shm_dir: Directory for shared payload files (defaults to ``/dev/shm``)
+        max_buffer: A subscriber with more than this many bytes unsent loses new pulses
+    """
+
+    def __init__(self, cluster: "NeuronalCluster", path: str, vectors: Optional[Iterable[str]] = None,
+                 share_threshold: int = SHARE_THRESHOLD, shm_dir: Optional[str] = None,
+                 max_buffer: int = 4 * 1024 * 1024):
+        self.cluster = cluster
+        self.path = path
+        self.vectors = vectors
+        self.share_threshold = share_threshold
+        self.max_buffer = max_buffer
+        self._shm_base = shm_dir
+        self._shm_dir: Optional[str] = None
+        # Subscribers yet to release each shared payload file, by file name
+        self._shared: Dict[str, int] = {}
+        self._peers: List[_Peer] = []
+        self._handlers: set = set()
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._stats = HubStats()
+
+    @property
+    def stats(self) -> HubStats:
+        return HubStats(**{**vars(self._stats), "subscribers": len(self._peers),
+                           "shared_files": len(self._shared)})
+
+    async def start(self):
+        """Listens on ``path`` and starts publishing the cluster's pulses."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+        self.cluster.subscribe(self, vectors=self.vectors)
+
+    async def close(self):
+        self.cluster.unsubscribe(self)
+        for peer in self._peers:
+            peer.writer.close()
+        if self._handlers:
+            await asyncio.wait(list(self._handlers), timeout=1.0)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._shm_dir is not None:
+            shutil.rmtree(self._shm_dir, ignore_errors=True)
+            self._shm_dir = None
+            self._shared.clear()
+
+    def on_pulse(self, pulse: Pulse):
+        if self._loop is None:
+            return
+        if threading.get_ident() != self._loop_thread:
+            # Stream writers belong to the loop
+            self._loop.call_soon_threadsafe(self.publish, pulse)
+        else:
+            self.publish(pulse)
+
+    def publish(self, pulse: Pulse):
+        """Encodes ``pulse`` once and writes it to every matching subscriber. Call on the hub's loop."""
+        targets = [peer for peer in self._peers
+                   if peer.subscription is not None
+                   and (pulse.vector == self.cluster.BROADCAST or peer.subscription.matches(pulse.vector))]
+        self._stats.published += 1
+        if not targets:
+            return
+        try:
+            frame, shared = self._encode(pulse)
+        except Exception as e:
+            self._stats.errors += 1
+            logger.error("Cannot publish pulse %s: %s", pulse.id, e)
+            return
+        readers = 0
+        for peer in targets:
+            transport = peer.writer.transport
+            if peer.writer.is_closing():
+                continue
+            if transport.get_write_buffer_size() > self.max_buffer:
+                self._stats.dropped += 1
+                continue
+            peer.writer.write(frame)
+            self._stats.frames += 1
+            if shared is not None:
+                peer.shared.add(shared)
+                readers += 1
+        if shared is not None:
+            self._shared[shared] = readers
+            if not readers:
+                self._release(shared)
+
+    def _encode(self, pulse: Pulse) -> Tuple[bytes, Optional[str]]:
+        """The PULSE frame of ``pulse``, and the name of the shared file holding its payload, if any."""
+        kind, data = _encode_payload(pulse.payload)
+        name = None
+        if kind in (PAYLOAD_TEXT, PAYLOAD_BYTES) and len(data) > self.share_threshold:
+            # Never derived from the pulse: ids repeat across hubs and restarts
+            name = uuid.uuid4().hex
+            path = self._write_shared(name, data)
+            kind = PAYLOAD_SHARED_TEXT if kind == PAYLOAD_TEXT else PAYLOAD_SHARED_BYTES
+            data = _SHARED.pack(len(data)) + path.encode("utf-8")
+        return encode_pulse(pulse, kind, data), name
+
+    def _write_shared(self, name: str, data: Union[bytes, memoryview]) -> str:
+        if self._shm_dir is None:
+            self._shm_dir = tempfile.mkdtemp(prefix="klipper-sdk-pulses-", dir=self._shm_base or _shm_base())
+        path = os.path.join(self._shm_dir, name)
+        with open(path, "xb") as f:
+            f.write(data)
+        self._stats.shared += 1
+        self._stats.shared_bytes += len(data)
+        return path
+
+    def _release(self, name: str):
+        """Drops one reader of a shared payload file, unlinking it after the last."""
+        readers = self._shared.get(name)
+        if readers is None:
+            return
+        if readers > 1:
+            self._shared[name] = readers - 1
+            return
+        del self._shared[name]
+        try:
+            os.unlink(os.path.join(self._shm_dir, name))
+        except FileNotFoundError:
+            pass
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        peer = _Peer(writer)
+        self._peers.append(peer)
+        try:
+            while True:
+                frame_type, body = await _read_frame(reader)
+                if frame_type == FRAME_SUBSCRIBE:
+                    patterns = [p for p in str(body, "utf-8").split("\0") if p]
+                    peer.subscription = _make_subscription(None, patterns or None)
+                    # Acknowledge: every pulse published from now on reaches the peer
+                    writer.write(_HEADER.pack(1, FRAME_SUBSCRIBE))
+                elif frame_type == FRAME_RELEASE:
+                    name = str(body, "utf-8")
+                    # Only names sent to this peer count, so a peer cannot release another's reference
+                    if name in peer.shared:
+                        peer.shared.discard(name)
+                        self._release(name)
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            if not isinstance(e, asyncio.IncompleteReadError):
+                logger.warning("Dropping pulse subscriber: %s", e)
+        finally:
+            self._handlers.discard(handler)
+            self._peers.remove(peer)
+            # A subscriber that went away will not release what it was sent
+            for name in peer.shared:
+                self._release(name)
+            peer.shared.clear()
+            writer.close()
+
+
+# --- SUBSCRIBER ---
+
+@dataclass
+class SubscriberStats:
+    """Counters of a PulseSubscriber."""
+    received: int = 0
+    shared: int = 0
+    errors: int = 0
+
+
+class PulseSubscriber:
+    """
+    Receives pulses from a :class:`PulseHub` and delivers them to a local cluster,
+    keeping their ids, vectors, intensities and source nodes.
+
+    Args:
+        cluster: Local cluster the pulses are delivered to
+        path: The hub's Unix socket path
+        vectors: Vectors to receive (``None`` = all); filtered by the hub, so
+            unwanted pulses are never sent
+    """
+
+    def __init__(self, cluster: "NeuronalCluster", path: str, vectors: Optional[Iterable[str]] = None):
+        self.cluster = cluster
+        self.path = path
+        self.vectors = [vectors] if isinstance(vectors, str) else list(vectors or [])
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats = SubscriberStats()
+
+    @property
+    def stats(self) -> SubscriberStats:
+        return SubscriberStats(**vars(self._stats))
+
+    @property
+    def connected(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def connect(self):
+        """Subscribes; pulses the hub publishes after this returns are delivered."""
+        try:
+            reader, self._writer = await asyncio.open_unix_connection(self.path)
+        except OSError as e:
+            raise ConnectionError(f"Could not reach pulse hub at {self.path}: {e}") from e
+        patterns = "\0".join(self.vectors).encode("utf-8")
+        self._writer.write(_HEADER.pack(1 + len(patterns), FRAME_SUBSCRIBE) + patterns)
+        try:
+            frame_type, _ = await _read_frame(reader)
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            self._writer.close()
+            self._writer = None
+            raise ConnectionError(f"Pulse hub at {self.path} refused the subscription: {e}") from e
+        if frame_type != FRAME_SUBSCRIBE:
+            raise ConnectionError(f"Unexpected frame {frame_type} from pulse hub")
+        self._task = asyncio.get_running_loop().create_task(self._read_loop(reader))
+
+    async def _read_loop(self, reader: asyncio.StreamReader):
+        try:
+            while True:
+                frame_type, body = await _read_frame(reader)
+                if frame_type != FRAME_PULSE:
+                    continue
+                try:
+                    pulse, kind, data = decode_pulse(body)
+                    try:
+                        pulse.payload = _decode_payload(kind, data)
+                    finally:
+                        if kind in (PAYLOAD_SHARED_TEXT, PAYLOAD_SHARED_BYTES):
+                            # Mapped (or unreadable): the hub may unlink the file now
+                            self._release(os.path.basename(_shared_reference(data)[1]))
+                except Exception as e:
+                    self._stats.errors += 1
+                    logger.error("Undecodable pulse frame: %s", e)
+                    continue
+                self._stats.received += 1
+                if kind >= PAYLOAD_SHARED_TEXT:
+                    self._stats.shared += 1
+                self.cluster.deliver(pulse)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            logger.info("Pulse hub at %s went away", self.path)
+
+    def _release(self, name: str):
+        if self._writer is not None and not self._writer.is_closing():
+            body = name.encode("utf-8")
+            self._writer.write(_HEADER.pack(1 + len(body), FRAME_RELEASE) + body)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
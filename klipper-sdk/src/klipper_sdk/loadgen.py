@@ -0,0 +1,200 @@
+"""
+Clipboard-storm load generator.
+
+Drives a :class:`~klipper_sdk.testing.FakeKlipper` with bursts of copies and
+measures the latency from each ``clipboardContentChanged`` emission to its
+delivery at cluster listeners::
+
+    python -m klipper_sdk.loadgen --copies 10000 --rate 2000 --listeners 10
+    python -m klipper_sdk.loadgen --transport bus --latency 0.002 --failure-rate 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from .client import KlipperClient
+from .testing import FakeKlipper, FakeKlipperBus, FakeKlipperTransport
+from .transport import AsyncioTransport
+
+
+@dataclass
+class StormReport:
+    """Outcome of a clipboard storm."""
+    copies: int = 0
+    listeners: int = 0
+    deliveries: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    duration: float = 0.0
+    calls: int = 0
+    call_failures: int = 0
+    latency: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def delivery_ratio(self) -> float:
+        expected = self.copies * self.listeners
+        return self.deliveries / expected if expected else 0.0
+
+    def format(self) -> str:
+        lines = [
+            f"copies       {self.copies} in {self.duration:.3f}s ({self.copies / self.duration if self.duration else 0:,.0f}/s)",
+            f"deliveries   {self.deliveries} to {self.listeners} listener(s) ({self.delivery_ratio:.1%})",
+            f"dropped      {self.dropped} (coalesced {self.coalesced})",
+        ]
+        if self.calls:
+            lines.append(f"calls        {self.calls} ({self.call_failures} failed)")
+        for name, value in self.latency.items():
+            lines.append(f"latency {name:<4} {value * 1000:.3f} ms")
+        return "\n".join(lines)
+
+
+def percentiles(samples: List[float], points=(50, 90, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles plus the maximum, keyed ``p50``, ``p90``, ..., ``max``."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    result = {}
+    for point in points:
+        rank = max(0, min(len(ordered) - 1, -(-point * len(ordered) // 100) - 1))
+        result[f"p{point}"] = ordered[rank]
+    result["max"] = ordered[-1]
+    return result
+
+
+class _LatencyListener:
+    def __init__(self, sent: Dict[str, float], samples: List[float]):
+        self.sent = sent
+        self.samples = samples
+
+    def on_pulse(self, pulse):
+        sent_at = self.sent.get(pulse.payload)
+        if sent_at is not None:
+            self.samples.append(time.perf_counter() - sent_at)
+
+
+async def run_storm(copies: int = 1000, rate: float = 0.0, burst: int = 1, listeners: int = 1,
+                    payload_size: int = 32, transport: str = "inproc", latency: float = 0.0,
+                    jitter: float = 0.0, failure_rate: float = 0.0, call_every: int = 0,
+                    pulse_queue_size: int = 1024, pulse_overflow: str = "drop_oldest",
+                    settle: float = 1.0) -> StormReport:
+    """
+    Runs one clipboard storm against a fresh fake service and client.
+
+    Args:
+        copies: Number of simulated user copies
+        rate: Copies per second (0 = as fast as possible)
+        burst: Copies issued back-to-back before yielding to the loop
+        listeners: Cluster listeners subscribed to ``clipboard_change``
+        payload_size: Approximate size of each copied string
+        transport: "inproc" (FakeKlipperTransport) or "bus" (AsyncioTransport over FakeKlipperBus)
+        latency, jitter, failure_rate: Injected into the fake service's method calls
+        call_every: Also issue a ``getClipboardContents`` call every N copies (0 = never)
+        pulse_queue_size, pulse_overflow: Passed to KlipperClient
+        settle: Seconds to wait for in-flight deliveries once the storm ends
+
+    Returns:
+        A StormReport with signal-to-listener latency percentiles
+    """
+    service = FakeKlipper(latency=latency, jitter=jitter, failure_rate=failure_rate)
+    bus = None
+    tmpdir = None
+    if transport == "bus":
+        tmpdir = tempfile.TemporaryDirectory()
+        bus = FakeKlipperBus(service)
+        address = await bus.start(os.path.join(tmpdir.name, "bus"))
+        backend = AsyncioTransport(KlipperClient.BUS_NAME, KlipperClient.OBJECT_PATH,
+                                   KlipperClient.INTERFACE, address=address)
+    elif transport == "inproc":
+        backend = FakeKlipperTransport(service)
+    else:
+        raise ValueError(f"Unknown transport {transport!r}")
+
+    client = KlipperClient(transport=backend, pulse_queue_size=pulse_queue_size,
+                           pulse_overflow=pulse_overflow, history_path=":memory:")
+    sent: Dict[str, float] = {}
+    samples: List[float] = []
+    for _ in range(listeners):
+        client.cluster.subscribe(_LatencyListener(sent, samples), vectors=["clipboard_change"])
+
+    report = StormReport(copies=copies, listeners=listeners)
+    calls: List[asyncio.Task] = []
+    try:
+        await client.connect()
+        padding = "x" * max(0, payload_size - 16)
+        interval = 1.0 / rate if rate > 0 else 0.0
+        start = time.perf_counter()
+        for i in range(copies):
+            content = f"storm-{i:010d}-{padding}"
+            sent[content] = time.perf_counter()
+            service.copy(content)
+            if call_every and i % call_every == 0:
+                calls.append(asyncio.create_task(client._call_dbus_method("getClipboardContents")))
+            if (i + 1) % burst == 0:
+                if interval:
+                    delay = start + (i + 1) * interval - time.perf_counter()
+                    await asyncio.sleep(max(0.0, delay))
+                else:
+                    await asyncio.sleep(0)
+        report.duration = time.perf_counter() - start
+
+        expected = copies * listeners
+        deadline = time.perf_counter() + settle
+        while len(samples) < expected and time.perf_counter() < deadline:
+            await asyncio.sleep(0.005)
+        await client.cluster.drain()
+
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        report.calls = len(results)
+        report.call_failures = sum(isinstance(r, BaseException) for r in results)
+        stats = client.pulse_bridge.stats
+        report.dropped = stats.dropped
+        report.coalesced = stats.coalesced
+        report.deliveries = len(samples)
+        report.latency = percentiles(samples)
+    finally:
+        await client.shutdown()
+        if bus is not None:
+            await bus.close()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Clipboard-storm load generator for the Klipper SDK")
+    parser.add_argument("--copies", type=int, default=1000)
+    parser.add_argument("--rate", type=float, default=0.0, help="copies per second (0 = unthrottled)")
+    parser.add_argument("--burst", type=int, default=1, help="copies issued before yielding to the loop")
+    parser.add_argument("--listeners", type=int, default=1)
+    parser.add_argument("--payload-size", type=int, default=32)
+    parser.add_argument("--transport", choices=("inproc", "bus"), default="inproc")
+    parser.add_argument("--latency", type=float, default=0.0, help="injected call latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--call-every", type=int, default=0, help="issue a D-Bus call every N copies")
+    parser.add_argument("--queue-size", type=int, default=1024)
+    parser.add_argument("--overflow", choices=("drop_oldest", "block", "coalesce"), default="drop_oldest")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--log-level", default="ERROR", help="SDK log level (injected failures log warnings)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper())
+
+    report = asyncio.run(run_storm(
+        copies=args.copies, rate=args.rate, burst=args.burst, listeners=args.listeners,
+        payload_size=args.payload_size, transport=args.transport, latency=args.latency,
+        jitter=args.jitter, failure_rate=args.failure_rate, call_every=args.call_every,
+        pulse_queue_size=args.queue_size, pulse_overflow=args.overflow,
+    ))
+    print(json.dumps(asdict(report), indent=2) if args.json else report.format())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,183 @@
+"""
+Low-overhead instrumentation for the SDK hot paths.
+
+Metrics live in a process-wide ``REGISTRY`` which is disabled by default
+(set ``KLIPPER_SDK_METRICS=1`` or call ``REGISTRY.enable()``). Instrumented
+code checks ``REGISTRY.enabled`` before doing any work, so a disabled
+registry costs one attribute lookup per call site.
+
+Updates are lock-free; under heavy concurrent writes from several threads a
+rare increment may be lost, which is acceptable for monitoring.
+"""
+
+import bisect
+import json
+import os
+from typing import Any, Dict, List, Sequence, Tuple
+
+# Latency buckets in seconds (upper bounds); +Inf is implicit
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0,
+)
+
+
+class CounterFamily:
+    """A counter with one label dimension."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str = "", label: str = ""):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.values: Dict[str, float] = {}
+
+    def inc(self, label_value: str = "", amount: float = 1):
+        self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def snapshot(self) -> Dict[str, float]:
+        return dict(self.values)
+
+    def reset(self):
+        self.values.clear()
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class HistogramFamily:
+    """A latency histogram with one label dimension."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", label: str = "",
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.buckets = tuple(buckets)
+        self.values: Dict[str, _Histogram] = {}
+
+    def observe(self, label_value: str, value: float):
+        histogram = self.values.get(label_value)
+        if histogram is None:
+            histogram = self.values[label_value] = _Histogram(len(self.buckets) + 1)
+        histogram.counts[bisect.bisect_left(self.buckets, value)] += 1
+        histogram.sum += value
+        histogram.count += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for label_value, histogram in list(self.values.items()):
+            cumulative, buckets = 0, {}
+            for bound, count in zip(self.buckets + (float("inf"),), histogram.counts):
+                cumulative += count
+                buckets["+Inf" if bound == float("inf") else repr(bound)] = cumulative
+            result[label_value] = {"count": histogram.count, "sum": histogram.sum, "buckets": buckets}
+        return result
+
+    def reset(self):
+        self.values.clear()
+
+
+class MetricsRegistry:
+    """Holds metric families and renders snapshots and exports."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._families: Dict[str, Any] = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def counter(self, name: str, help: str = "", label: str = "") -> CounterFamily:
+        return self._register(CounterFamily(name, help, label))
+
+    def histogram(self, name: str, help: str = "", label: str = "",
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> HistogramFamily:
+        return self._register(HistogramFamily(name, help, label, buckets))
+
+    def _register(self, family):
+        existing = self._families.get(family.name)
+        if existing is not None:
+            return existing
+        self._families[family.name] = family
+        return family
+
+    def reset(self):
+        """Zeroes every metric (families stay registered)."""
+        for family in self._families.values():
+            family.reset()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current values: ``{"counters": {name: {label: value}}, "histograms": {...}}``."""
+        result: Dict[str, Dict[str, Any]] = {"counters": {}, "histograms": {}}
+        for name, family in self._families.items():
+            result[family.kind + "s"][name] = family.snapshot()
+        return result
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), sort_keys=True)
+
+    def to_prometheus(self) -> str:
+        """Renders all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for name, family in self._families.items():
+            if family.help:
+                lines.append(f"# HELP {name} {family.help}")
+            lines.append(f"# TYPE {name} {family.kind}")
+            for label_value, value in sorted(family.snapshot().items()):
+                labels = self._labels(family.label, label_value)
+                if family.kind == "counter":
+                    lines.append(f"{name}{self._render(labels)} {value}")
+                    continue
+                for bound, count in value["buckets"].items():
+                    lines.append(f"{name}_bucket{self._render(labels + [('le', bound)])} {count}")
+                lines.append(f"{name}_sum{self._render(labels)} {value['sum']}")
+                lines.append(f"{name}_count{self._render(labels)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _labels(label: str, value: str) -> List[Tuple[str, str]]:
+        return [(label, value)] if label else []
+
+    @staticmethod
+    def _render(labels: List[Tuple[str, str]]) -> str:
+        if not labels:
+            return ""
+        escaped = (
+            (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+            for k, v in labels
+        )
+        return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+REGISTRY = MetricsRegistry(enabled=os.environ.get("KLIPPER_SDK_METRICS") == "1")
+
+DBUS_CALL_SECONDS = REGISTRY.histogram(
+    "klipper_dbus_call_seconds", "Latency of Klipper D-Bus method calls", label="method")
+DBUS_CALL_ERRORS = REGISTRY.counter(
+    "klipper_dbus_call_errors_total", "Failed Klipper D-Bus method calls", label="method")
+DBUS_CIRCUIT_REJECTIONS = REGISTRY.counter(
+    "klipper_dbus_circuit_rejections_total", "Calls failed fast by an open circuit", label="method")
+PRISM_INGEST_SECONDS = REGISTRY.histogram(
+    "klipper_prism_ingest_seconds", "Latency of PrismProtocol.ingest by payload type", label="type")
+PRISM_REFRACTIONS = REGISTRY.counter(
+    "klipper_prism_refractions_total", "Signals refracted by payload type", label="type")
+PRISM_ENTROPY = REGISTRY.counter(
+    "klipper_prism_entropy_total", "Entropic signals by entropy type", label="type")
+PRISM_INTEGRATIONS = REGISTRY.counter(
+    "klipper_prism_integrations_total", "Integrated results by outcome", label="outcome")
+CLUSTER_DELIVERY_SECONDS = REGISTRY.histogram(
+    "klipper_cluster_delivery_seconds", "Pulse delivery latency per listener", label="listener")
+CLUSTER_LISTENER_ERRORS = REGISTRY.counter(
+    "klipper_cluster_listener_errors_total", "Listener failures", label="listener")
@@ -0,0 +1,55 @@
+"""
+MIME type helpers: which clipboard payloads are text, and in which charset.
+
+Text is what ``text/*`` types, the textual ``application/*`` types in
+``TEXT_MIME_TYPES``, structured ``+xml``/``+json`` types and any type with a
+``charset`` parameter carry; everything else is treated as binary.
+"""
+
+import functools
+from typing import Optional, Tuple
+
+# Textual types outside text/*
+TEXT_MIME_TYPES = frozenset({
+    "application/ecmascript",
+    "application/javascript",
+    "application/json",
+    "application/sql",
+    "application/toml",
+    "application/x-javascript",
+    "application/x-sh",
+    "application/x-shellscript",
+    "application/x-www-form-urlencoded",
+    "application/x-yaml",
+    "application/xml",
+    "application/yaml",
+})
+TEXT_MIME_SUFFIXES = ("+xml", "+json")
+
+DEFAULT_CHARSET = "utf-8"
+
+
+@functools.lru_cache(maxsize=256)
+def parse_mime(mime_type: str) -> Tuple[str, Optional[str]]:
+    """Splits a MIME type into its lowercased ``type/subtype`` and its ``charset`` parameter, if any."""
+    essence, *parameters = mime_type.split(";")
+    charset = None
+    for parameter in parameters:
+        name, _, value = parameter.partition("=")
+        if name.strip().lower() == "charset" and value.strip():
+            charset = value.strip().strip('"')
+    return essence.strip().lower(), charset
+
+
+def is_text_mime(mime_type: str) -> bool:
+    """Whether a MIME type carries text (and so can travel over Klipper's D-Bus API)."""
+    essence, charset = parse_mime(mime_type)
+    if charset is not None:
+        # file(1) reports binary data as "charset=binary"
+        return charset.lower() != "binary"
+    return essence.startswith("text/") or essence in TEXT_MIME_TYPES or essence.endswith(TEXT_MIME_SUFFIXES)
+
+
+def mime_charset(mime_type: str) -> str:
+    """The declared charset of a text MIME type (UTF-8 when none is given)."""
+    return parse_mime(mime_type)[1] or DEFAULT_CHARSET
@@ -0,0 +1,278 @@
+"""
+Process-pool offload for CPU-heavy pulse listeners.
+
+Subscribing with an ``OffloadPool`` runs the listener's ``on_pulse`` in a
+worker process instead of inline on the emitting thread::
+
+    pool = OffloadPool(max_workers=4)
+    cluster.subscribe(Tokenizer(), vectors=["clipboard_change"], offload=pool)
+
+The listener is pickled once per subscription and written to a file in
+shared memory; each worker loads it on its first pulse for that subscription
+and caches it, so per pulse only the subscription id, the file name and the
+pulse fields travel to the worker.
+The parent-side listener receives the outcome on the cluster's loop:
+``on_result(pulse, result)`` and ``on_error(pulse, error)`` are called if it
+defines them, and errors are logged and counted like inline listener
+failures.
+
+At most ``max_pending`` pulses are in the pool at once; further pulses wait
+in a bounded queue (``max_queue``) and the oldest is dropped when it is full,
+so a burst never grows memory without bound or blocks the emitter.
+
+Like mailboxes, offloading needs a running event loop; pulses emitted
+without one are delivered inline.
+"""
+
+import asyncio
+import collections
+import concurrent.futures
+import inspect
+import logging
+import multiprocessing
+import os
+import pickle
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, Tuple, TYPE_CHECKING
+
+from .bridge import Pulse
+from .ids import IdSequence
+from .ipc import _shm_base
+from .metrics import CLUSTER_LISTENER_ERRORS, REGISTRY
+
+if TYPE_CHECKING:
+    from .bridge import NeuronalCluster, _Subscription
+
+logger = logging.getLogger(__name__)
+
+_channel_ids = IdSequence()
+
+# Worker-side cache of unpickled listeners, keyed by channel id
+_WORKER_LISTENERS: Dict[str, Any] = {}
+
+
+def _run_offloaded(key: str, listener_path: str, fields: Tuple[str, Any, str, float, str]) -> Any:
+    """Runs in a worker process: calls the cached listener's ``on_pulse``."""
+    listener = _WORKER_LISTENERS.get(key)
+    if listener is None:
+        with open(listener_path, "rb") as f:
+            listener = _WORKER_LISTENERS[key] = pickle.load(f)
+    ident, payload, vector, intensity, source = fields
+    result = listener.on_pulse(Pulse(id=ident, payload=payload, vector=vector,
+                                     intensity=intensity, source_node=source))
+    if inspect.isawaitable(result):
+        result = asyncio.run(_await(result))
+    return result
+
+
+async def _await(awaitable: Any) -> Any:
+    return await awaitable
+
+
+@dataclass
+class OffloadStats:
+    """Counters of an OffloadPool."""
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    dropped: int = 0
+    in_flight: int = 0
+    queued: int = 0
+
+
+class OffloadPool:
+    """
+    Bounded process pool shared by offloaded listeners.
+
+    Args:
+        max_workers: Worker processes (defaults to the CPU count)
+        max_pending: Pulses submitted to the workers at once (defaults to ``2 * max_workers``)
+        max_queue: Pulses waiting for a free slot; the oldest is dropped when full
+        mp_context: multiprocessing start method; ``"forkserver"`` where available,
+            since forking a process that runs GLib or loop threads is unsafe
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 max_queue: int = 1024, mp_context: Optional[str] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.max_workers
+        self.max_queue = max_queue
+        if mp_context is None:
+            methods = multiprocessing.get_all_start_methods()
+            mp_context = "forkserver" if "forkserver" in methods else "spawn"
+        self.mp_context = mp_context
+        self._executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        # Pickled listeners handed to the workers, by channel key
+        self._listener_dir: Optional[str] = None
+        self._listener_paths: Dict[str, str] = {}
+        self._queue: Deque[Tuple["_OffloadChannel", Pulse]] = collections.deque()
+        self._stats = OffloadStats()
+
+    @property
+    def stats(self) -> OffloadStats:
+        return OffloadStats(**{**vars(self._stats), "queued": len(self._queue)})
+
+    @property
+    def executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        """The worker pool (started on first use)."""
+        if self._executor is None:
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context(self.mp_context))
+        return self._executor
+
+    def channel(self, cluster: "NeuronalCluster", subscription: "_Subscription") -> "_OffloadChannel":
+        """Binds a subscription to the pool (called by ``NeuronalCluster.subscribe``)."""
+        return _OffloadChannel(self, cluster, subscription)
+
+    def shutdown(self, wait: bool = True):
+        """Stops the workers; queued pulses are discarded. The pool restarts if used again."""
+        self._queue.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+        if self._listener_dir is not None:
+            shutil.rmtree(self._listener_dir, ignore_errors=True)
+            self._listener_dir = None
+        self._listener_paths.clear()
+
+    # --- Scheduling ---
+
+    def _put(self, channel: "_OffloadChannel", pulse: Pulse):
+        if self._stats.in_flight < self.max_pending:
+            self._submit(channel, pulse)
+            return
+        if len(self._queue) >= self.max_queue:
+            dropped, _ = self._queue.popleft()
+            dropped._pending -= 1
+            dropped._settle()
+            self._stats.dropped += 1
+        self._queue.append((channel, pulse))
+
+    def _submit(self, channel: "_OffloadChannel", pulse: Pulse):
+        if channel.closed:
+            channel._pending -= 1
+            channel._settle()
+            return
+        fields = (pulse.id, pulse.payload, pulse.vector, pulse.intensity, pulse.source_node)
+        try:
+            path = self._listener_paths.get(channel.key) or self._write_listener(channel)
+            future = self.executor.submit(_run_offloaded, channel.key, path, fields)
+        except Exception as e:
+            # e.g. an unpicklable payload or a broken pool
+            channel._pending -= 1
+            self._stats.failed += 1
+            channel._failed(pulse, e)
+            channel._settle()
+            return
+        self._stats.submitted += 1
+        self._stats.in_flight += 1
+        loop = channel.loop
+        future.add_done_callback(
+            lambda f: loop.call_soon_threadsafe(self._finished, channel, pulse, f) if not loop.is_closed() else None
+        )
+
+    def _write_listener(self, channel: "_OffloadChannel") -> str:
+        if self._listener_dir is None:
+            self._listener_dir = tempfile.mkdtemp(prefix="klipper-sdk-offload-", dir=_shm_base())
+        path = os.path.join(self._listener_dir, channel.key)
+        with open(path, "wb") as f:
+            f.write(channel.blob)
+        self._listener_paths[channel.key] = path
+        return path
+
+    def _forget(self, channel: "_OffloadChannel"):
+        path = self._listener_paths.pop(channel.key, None)
+        if path is not None:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def _finished(self, channel: "_OffloadChannel", pulse: Pulse, future: concurrent.futures.Future):
+        self._stats.in_flight -= 1
+        try:
+            result = future.result()
+        except BaseException as e:
+            self._stats.failed += 1
+            channel._failed(pulse, e)
+        else:
+            self._stats.completed += 1
+            channel._succeeded(pulse, result)
+        finally:
+            channel._pending -= 1
+            channel._settle()
+            while self._queue and self._stats.in_flight < self.max_pending:
+                self._submit(*self._queue.popleft())
+
+
+class _OffloadChannel:
+    """One offloaded subscription: delivers pulses to the pool and outcomes back to the listener."""
+
+    def __init__(self, pool: OffloadPool, cluster: "NeuronalCluster", subscription: "_Subscription"):
+        self.pool = pool
+        self.cluster = cluster
+        self.subscription = subscription
+        self.key = _channel_ids()
+        # Pickled once, so a listener a worker could not receive fails at subscribe time
+        try:
+            self.blob = pickle.dumps(subscription.listener, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            raise TypeError(f"Offloaded listener {subscription.listener!r} is not picklable: {e}") from e
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.closed = False
+        self._pending = 0
+        self._idle: Optional[asyncio.Event] = None
+
+    def put(self, pulse: Pulse):
+        """Queues a pulse for the pool. Needs a running loop, like mailboxes."""
+        if self.closed:
+            return
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+            self._idle = asyncio.Event()
+            self._idle.set()
+        self._pending += 1
+        self._idle.clear()
+        self.pool._put(self, pulse)
+
+    async def join(self):
+        if self._idle is not None:
+            await self._idle.wait()
+
+    def close(self):
+        self.closed = True
+        self._settle()
+
+    def _settle(self):
+        if self._pending > 0:
+            return
+        self._pending = 0
+        if self._idle is not None:
+            self._idle.set()
+        if self.closed:
+            # Nothing in flight can still need the pickled listener
+            self.pool._forget(self)
+
+    def _succeeded(self, pulse: Pulse, result: Any):
+        callback = getattr(self.subscription.listener, "on_result", None)
+        if callback is None or self.closed:
+            return
+        try:
+            callback(pulse, result)
+        except Exception as e:
+            logger.error("Offload result handler of %s failed: %s", self.subscription.listener, e)
+
+    def _failed(self, pulse: Pulse, error: BaseException):
+        listener = self.subscription.listener
+        logger.error("Synapse failure in offloaded listener %s: %s", listener, error)
+        if REGISTRY.enabled:
+            CLUSTER_LISTENER_ERRORS.inc(type(listener).__name__)
+        callback = getattr(listener, "on_error", None)
+        if callback is None or self.closed:
+            return
+        try:
+            callback(pulse, error)
+        except Exception as e:
+            logger.error("Offload error handler of %s failed: %s", listener, e)
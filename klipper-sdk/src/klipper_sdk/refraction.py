@@ -0,0 +1,134 @@
+"""
+Refraction rules for the PRISM_OF_COHERENCE protocol.
+
+A rule decides whether a payload is entropy and, if so, of which type. The
+Prism dispatches on the payload's type through a cache, so only rules that
+can apply to that type are evaluated, and payloads of types no rule cares
+about skip classification entirely.
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union
+
+
+class RefractionRule:
+    """
+    Base class of refraction rules.
+
+    Subclasses set ``types`` (payload types the rule applies to, matched with
+    ``issubclass``) and implement :meth:`matches`.
+    """
+
+    entropy_type: str = "Entropy"
+    types: Tuple[type, ...] = (object,)
+
+    def matches(self, payload: Any) -> bool:
+        raise NotImplementedError
+
+    def classify(self, payload: Any) -> str:
+        """The entropy type reported for a matching payload."""
+        return self.entropy_type
+
+
+class ExceptionRule(RefractionRule):
+    """Exceptions are high entropy, typed by their class name."""
+
+    entropy_type = "Exception"
+    types = (Exception,)
+
+    def matches(self, payload: Any) -> bool:
+        return True
+
+    def classify(self, payload: Any) -> str:
+        return f"Exception:{type(payload).__name__}"
+
+
+class KeywordRule(RefractionRule):
+    """
+    Case-insensitive keyword match on strings.
+
+    Uses one compiled pattern and searches the payload in place, so no
+    lowercased copy is made. ``scan_window`` limits the search to the first
+    N characters, keeping the cost flat for multi-megabyte payloads.
+    """
+
+    types = (str,)
+
+    def __init__(self, entropy_type: str, keywords: Iterable[str], scan_window: Optional[int] = None):
+        self.entropy_type = entropy_type
+        self.keywords = tuple(keywords)
+        if not self.keywords:
+            raise ValueError("KeywordRule needs at least one keyword")
+        self.scan_window = scan_window
+        self._pattern = re.compile("|".join(re.escape(k) for k in self.keywords), re.IGNORECASE)
+
+    def matches(self, payload: Any) -> bool:
+        if self.scan_window is None:
+            return self._pattern.search(payload) is not None
+        return self._pattern.search(payload, 0, self.scan_window) is not None
+
+
+class EmptyRule(RefractionRule):
+    """None and empty containers carry no information."""
+
+    entropy_type = "EmptySignal"
+    types = (type(None), str, list, dict)
+
+    def matches(self, payload: Any) -> bool:
+        return not payload
+
+
+class PredicateRule(RefractionRule):
+    """Adapts a plain callable into a rule."""
+
+    def __init__(self, entropy_type: str, predicate: Callable[[Any], bool],
+                 types: Union[type, Tuple[type, ...]] = object):
+        self.entropy_type = entropy_type
+        self.predicate = predicate
+        self.types = types if isinstance(types, tuple) else (types,)
+
+    def matches(self, payload: Any) -> bool:
+        return bool(self.predicate(payload))
+
+
+def default_rules(scan_window: Optional[int] = None) -> List[RefractionRule]:
+    """The built-in rules, in evaluation order."""
+    return [
+        ExceptionRule(),
+        KeywordRule("StringError", ("error", "exception"), scan_window=scan_window),
+        EmptyRule(),
+    ]
+
+
+class RuleEngine:
+    """Ordered rule set with a per-type dispatch cache."""
+
+    def __init__(self, rules: Optional[Iterable[RefractionRule]] = None):
+        self._rules: List[RefractionRule] = list(default_rules() if rules is None else rules)
+        self._dispatch: Dict[Type[Any], Tuple[RefractionRule, ...]] = {}
+
+    @property
+    def rules(self) -> Tuple[RefractionRule, ...]:
+        return tuple(self._rules)
+
+    def register(self, rule: RefractionRule, first: bool = False):
+        """Adds a rule after the existing ones (or before them with ``first=True``)."""
+        if first:
+            self._rules.insert(0, rule)
+        else:
+            self._rules.append(rule)
+        self._dispatch.clear()
+
+    def rules_for(self, kind: Type[Any]) -> Tuple[RefractionRule, ...]:
+        """Rules that can apply to payloads of this type (cached)."""
+        rules = self._dispatch.get(kind)
+        if rules is None:
+            rules = self._dispatch[kind] = tuple(r for r in self._rules if issubclass(kind, r.types))
+        return rules
+
+    def classify(self, payload: Any) -> Optional[str]:
+        """Returns the entropy type of the first matching rule, or None if coherent."""
+        for rule in self.rules_for(type(payload)):
+            if rule.matches(payload):
+                return rule.classify(payload)
+        return None
@@ -0,0 +1,215 @@
+"""
+Fail-fast protection for Klipper D-Bus calls.
+
+``CircuitBreaker`` keeps one circuit per method. Failures that Prism
+classifies as unavailability (lost connection, timeouts, Klipper not on the
+bus) count against the circuit; after ``failure_threshold`` consecutive ones
+it opens and calls fail immediately with ``CircuitOpenError``. After
+``reset_timeout`` seconds one probe call is let through (half-open): success
+closes the circuit, failure opens it again.
+
+``Backoff`` yields the jittered delays KlipperClient waits between
+background reconnect attempts.
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+
+from .transport import DBusError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Prism entropy types (see refraction.ExceptionRule) that mean Klipper is unreachable
+UNAVAILABLE_ENTROPY: FrozenSet[str] = frozenset({
+    "Exception:ConnectionError",
+    "Exception:ConnectionRefusedError",
+    "Exception:ConnectionResetError",
+    "Exception:ConnectionAbortedError",
+    "Exception:BrokenPipeError",
+    "Exception:TimeoutError",
+})
+
+# D-Bus errors (entropy type "Exception:DBusError") that mean the same
+UNAVAILABLE_DBUS_ERRORS: FrozenSet[str] = frozenset({
+    "org.freedesktop.DBus.Error.ServiceUnknown",
+    "org.freedesktop.DBus.Error.NameHasNoOwner",
+    "org.freedesktop.DBus.Error.NoReply",
+    "org.freedesktop.DBus.Error.Timeout",
+    "org.freedesktop.DBus.Error.TimedOut",
+    "org.freedesktop.DBus.Error.Disconnected",
+})
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of calling a method whose circuit is open."""
+
+    def __init__(self, method: str, retry_in: float):
+        super().__init__(f"Circuit for {method} is open; retry in {retry_in:.3f}s")
+        self.method = method
+        self.retry_in = retry_in
+
+
+@dataclass
+class BreakerStats:
+    """Counters of a CircuitBreaker."""
+    failures: int = 0
+    rejected: int = 0
+    opened: int = 0
+    closed: int = 0
+
+
+class _Circuit:
+    __slots__ = ("state", "failures", "opened_at", "probing")
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+
+class CircuitBreaker:
+    """
+    Per-method circuit breaker.
+
+    Args:
+        failure_threshold: Consecutive unavailability failures that open a circuit
+        reset_timeout: Seconds an open circuit waits before a half-open probe
+        unavailable_entropy: Prism entropy types counted as failures
+        unavailable_dbus_errors: D-Bus error names counted as failures
+
+    Other failures (e.g. invalid arguments) leave the circuit alone.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 1.0,
+                 unavailable_entropy: Iterable[str] = UNAVAILABLE_ENTROPY,
+                 unavailable_dbus_errors: Iterable[str] = UNAVAILABLE_DBUS_ERRORS):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.unavailable_entropy = frozenset(unavailable_entropy)
+        self.unavailable_dbus_errors = frozenset(unavailable_dbus_errors)
+        self._lock = threading.Lock()
+        self._circuits: Dict[str, _Circuit] = {}
+        self._stats = BreakerStats()
+
+    @property
+    def stats(self) -> BreakerStats:
+        """A copy of the counters."""
+        return BreakerStats(**vars(self._stats))
+
+    def state(self, method: str) -> str:
+        """``"closed"``, ``"open"`` or ``"half_open"``."""
+        circuit = self._circuits.get(method)
+        return circuit.state if circuit is not None else CLOSED
+
+    def before_call(self, method: str):
+        """
+        Admits a call or rejects it.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a probe in flight.
+        """
+        circuit = self._circuits.get(method)
+        if circuit is None or circuit.state == CLOSED:
+            return
+        with self._lock:
+            if circuit.state == OPEN:
+                retry_in = circuit.opened_at + self.reset_timeout - time.monotonic()
+                if retry_in > 0:
+                    self._stats.rejected += 1
+                    raise CircuitOpenError(method, retry_in)
+                circuit.state = HALF_OPEN
+                circuit.probing = False
+            if circuit.state == HALF_OPEN:
+                if circuit.probing:
+                    self._stats.rejected += 1
+                    raise CircuitOpenError(method, self.reset_timeout)
+                circuit.probing = True
+
+    def abandon_call(self, method: str):
+        """
+        Forgets an admitted call that ended without an outcome (e.g. it was
+        cancelled), so a half-open circuit admits the next probe.
+        """
+        circuit = self._circuits.get(method)
+        if circuit is None or not circuit.probing:
+            return
+        with self._lock:
+            circuit.probing = False
+
+    def record_success(self, method: str):
+        circuit = self._circuits.get(method)
+        if circuit is None or (circuit.state == CLOSED and not circuit.failures):
+            return
+        with self._lock:
+            if circuit.state != CLOSED:
+                self._stats.closed += 1
+            circuit.state = CLOSED
+            circuit.failures = 0
+            circuit.probing = False
+
+    def record_failure(self, method: str, entropy_type: Optional[str], error: Any = None) -> bool:
+        """
+        Counts a failed call classified by Prism as ``entropy_type``.
+
+        Returns:
+            True if this failure opened the circuit.
+        """
+        if not self.is_unavailable(entropy_type, error):
+            # The call reached Klipper; a half-open probe has done its job
+            self.record_success(method)
+            return False
+        with self._lock:
+            circuit = self._circuits.get(method)
+            if circuit is None:
+                circuit = self._circuits[method] = _Circuit()
+            self._stats.failures += 1
+            circuit.failures += 1
+            circuit.probing = False
+            if circuit.state == HALF_OPEN or circuit.failures >= self.failure_threshold:
+                opened = circuit.state != OPEN
+                circuit.state = OPEN
+                circuit.opened_at = time.monotonic()
+                if opened:
+                    self._stats.opened += 1
+                return opened
+            return False
+
+    def is_unavailable(self, entropy_type: Optional[str], error: Any = None) -> bool:
+        """Whether a failure means Klipper could not be reached."""
+        if entropy_type in self.unavailable_entropy:
+            return True
+        return isinstance(error, DBusError) and error.name in self.unavailable_dbus_errors
+
+    def reset(self):
+        """Closes every circuit (e.g. after a successful reconnect)."""
+        with self._lock:
+            for circuit in self._circuits.values():
+                if circuit.state != CLOSED:
+                    self._stats.closed += 1
+            self._circuits.clear()
+
+
+class Backoff:
+    """
+    Exponential backoff with full jitter: attempt ``n`` waits a uniformly
+    random time in ``[0, min(maximum, initial * multiplier ** n)]``.
+    """
+
+    def __init__(self, initial: float = 0.1, maximum: float = 30.0, multiplier: float = 2.0,
+                 rng: Optional[random.Random] = None):
+        self.initial = initial
+        self.maximum = maximum
+        self.multiplier = multiplier
+        self._random = rng or random.Random()
+
+    def delay(self, attempt: int) -> float:
+        ceiling = self.maximum if attempt >= 64 else min(self.maximum, self.initial * self.multiplier ** attempt)
+        return self._random.uniform(0, ceiling)
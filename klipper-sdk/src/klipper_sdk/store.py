@@ -0,0 +1,575 @@
+import base64
+import binascii
+import functools
+import hashlib
+import logging
+import mmap
+import os
+import shutil
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from .controllers import HistoryItem, Payload, decode_text
+from .mime import is_text_mime
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+# Where a blob's payload lives (blobs.spill)
+INLINE = 0
+SPILLED_BYTES = 1
+SPILLED_TEXT = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash     TEXT PRIMARY KEY,
+    content  BLOB,
+    size     INTEGER NOT NULL,
+    refcount INTEGER NOT NULL,
+    spill    INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS history (
+    seq       INTEGER PRIMARY KEY AUTOINCREMENT,
+    uuid      TEXT NOT NULL UNIQUE,
+    hash      TEXT NOT NULL REFERENCES blobs(hash),
+    mime_type TEXT NOT NULL,
+    timestamp REAL NOT NULL
+);
+"""
+
+_SELECT = (
+    "SELECT history.seq, history.uuid, history.hash, blobs.content, blobs.spill, blobs.size, "
+    "history.mime_type, history.timestamp "
+    "FROM history JOIN blobs ON blobs.hash = history.hash "
+)
+
+
+def _encode(content: Payload) -> Tuple[Union[bytes, memoryview], bool]:
+    """Returns the payload's bytes (buffers are viewed, not copied) and whether it is text."""
+    if isinstance(content, str):
+        return content.encode("utf-8", "surrogatepass"), True
+    view = memoryview(content)
+    return (view if view.format == "B" and view.ndim == 1 else view.cast("B")), False
+
+
+def _hash(data: Union[bytes, memoryview], is_text: bool) -> str:
+    digest = hashlib.blake2b(b"s" if is_text else b"b", digest_size=20)
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def default_history_path() -> str:
+    """``$XDG_DATA_HOME/klipper-sdk/history.sqlite3`` (``~/.local/share`` when unset)."""
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(data_home, "klipper-sdk", "history.sqlite3")
+
+
+def encode_cursor(seq: int) -> str:
+    """Opaque page token for the position just below ``seq``."""
+    return base64.urlsafe_b64encode(struct.pack(">Q", seq)).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Inverse of :func:`encode_cursor`. Raises ValueError for malformed tokens."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        (seq,) = struct.unpack(">Q", raw)
+    except (binascii.Error, struct.error, TypeError) as e:
+        raise ValueError(f"Invalid history cursor: {cursor!r}") from e
+    return seq
+
+
+def content_hash(content: Payload) -> str:
+    """
+    Content address of a payload. Text and bytes with the same encoding hash
+    differently, so each round-trips with its own type.
+    """
+    return _hash(*_encode(content))
+
+
+_UNLOADED = object()
+_content_slot = HistoryItem.__dict__["content"]
+
+
+class SpilledHistoryItem(HistoryItem):
+    """
+    A HistoryItem whose payload lives in a spill file. The file is memory-mapped
+    on first access: binary content is a read-only ``memoryview`` of the mapping
+    (paged in by the OS as it is read), text is decoded on every access and not
+    retained. Content of a removed entry is no longer available.
+    """
+
+    __slots__ = ("_loader", "size")
+
+    def __init__(self, loader: Callable[[], Any], size: int, **fields: Any):
+        self._loader = loader
+        self.size = size
+        HistoryItem.__init__(self, _UNLOADED, **fields)
+
+    @property
+    def content(self) -> Union[str, memoryview]:
+        value = _content_slot.__get__(self)
+        if value is _UNLOADED:
+            value = self._loader()
+            if isinstance(value, memoryview):
+                _content_slot.__set__(self, value)
+        return value
+
+    @content.setter
+    def content(self, value: Any):
+        _content_slot.__set__(self, value)
+
+    def __repr__(self) -> str:
+        return (f"SpilledHistoryItem(size={self.size}, uuid={self.uuid!r}, "
+                f"mime_type={self.mime_type!r}, timestamp={self.timestamp!r})")
+
+
+@dataclass
+class StoreStats:
+    """Deduplication counters of a HistoryStore."""
+    entries: int = 0
+    blobs: int = 0
+    stored_bytes: int = 0
+    referenced_bytes: int = 0
+    spilled_blobs: int = 0
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Referenced payload bytes per stored byte (1.0 = no sharing)."""
+        return self.referenced_bytes / self.stored_bytes if self.stored_bytes else 1.0
+
+
+class HistoryStore:
+    """
+    Local, persistent clipboard history log.
+
+    Entries are appended (newest has the highest sequence number) to a SQLite
+    database in WAL mode, so opening a large history is O(1) and reads never
+    touch D-Bus. ``path=None`` (or ``":memory:"``) keeps the log in memory for
+    the lifetime of the process; ``default_history_path()`` is where
+    KlipperClient keeps it by default.
+
+    Retention: beyond ``max_entries`` the oldest entries are pruned as new
+    ones arrive, and entries older than ``max_age`` seconds are pruned on open
+    and at most every ``AGE_CHECK_INTERVAL`` seconds while appending. Pruning
+    releases blob references, so unreferenced blobs and their spill files go
+    with the last entry using them. ``on_prune`` callbacks receive the UUIDs
+    of pruned entries.
+
+    Payloads are content-addressed: entries reference a refcounted blob by
+    hash, so re-copying a snippet adds a small record rather than another
+    copy of the data, and items loaded from the same blob share one content
+    object. Storage grows with unique content, not with copy events.
+
+    Payloads larger than ``spill_threshold`` bytes are written to files in
+    ``spill_dir`` (next to the database, or a temporary directory for an
+    in-memory store) and come back as lazily mapped SpilledHistoryItems, so
+    memory use does not depend on payload size. ``None`` disables spilling.
+
+    The store is safe to use from the GLib signal thread and the event loop.
+    """
+
+    # Recently loaded payloads, by hash, shared between the items built from them
+    SHARED_CONTENT_SIZE = 1024
+    SPILL_THRESHOLD = 1024 * 1024
+    AGE_CHECK_INTERVAL = 60.0
+    # Spill files younger than this may belong to a blob another process is still committing
+    ORPHAN_GRACE = 60.0
+
+    def __init__(self, path: Optional[str] = None, spill_threshold: Optional[int] = SPILL_THRESHOLD,
+                 spill_dir: Optional[str] = None, max_entries: Optional[int] = None,
+                 max_age: Optional[float] = None):
+        if path == ":memory:":
+            path = None
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._prune_listeners: List[Callable[[List[str]], None]] = []
+        self._age_checked = 0.0
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.spill_threshold = spill_threshold
+        self._cleanup: Optional[weakref.finalize] = None
+        if spill_dir is None:
+            if path is not None:
+                spill_dir = os.path.abspath(path) + ".blobs"
+            else:
+                spill_dir = tempfile.mkdtemp(prefix="klipper-sdk-blobs-")
+                self._cleanup = weakref.finalize(self, shutil.rmtree, spill_dir, True)
+        self.spill_dir = spill_dir
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False, isolation_level=None)
+        if path is not None:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._shared: "OrderedDict[str, Any]" = OrderedDict()
+        self._create_schema()
+        self._count = self._db.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+        self._latest: Optional[Tuple[int, HistoryItem, str]] = self._fetch_latest()
+        if path is not None:
+            self._sweep_orphans()
+        self._prune(check_age=True)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._count
+
+    def on_prune(self, callback: Callable[[List[str]], None]):
+        """Registers a callback receiving the UUIDs of entries removed by retention."""
+        self._prune_listeners.append(callback)
+
+    @property
+    def stats(self) -> StoreStats:
+        """Entry and blob counts, and payload bytes stored versus referenced."""
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+            blobs, stored, referenced, spilled = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(size * refcount), 0), "
+                "COUNT(NULLIF(spill, 0)) FROM blobs"
+            ).fetchone()
+        return StoreStats(entries=entries, blobs=blobs, stored_bytes=stored,
+                          referenced_bytes=referenced, spilled_blobs=spilled)
+
+    def append(self, content: Payload, mime_type: str = "text/plain") -> HistoryItem:
+        """
+        Appends an entry as the newest history item.
+        A repeat of the newest entry is collapsed into it and not stored twice;
+        a repeat of an older entry references its existing blob.
+
+        Buffers (bytes, bytearray, memoryview) are hashed and spilled without
+        copying; small ones are copied once into the store.
+        """
+        data, is_text = _encode(content)
+        digest = _hash(data, is_text)
+        with self._lock:
+            with self._transaction():
+                # Other stores on the same file may have appended meanwhile; the write lock is held from here
+                self._refresh()
+                if self._latest is not None:
+                    _, latest, latest_digest = self._latest
+                    if latest_digest == digest and latest.mime_type == mime_type:
+                        return latest
+                size = len(data)
+                row = self._db.execute("SELECT content, spill FROM blobs WHERE hash = ?", (digest,)).fetchone()
+                if row is not None:
+                    stored, spill = row
+                elif self.spill_threshold is not None and size > self.spill_threshold:
+                    spill = SPILLED_TEXT if is_text else SPILLED_BYTES
+                    stored = None
+                    self._write_spill(digest, data)
+                else:
+                    spill = INLINE
+                    # Immutable payloads are kept as is; mutable buffers are detached from the caller
+                    stored = content if isinstance(content, (str, bytes)) else bytes(data)
+                item = self._make_item(None, digest, stored, spill, size, mime_type, time.time())
+                self._db.execute(
+                    "INSERT INTO blobs (hash, content, size, refcount, spill) VALUES (?, ?, ?, 1, ?) "
+                    "ON CONFLICT(hash) DO UPDATE SET refcount = refcount + 1",
+                    (digest, stored, size, spill),
+                )
+                cursor = self._db.execute(
+                    "INSERT INTO history (uuid, hash, mime_type, timestamp) VALUES (?, ?, ?, ?)",
+                    (item.uuid, digest, item.mime_type, item.timestamp),
+                )
+            self._latest = (cursor.lastrowid, item, digest)
+            self._count += 1
+            self._prune(check_age=time.monotonic() - self._age_checked >= self.AGE_CHECK_INTERVAL)
+            return item
+
+    def bump(self, uuid: str) -> Optional[HistoryItem]:
+        """
+        Moves an existing entry to the top of the history (as a re-copy would)
+        without storing its payload again. Returns the bumped item, or None.
+        """
+        with self._lock:
+            row = self._db.execute(_SELECT + "WHERE history.uuid = ?", (uuid,)).fetchone()
+            if row is None:
+                return None
+            item = self._to_item(row[1:])
+            item.timestamp = time.time()
+            with self._transaction():
+                self._db.execute("DELETE FROM history WHERE uuid = ?", (uuid,))
+                cursor = self._db.execute(
+                    "INSERT INTO history (uuid, hash, mime_type, timestamp) VALUES (?, ?, ?, ?)",
+                    (item.uuid, row[2], item.mime_type, item.timestamp),
+                )
+            self._latest = (cursor.lastrowid, item, row[2])
+            return item
+
+    def latest(self) -> Optional[HistoryItem]:
+        """Returns the newest entry, if any."""
+        latest = self._latest
+        return latest[1] if latest else None
+
+    def latest_is_text(self, text: str) -> bool:
+        """
+        Whether the newest entry holds ``text``, whatever payload form and text
+        MIME type it was appended with (Klipper reports every clipboard change
+        as a plain string).
+        """
+        latest = self.latest()
+        if latest is None or not is_text_mime(latest.mime_type):
+            return False
+        content = latest.content
+        if isinstance(content, str):
+            return content == text
+        try:
+            return decode_text(content, latest.mime_type) == text
+        except ValueError:
+            return False
+
+    def items(self, limit: Optional[int] = None, offset: int = 0) -> List[HistoryItem]:
+        """Returns entries newest first, with pagination pushed down to the store."""
+        with self._lock:
+            rows = self._db.execute(
+                _SELECT + "ORDER BY history.seq DESC LIMIT ? OFFSET ?",
+                (-1 if limit is None else limit, offset),
+            ).fetchall()
+            return [self._to_item(row[1:]) for row in rows]
+
+    def page(self, limit: int, cursor: Optional[str] = None) -> Tuple[List[HistoryItem], Optional[str]]:
+        """
+        Returns up to ``limit`` entries older than ``cursor`` (newest first when
+        None) and the cursor of the next page, or None after the last page.
+
+        Keyset pagination on the sequence number: each page is one index range
+        scan, however deep into the history it is, and only the returned rows
+        are materialized. Entries appended or bumped meanwhile do not shift it.
+        """
+        before = decode_cursor(cursor) if cursor is not None else None
+        with self._lock:
+            if before is None:
+                rows = self._db.execute(
+                    _SELECT + "ORDER BY history.seq DESC LIMIT ?", (limit + 1,)
+                ).fetchall()
+            else:
+                rows = self._db.execute(
+                    _SELECT + "WHERE history.seq < ? ORDER BY history.seq DESC LIMIT ?", (before, limit + 1)
+                ).fetchall()
+            more = len(rows) > limit
+            rows = rows[:limit]
+            items = [self._to_item(row[1:]) for row in rows]
+        return items, (encode_cursor(rows[-1][0]) if more and rows else None)
+
+    def items_after(self, seq: int) -> List[Tuple[int, HistoryItem]]:
+        """Returns ``(seq, item)`` pairs appended after ``seq``, oldest first."""
+        return [(seq, item) for seq, _, item in self.entries_after(seq)]
+
+    def entries_after(self, seq: int) -> List[Tuple[int, str, HistoryItem]]:
+        """Like :meth:`items_after`, with each entry's content hash: ``(seq, hash, item)``."""
+        with self._lock:
+            rows = self._db.execute(
+                _SELECT + "WHERE history.seq > ? ORDER BY history.seq",
+                (seq,),
+            ).fetchall()
+            return [(row[0], row[2], self._to_item(row[1:])) for row in rows]
+
+    def remove(self, uuid: str) -> bool:
+        """Removes an entry by UUID, releasing its blob. Returns True if it existed."""
+        with self._lock:
+            row = self._db.execute("SELECT hash FROM history WHERE uuid = ?", (uuid,)).fetchone()
+            if row is None:
+                return False
+            with self._transaction():
+                self._db.execute("DELETE FROM history WHERE uuid = ?", (uuid,))
+                spilled = self._release(row[0])
+            self._count -= 1
+            if spilled:
+                self._unlink_spill(row[0])
+            if self._latest is not None and self._latest[1].uuid == uuid:
+                self._latest = self._fetch_latest()
+            return True
+
+    def clear(self):
+        """Removes every entry and blob."""
+        with self._lock:
+            spilled = [row[0] for row in self._db.execute("SELECT hash FROM blobs WHERE spill != 0")]
+            with self._transaction():
+                self._db.execute("DELETE FROM history")
+                self._db.execute("DELETE FROM blobs")
+            for digest in spilled:
+                self._unlink_spill(digest)
+            self._shared.clear()
+            self._latest = None
+            self._count = 0
+
+    def prune(self) -> int:
+        """Applies ``max_entries`` and ``max_age`` now. Returns the number of entries removed."""
+        with self._lock:
+            return self._prune(check_age=True)
+
+    def close(self):
+        """Closes the underlying database (and drops a temporary spill directory)."""
+        with self._lock:
+            self._db.close()
+            if self._cleanup is not None:
+                self._cleanup()
+
+    def _prune(self, check_age: bool) -> int:
+        """Removes entries beyond the retention limits (called with the lock held)."""
+        self._refresh()
+        rows: List[Tuple[int, str, str]] = []
+        if check_age and self.max_age is not None:
+            self._age_checked = time.monotonic()
+            rows = self._db.execute(
+                "SELECT seq, uuid, hash FROM history WHERE timestamp < ? ORDER BY seq",
+                (time.time() - self.max_age,),
+            ).fetchall()
+        if self.max_entries is not None and self._count - len(rows) > self.max_entries:
+            aged = {row[0] for row in rows}
+            excess = self._count - len(rows) - self.max_entries
+            oldest = self._db.execute(
+                "SELECT seq, uuid, hash FROM history ORDER BY seq LIMIT ?", (excess + len(rows),)
+            ).fetchall()
+            rows += [row for row in oldest if row[0] not in aged][:excess]
+        if not rows:
+            return 0
+        spilled = []
+        with self._transaction():
+            self._db.executemany("DELETE FROM history WHERE seq = ?", [(row[0],) for row in rows])
+            for _, _, digest in rows:
+                if self._release(digest):
+                    spilled.append(digest)
+        for digest in spilled:
+            self._unlink_spill(digest)
+        self._count -= len(rows)
+        if self._latest is not None and any(row[0] == self._latest[0] for row in rows):
+            self._latest = self._fetch_latest()
+        uuids = [row[1] for row in rows]
+        for callback in self._prune_listeners:
+            try:
+                callback(uuids)
+            except Exception as e:
+                logger.error("History prune callback failure: %s", e)
+        return len(rows)
+
+    def _sweep_orphans(self):
+        """Deletes spill files no blob refers to (left behind by a crash between write and commit)."""
+        try:
+            names = os.listdir(self.spill_dir)
+        except FileNotFoundError:
+            return
+        referenced = {row[0] for row in self._db.execute("SELECT hash FROM blobs WHERE spill != 0")}
+        deadline = time.time() - self.ORPHAN_GRACE
+        for name in names:
+            if name in referenced or len(name) != 40 or name.strip("0123456789abcdef"):
+                continue
+            path = os.path.join(self.spill_dir, name)
+            try:
+                if os.stat(path).st_mtime < deadline:
+                    os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def _refresh(self):
+        """Picks up entries written through other connections to the same file (called with the lock held)."""
+        if self.path is None:
+            return
+        seq = self._db.execute("SELECT MAX(seq) FROM history").fetchone()[0]
+        if seq != (self._latest[0] if self._latest else None):
+            self._latest = self._fetch_latest()
+            self._count = self._db.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        # IMMEDIATE takes the write lock up front, so a read-then-write never fails to upgrade
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _release(self, digest: str) -> bool:
+        """Drops one reference to a blob. Returns True if a spilled blob was deleted."""
+        self._db.execute("UPDATE blobs SET refcount = refcount - 1 WHERE hash = ?", (digest,))
+        row = self._db.execute("SELECT spill FROM blobs WHERE hash = ? AND refcount <= 0", (digest,)).fetchone()
+        if row is None:
+            return False
+        self._db.execute("DELETE FROM blobs WHERE hash = ?", (digest,))
+        self._shared.pop(digest, None)
+        return row[0] != INLINE
+
+    def _share(self, digest: str, content: Any) -> Any:
+        """Returns the shared content object for ``digest``, registering ``content`` if new."""
+        shared = self._shared
+        existing = shared.get(digest)
+        if existing is not None:
+            shared.move_to_end(digest)
+            return existing
+        shared[digest] = content
+        if len(shared) > self.SHARED_CONTENT_SIZE:
+            shared.popitem(last=False)
+        return content
+
+    # --- Spill files ---
+
+    def _spill_path(self, digest: str) -> str:
+        return os.path.join(self.spill_dir, digest)
+
+    def _write_spill(self, digest: str, data: Union[bytes, memoryview]):
+        path = self._spill_path(digest)
+        if os.path.exists(path):
+            return
+        os.makedirs(self.spill_dir, exist_ok=True)
+        partial = f"{path}.{os.getpid()}.tmp"
+        with open(partial, "wb") as f:
+            f.write(data)
+        os.replace(partial, path)
+
+    def _unlink_spill(self, digest: str):
+        try:
+            os.unlink(self._spill_path(digest))
+        except FileNotFoundError:
+            pass
+
+    def _map_spill(self, digest: str, spill: int) -> Union[str, memoryview]:
+        with open(self._spill_path(digest), "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if spill == SPILLED_TEXT:
+            try:
+                return str(mapping, "utf-8", "surrogatepass")
+            finally:
+                mapping.close()
+        # The view keeps the mapping open; pages are read in as they are touched
+        return memoryview(mapping)
+
+    # --- Rows ---
+
+    def _fetch_latest(self) -> Optional[Tuple[int, HistoryItem, str]]:
+        row = self._db.execute(_SELECT + "ORDER BY history.seq DESC LIMIT 1").fetchone()
+        return (row[0], self._to_item(row[1:]), row[2]) if row else None
+
+    def _to_item(self, row: Tuple[Any, ...]) -> HistoryItem:
+        return self._make_item(*row)
+
+    def _make_item(self, uuid: Optional[str], digest: str, content: Any, spill: int, size: int,
+                   mime_type: str, timestamp: float) -> HistoryItem:
+        fields: Dict[str, Any] = {"mime_type": mime_type, "timestamp": timestamp}
+        if uuid is not None:
+            fields["uuid"] = uuid
+        if spill != INLINE:
+            return SpilledHistoryItem(functools.partial(self._map_spill, digest, spill), size, **fields)
+        return HistoryItem(content=self._share(digest, content), **fields)
+
+    def _create_schema(self):
+        """Creates the tables of a new log."""
+        if self._db.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        with self._transaction():
+            # executescript() would commit the open transaction, so run statements one by one
+            for statement in _SCHEMA.split(";"):
+                if statement.strip():
+                    self._db.execute(statement)
+            self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
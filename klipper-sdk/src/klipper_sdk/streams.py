@@ -0,0 +1,324 @@
+"""
+Async streams over cluster pulses.
+
+``NeuronalCluster.stream()`` subscribes a ``PulseStream`` and returns it::
+
+    async for batch in cluster.stream("clipboard_change").debounce(0.3).map(lambda p: p.payload):
+        ...
+
+Operators are applied synchronously on the emit path, as each pulse
+arrives, so pulses that are filtered out, deduplicated or collapsed by a
+window never wake the consumer. The time-based operators keep at most one
+timer per window on the event loop (not one per pulse). Only values that
+leave the last operator are queued for the iterator.
+
+Operators extend the stream in place and return it; add them before
+iterating. Durations are in seconds.
+"""
+
+import asyncio
+import collections
+from typing import Any, Callable, Deque, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .bridge import NeuronalCluster, Pulse
+
+_NOTHING = object()
+
+
+class _Operator:
+    """Base stage: forwards values to the next stage."""
+
+    def __init__(self, stream: "PulseStream"):
+        self.stream = stream
+        self.downstream: Optional[_Operator] = None
+
+    def push(self, value: Any):
+        self.downstream.push(value)
+
+    def close(self):
+        pass
+
+
+class _Filter(_Operator):
+    def __init__(self, stream: "PulseStream", predicate: Callable[[Any], bool]):
+        super().__init__(stream)
+        self.predicate = predicate
+
+    def push(self, value: Any):
+        if self.predicate(value):
+            self.downstream.push(value)
+
+
+class _Map(_Operator):
+    def __init__(self, stream: "PulseStream", fn: Callable[[Any], Any]):
+        super().__init__(stream)
+        self.fn = fn
+
+    def push(self, value: Any):
+        self.downstream.push(self.fn(value))
+
+
+class _Distinct(_Operator):
+    def __init__(self, stream: "PulseStream", key: Optional[Callable[[Any], Any]]):
+        super().__init__(stream)
+        self.key = key
+        self.last: Any = _NOTHING
+
+    def push(self, value: Any):
+        key = value if self.key is None else self.key(value)
+        if key != self.last:
+            self.last = key
+            self.downstream.push(value)
+
+
+class _Debounce(_Operator):
+    """
+    Emits the latest value once ``delay`` has passed without a new one.
+
+    Each push only records the value and its time; a single timer re-arms
+    itself for the remaining quiet period, instead of being cancelled and
+    recreated on every pulse of a burst.
+    """
+
+    def __init__(self, stream: "PulseStream", delay: float):
+        super().__init__(stream)
+        self.delay = delay
+        self.latest: Any = _NOTHING
+        self.last_push = 0.0
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def push(self, value: Any):
+        loop = self.stream._get_loop()
+        self.latest = value
+        self.last_push = loop.time()
+        if self.timer is None:
+            self.timer = loop.call_at(self.last_push + self.delay, self._fire)
+
+    def _fire(self):
+        loop = self.stream._get_loop()
+        due = self.last_push + self.delay
+        if loop.time() < due:
+            self.timer = loop.call_at(due, self._fire)
+            return
+        self.timer = None
+        value, self.latest = self.latest, _NOTHING
+        if value is not _NOTHING:
+            self.downstream.push(value)
+
+    def close(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+
+class _Throttle(_Operator):
+    """
+    Emits the first value, then at most one value per ``interval``. With
+    ``trailing`` the latest value suppressed during a window is emitted when
+    the window closes.
+    """
+
+    def __init__(self, stream: "PulseStream", interval: float, trailing: bool):
+        super().__init__(stream)
+        self.interval = interval
+        self.trailing = trailing
+        self.pending: Any = _NOTHING
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def push(self, value: Any):
+        if self.timer is None:
+            self.downstream.push(value)
+            self.timer = self.stream._get_loop().call_later(self.interval, self._window_closed)
+        elif self.trailing:
+            self.pending = value
+
+    def _window_closed(self):
+        value, self.pending = self.pending, _NOTHING
+        if value is _NOTHING:
+            self.timer = None
+            return
+        self.downstream.push(value)
+        self.timer = self.stream._get_loop().call_later(self.interval, self._window_closed)
+
+    def close(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+
+class _Batch(_Operator):
+    """Emits lists of up to ``size`` values; a partial batch is flushed ``timeout`` after its first value."""
+
+    def __init__(self, stream: "PulseStream", size: int, timeout: Optional[float]):
+        super().__init__(stream)
+        self.size = size
+        self.timeout = timeout
+        self.items: List[Any] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def push(self, value: Any):
+        self.items.append(value)
+        if len(self.items) >= self.size:
+            self._flush()
+        elif self.timer is None and self.timeout is not None:
+            self.timer = self.stream._get_loop().call_later(self.timeout, self._flush)
+
+    def _flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        items, self.items = self.items, []
+        if items:
+            self.downstream.push(items)
+
+    def close(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+
+class _Sink(_Operator):
+    """Queue between the last operator and the async iterator."""
+
+    def __init__(self, stream: "PulseStream", maxsize: int):
+        super().__init__(stream)
+        self.maxsize = maxsize
+        self.queue: Deque[Any] = collections.deque()
+        self.waiter: Optional[asyncio.Future] = None
+        self.dropped = 0
+
+    def push(self, value: Any):
+        if self.maxsize and len(self.queue) >= self.maxsize:
+            self.queue.popleft()
+            self.dropped += 1
+        self.queue.append(value)
+        self.wake()
+
+    def wake(self):
+        waiter = self.waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def close(self):
+        self.wake()
+
+
+class PulseStream:
+    """
+    Async iterator over the pulses a cluster delivers to one subscription.
+
+    Create with :meth:`NeuronalCluster.stream`. Values are ``Pulse`` objects
+    until an operator transforms them. ``close()`` (or ``aclose()``, or
+    leaving an ``async with`` block) unsubscribes and ends iteration.
+
+    Args:
+        maxsize: Bound of the output queue (0 = unbounded); the oldest value is
+            dropped when a slow consumer falls that far behind.
+    """
+
+    def __init__(self, cluster: "NeuronalCluster", maxsize: int = 0):
+        self.cluster = cluster
+        self._sink = _Sink(self, maxsize)
+        self._stages: List[_Operator] = []
+        self._head: _Operator = self._sink
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._iterating = False
+        self.closed = False
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+
+    @property
+    def dropped(self) -> int:
+        """Values discarded because the output queue was full."""
+        return self._sink.dropped
+
+    # --- Operators ---
+
+    def filter(self, predicate: Callable[[Any], bool]) -> "PulseStream":
+        """Keeps values for which ``predicate`` is true."""
+        return self._append(_Filter(self, predicate))
+
+    def map(self, fn: Callable[[Any], Any]) -> "PulseStream":
+        """Transforms each value."""
+        return self._append(_Map(self, fn))
+
+    def distinct_until_changed(self, key: Optional[Callable[[Any], Any]] = None) -> "PulseStream":
+        """Drops values equal (by ``key``, if given) to the previous one."""
+        return self._append(_Distinct(self, key))
+
+    def debounce(self, delay: float) -> "PulseStream":
+        """Emits the latest value after ``delay`` seconds without a new one."""
+        return self._append(_Debounce(self, delay))
+
+    def throttle(self, interval: float, trailing: bool = True) -> "PulseStream":
+        """Emits at most one value per ``interval`` seconds (leading edge, plus the latest at the trailing edge)."""
+        return self._append(_Throttle(self, interval, trailing))
+
+    def batch(self, size: int, timeout: Optional[float] = None) -> "PulseStream":
+        """Emits lists of ``size`` values, or fewer once ``timeout`` seconds passed since the first."""
+        if size < 1:
+            raise ValueError("batch size must be at least 1")
+        return self._append(_Batch(self, size, timeout))
+
+    def _append(self, stage: _Operator) -> "PulseStream":
+        if self._iterating:
+            raise RuntimeError("Add operators before iterating the stream")
+        stage.downstream = self._sink
+        if self._stages:
+            self._stages[-1].downstream = stage
+        else:
+            self._head = stage
+        self._stages.append(stage)
+        return self
+
+    # --- Listener ---
+
+    def on_pulse(self, pulse: "Pulse"):
+        if not self.closed:
+            self._head.push(pulse)
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        return self._loop
+
+    # --- Iteration ---
+
+    def __aiter__(self) -> "PulseStream":
+        self._iterating = True
+        return self
+
+    async def __anext__(self) -> Any:
+        self._iterating = True
+        sink = self._sink
+        while not sink.queue:
+            if self.closed:
+                raise StopAsyncIteration
+            sink.waiter = self._get_loop().create_future()
+            try:
+                await sink.waiter
+            finally:
+                sink.waiter = None
+        return sink.queue.popleft()
+
+    def close(self):
+        """Unsubscribes; pending windows are discarded and iteration ends once the queue is empty."""
+        if self.closed:
+            return
+        self.closed = True
+        self.cluster.unsubscribe(self)
+        for stage in self._stages:
+            stage.close()
+        self._sink.close()
+
+    async def aclose(self):
+        self.close()
+
+    async def __aenter__(self) -> "PulseStream":
+        return self
+
+    async def __aexit__(self, *exc_info: Any):
+        self.close()
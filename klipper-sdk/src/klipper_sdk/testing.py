@@ -0,0 +1,271 @@
+"""
+A fake ``org.kde.klipper`` service for tests and load generation.
+
+``FakeKlipper`` holds the clipboard state and implements the Klipper methods
+the SDK uses, with injectable latency and failures. It can be reached in two
+ways:
+
+- ``FakeKlipperTransport``: an in-process transport, no bus involved.
+- ``FakeKlipperBus``: a minimal private session bus on a unix socket, for
+  exercising the real ``AsyncioTransport`` wire path.
+"""
+
+import asyncio
+import logging
+import random
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .dbus_wire import ERROR, METHOD_CALL, METHOD_RETURN, SIGNAL, Message, message_length, signature_of
+from .transport import DBusError, Transport
+
+logger = logging.getLogger(__name__)
+
+BUS_NAME = "org.kde.klipper"
+OBJECT_PATH = "/klipper"
+INTERFACE = "org.kde.klipper.klipper"
+
+INJECTED_ERROR = "org.kde.klipper.Error.Injected"
+UNKNOWN_METHOD = "org.freedesktop.DBus.Error.UnknownMethod"
+
+ChangeObserver = Callable[[str], None]
+
+
+class FakeKlipper:
+    """
+    In-memory Klipper clipboard service.
+
+    Args:
+        clipboard: Initial clipboard contents
+        history_size: Number of history entries kept, newest first
+        latency: Seconds every method call takes
+        jitter: Extra random latency, uniform in ``[0, jitter]``
+        failure_rate: Probability that a call fails with ``INJECTED_ERROR``
+        failing_methods: Methods that always fail
+        seed: Seed for the latency/failure random generator
+
+    The latency and failure settings are plain attributes and may be changed
+    while the service is in use.
+    """
+
+    def __init__(self, clipboard: str = "", history_size: int = 20,
+                 latency: float = 0.0, jitter: float = 0.0, failure_rate: float = 0.0,
+                 failing_methods: Iterable[str] = (), seed: Optional[int] = None):
+        self.clipboard = clipboard
+        self.history: deque = deque([clipboard] if clipboard else [], maxlen=history_size)
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.failing_methods = set(failing_methods)
+        self.calls: Dict[str, int] = {}
+        self._random = random.Random(seed)
+        self._observers: List[ChangeObserver] = []
+        self._methods: Dict[str, Callable[..., Any]] = {
+            "getClipboardContents": self.get_clipboard_contents,
+            "setClipboardContents": self.set_clipboard_contents,
+            "clearClipboardHistory": self.clear_clipboard_history,
+            "getClipboardHistoryMenu": self.get_clipboard_history_menu,
+        }
+
+    # --- Klipper methods ---
+
+    def get_clipboard_contents(self) -> str:
+        return self.clipboard
+
+    def set_clipboard_contents(self, content: str):
+        self.copy(content)
+
+    def clear_clipboard_history(self):
+        self.history.clear()
+        self.clipboard = ""
+        self._emit("")
+
+    def get_clipboard_history_menu(self) -> List[str]:
+        return list(self.history)
+
+    # --- Simulation ---
+
+    def copy(self, content: str):
+        """Simulates a user copy: updates the clipboard and emits ``clipboardContentChanged``."""
+        self.clipboard = content
+        if not self.history or self.history[0] != content:
+            self.history.appendleft(content)
+        self._emit(content)
+
+    def subscribe(self, observer: ChangeObserver):
+        """Registers a callback for ``clipboardContentChanged``."""
+        self._observers.append(observer)
+
+    def unsubscribe(self, observer: ChangeObserver):
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    async def call(self, method: str, *args: Any) -> Any:
+        """Invokes a method the way the bus would, applying latency and failures."""
+        self.calls[method] = self.calls.get(method, 0) + 1
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if method in self.failing_methods or (self.failure_rate and self._random.random() < self.failure_rate):
+            raise DBusError(INJECTED_ERROR, f"Injected failure in {method}")
+        handler = self._methods.get(method)
+        if handler is None:
+            raise DBusError(UNKNOWN_METHOD, f"No such method {method}")
+        return handler(*args)
+
+    def _emit(self, content: str):
+        for observer in list(self._observers):
+            try:
+                observer(content)
+            except Exception as e:
+                logger.error("Fake Klipper observer failure: %s", e)
+
+
+class FakeKlipperTransport(Transport):
+    """
+    In-process transport bound to a :class:`FakeKlipper`.
+
+    Signals are delivered on the connecting loop in a later iteration, as they
+    would be from a socket, and may be triggered from any thread.
+    """
+
+    name = "fake"
+
+    def __init__(self, service: Optional[FakeKlipper] = None, bus_name: str = BUS_NAME,
+                 object_path: str = OBJECT_PATH, interface: str = INTERFACE):
+        super().__init__(bus_name, object_path, interface)
+        self.service = service or FakeKlipper()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def connect(self):
+        self._loop = asyncio.get_running_loop()
+        self.service.subscribe(self._on_change)
+
+    async def call(self, method: str, *args: Any) -> Any:
+        if self._loop is None:
+            raise ConnectionError("Fake Klipper transport is not connected")
+        return await self.service.call(method, *args)
+
+    async def close(self):
+        self.service.unsubscribe(self._on_change)
+        self._loop = None
+
+    def _on_change(self, content: str):
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._dispatch_signal, "clipboardContentChanged", (content,))
+
+
+class FakeKlipperBus:
+    """
+    A private session bus hosting a :class:`FakeKlipper` on a unix socket.
+
+    Implements just enough of the bus daemon for ``AsyncioTransport``: SASL
+    EXTERNAL, ``Hello``, ``AddMatch`` and method calls on the Klipper object.
+    Change signals are broadcast to every connection, so simulated copies
+    must happen on the loop that runs the bus.
+    """
+
+    def __init__(self, service: Optional[FakeKlipper] = None):
+        self.service = service or FakeKlipper()
+        self.path: Optional[str] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._writers: List[asyncio.StreamWriter] = []
+        self._tasks: set = set()
+        self._handlers: set = set()
+        self._serial = 0
+        self._clients = 0
+
+    @property
+    def address(self) -> str:
+        """The bus address to hand to ``AsyncioTransport(address=...)``."""
+        return f"unix:path={self.path}"
+
+    async def start(self, path: str) -> str:
+        """Listens on ``path`` and returns the bus address."""
+        self.path = path
+        self._server = await asyncio.start_unix_server(self._handle, path=path)
+        self.service.subscribe(self._broadcast)
+        return self.address
+
+    async def close(self):
+        self.service.unsubscribe(self._broadcast)
+        for writer in self._writers:
+            writer.close()
+        for task in list(self._tasks):
+            task.cancel()
+        if self._handlers:
+            # Closed writers make the connection handlers see EOF and return
+            await asyncio.wait(list(self._handlers), timeout=1.0)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            await reader.readexactly(1)  # credentials byte
+            line = await reader.readline()
+            if not line.startswith(b"AUTH EXTERNAL"):
+                writer.write(b"REJECTED EXTERNAL\r\n")
+                writer.close()
+                return
+            writer.write(b"OK 00000000000000000000000000000000\r\n")
+            if await reader.readline() != b"BEGIN\r\n":
+                writer.close()
+                return
+            self._writers.append(writer)
+            while True:
+                prefix = await reader.readexactly(16)
+                rest = await reader.readexactly(message_length(prefix) - 16)
+                message = Message.unmarshal(prefix + rest)
+                if message.type == METHOD_CALL:
+                    self._dispatch(message, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._handlers.discard(handler)
+            if writer in self._writers:
+                self._writers.remove(writer)
+            writer.close()
+
+    def _dispatch(self, call: Message, writer: asyncio.StreamWriter):
+        if call.member == "Hello":
+            self._clients += 1
+            self._reply(writer, call, f":1.{self._clients}")
+        elif call.member == "AddMatch":
+            self._reply(writer, call)
+        else:
+            task = asyncio.create_task(self._invoke(call, writer))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _invoke(self, call: Message, writer: asyncio.StreamWriter):
+        try:
+            result = await self.service.call(call.member, *call.body)
+        except DBusError as e:
+            message = str(e).partition(": ")[2]
+            self._send(writer, type=ERROR, reply_serial=call.serial, error_name=e.name,
+                       signature="s", body=(message,))
+            return
+        if result is None:
+            self._reply(writer, call)
+        else:
+            self._reply(writer, call, result)
+
+    def _reply(self, writer: asyncio.StreamWriter, call: Message, *body: Any):
+        self._send(writer, type=METHOD_RETURN, reply_serial=call.serial,
+                   signature="".join(signature_of(v) for v in body), body=body)
+
+    def _send(self, writer: asyncio.StreamWriter, **fields: Any):
+        if writer.is_closing():
+            return
+        self._serial += 1
+        writer.write(Message(serial=self._serial, sender=BUS_NAME, **fields).marshal())
+
+    def _broadcast(self, content: str):
+        for writer in list(self._writers):
+            self._send(writer, type=SIGNAL, path=OBJECT_PATH, interface=INTERFACE,
+                       member="clipboardContentChanged", signature="s", body=(content,))
@@ -0,0 +1,410 @@
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
+
+# dbus-python and GLib are imported on first use of the glib backend
+# (see _load_glib_backend), so importing the SDK never pays for them.
+dbus = None
+GLib = None
+_glib_backend_loaded = False
+
+from .dbus_wire import (
+    ERROR, METHOD_CALL, METHOD_RETURN, NO_REPLY_EXPECTED, SIGNAL,
+    Message, message_length, signature_of,
+)
+
+if TYPE_CHECKING:
+    from .executor import DBusCallExecutor
+
+# Logger
+logger = logging.getLogger(__name__)
+
+SignalHandler = Callable[..., None]
+DisconnectHandler = Callable[[Exception], None]
+
+
+class DBusError(Exception):
+    """An error reply received from the bus."""
+
+    def __init__(self, name: str, message: str = ""):
+        super().__init__(f"{name}: {message}" if message else name)
+        self.name = name
+
+
+class Transport:
+    """
+    Pluggable D-Bus transport used by KlipperClient.
+
+    A transport talks to one remote object (bus name, object path, interface):
+    it calls methods on it and delivers its signals to registered handlers.
+    """
+
+    name = "abstract"
+
+    # Whether a connection belongs to the event loop that opened it
+    loop_bound = True
+
+    def __init__(self, bus_name: str, object_path: str, interface: str):
+        self.bus_name = bus_name
+        self.object_path = object_path
+        self.interface = interface
+        # Set by KlipperClient; blocking backends run their calls on its private thread pool
+        self.executor: Optional["DBusCallExecutor"] = None
+        self._signal_handlers: Dict[str, List[SignalHandler]] = {}
+        self._disconnect_handlers: List[DisconnectHandler] = []
+
+    def is_available(self) -> bool:
+        """Whether the backend can be used in this environment."""
+        return True
+
+    def share_key(self) -> Tuple[Any, ...]:
+        """Identifies connections interchangeable with this one (see connection.py)."""
+        return (type(self), self.bus_name, self.object_path, self.interface)
+
+    def on_signal(self, member: str, handler: SignalHandler):
+        """Registers a handler for a signal of the remote interface. Call before connect()."""
+        self._signal_handlers.setdefault(member, []).append(handler)
+
+    def on_disconnect(self, handler: DisconnectHandler):
+        """
+        Registers a handler called with the error when an open connection is lost
+        (not on close()). Like signal handlers, it may run on a backend thread.
+        """
+        self._disconnect_handlers.append(handler)
+
+    async def connect(self):
+        raise NotImplementedError
+
+    async def call(self, method: str, *args: Any) -> Any:
+        raise NotImplementedError
+
+    async def close(self):
+        raise NotImplementedError
+
+    async def reconnect(self):
+        """Drops the current connection and connects again (proxy and signal matches included)."""
+        await self.close()
+        await self.connect()
+
+    def _dispatch_signal(self, member: str, args: Tuple[Any, ...]):
+        for handler in self._signal_handlers.get(member, ()):
+            handler(*args)
+
+    def _connection_lost(self, error: Exception):
+        for handler in list(self._disconnect_handlers):
+            try:
+                handler(error)
+            except Exception as e:
+                logger.error("Disconnect handler failure: %s", e)
+
+
+# --- dbus-python / GLib backend ---
+
+def _load_glib_backend() -> bool:
+    """Imports dbus-python and GLib once; returns whether both are available."""
+    global dbus, GLib, _glib_backend_loaded
+    if not _glib_backend_loaded:
+        _glib_backend_loaded = True
+        try:
+            import dbus as _dbus
+            import dbus.mainloop.glib  # noqa: F401
+            dbus = _dbus
+        except ImportError:
+            dbus = None
+        try:
+            from gi.repository import GLib as _GLib
+            GLib = _GLib
+        except ImportError:
+            GLib = None
+    return dbus is not None and GLib is not None
+
+
+class GLibTransport(Transport):
+    """
+    dbus-python backend.
+    Signals are delivered from a GLib MainLoop running in a daemon thread;
+    blocking method calls are pushed to the client's dedicated D-Bus thread pool.
+    """
+
+    name = "glib"
+    # Calls run on a thread pool and signals arrive on the GLib thread
+    loop_bound = False
+
+    def __init__(self, bus_name: str, object_path: str, interface: str):
+        super().__init__(bus_name, object_path, interface)
+        self._glib_loop = None
+        self._glib_thread: Optional[threading.Thread] = None
+        self._session_bus = None
+        self._proxy = None
+        self._signal_matches: List[Any] = []
+
+    def is_available(self) -> bool:
+        return _load_glib_backend()
+
+    async def connect(self):
+        if not _load_glib_backend():
+            raise ConnectionError("dbus-python and PyGObject are required for the glib transport")
+        # Setup GLib MainLoop integration for dbus-python
+        dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
+
+        try:
+            self._session_bus = dbus.SessionBus()
+            obj = self._session_bus.get_object(self.bus_name, self.object_path)
+            self._proxy = dbus.Interface(obj, self.interface)
+
+            # Subscribe to Signals; the matches live on the process-wide SessionBus,
+            # so close() must remove them or a reconnect would deliver every signal twice
+            for member in self._signal_handlers:
+                self._signal_matches.append(self._proxy.connect_to_signal(
+                    member, lambda *args, _member=member: self._dispatch_signal(_member, args)
+                ))
+            bus = self._session_bus
+            bus.call_on_disconnection(lambda _bus: self._bus_disconnected(bus))
+        except dbus.DBusException as e:
+            raise ConnectionError(str(e)) from e
+
+        # Start GLib loop in background thread for signals
+        self._start_background_loop()
+
+    def _start_background_loop(self):
+        """Starts the GLib MainLoop in a separate thread."""
+        self._glib_loop = GLib.MainLoop()
+
+        def run_loop():
+            logger.debug("Starting GLib MainLoop...")
+            self._glib_loop.run()
+            logger.debug("GLib MainLoop stopped.")
+
+        self._glib_thread = threading.Thread(target=run_loop, daemon=True, name="KlipperSDK-GLib")
+        self._glib_thread.start()
+
+    def _bus_disconnected(self, bus: Any):
+        # dbus-python cannot unregister the callback: ignore buses we no longer use
+        if bus is self._session_bus and self._proxy is not None:
+            self._connection_lost(ConnectionError("D-Bus connection lost"))
+
+    async def call(self, method: str, *args: Any) -> Any:
+        if not self._proxy:
+            raise ConnectionError("Not connected to Klipper")
+        # Run synchronous D-Bus call in the dedicated pool (default executor if standalone)
+        blocking = getattr(self._proxy, method)
+        try:
+            if self.executor is not None:
+                return await self.executor.run_blocking(blocking, *args)
+            return await asyncio.get_running_loop().run_in_executor(None, blocking, *args)
+        except dbus.DBusException as e:
+            # Same error type as the asyncio backend, so the circuit breaker sees the D-Bus name
+            raise DBusError(e.get_dbus_name() or "org.freedesktop.DBus.Error.Failed",
+                            e.get_dbus_message() or "") from e
+
+    async def close(self):
+        matches, self._signal_matches = self._signal_matches, []
+        for match in matches:
+            try:
+                match.remove()
+            except Exception as e:
+                logger.debug("Could not remove signal match: %s", e)
+        if self._glib_loop and self._glib_loop.is_running():
+            self._glib_loop.quit()
+        self._proxy = None
+        self._session_bus = None
+
+
+# --- Pure asyncio backend ---
+
+def session_bus_address() -> Optional[str]:
+    """Returns the session bus address from the environment, if any."""
+    address = os.environ.get("DBUS_SESSION_BUS_ADDRESS")
+    if address:
+        return address
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.exists(os.path.join(runtime_dir, "bus")):
+        return "unix:path=" + os.path.join(runtime_dir, "bus")
+    return None
+
+
+def _parse_unix_address(address: str) -> str:
+    """Returns the socket path for the first usable ``unix:`` address."""
+    for entry in address.split(";"):
+        transport, _, params = entry.partition(":")
+        if transport != "unix":
+            continue
+        options = dict(p.split("=", 1) for p in params.split(",") if "=" in p)
+        if "path" in options:
+            return options["path"]
+        if "abstract" in options:
+            return "\0" + options["abstract"]
+    raise ConnectionError(f"No supported unix socket in D-Bus address {address!r}")
+
+
+class AsyncioTransport(Transport):
+    """
+    Pure-asyncio backend.
+    Speaks the D-Bus wire protocol directly over the session-bus socket on the
+    running event loop: no helper threads, no executor hop per call, and signals
+    are dispatched on the loop.
+    """
+
+    name = "asyncio"
+
+    BUS_DAEMON = "org.freedesktop.DBus"
+    BUS_DAEMON_PATH = "/org/freedesktop/DBus"
+
+    def __init__(self, bus_name: str, object_path: str, interface: str,
+                 address: Optional[str] = None, timeout: float = 25.0):
+        super().__init__(bus_name, object_path, interface)
+        self.address = address
+        self.timeout = timeout
+        self.unique_name: Optional[str] = None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._serial = 0
+
+    def is_available(self) -> bool:
+        return (self.address or session_bus_address()) is not None
+
+    def share_key(self) -> Tuple[Any, ...]:
+        return super().share_key() + (self.address or session_bus_address(), self.timeout)
+
+    async def connect(self):
+        address = self.address or session_bus_address()
+        if address is None:
+            raise ConnectionError("No D-Bus session bus address found")
+        try:
+            self._reader, self._writer = await asyncio.open_unix_connection(_parse_unix_address(address))
+            await self._authenticate()
+        except OSError as e:
+            raise ConnectionError(f"Could not reach the session bus: {e}") from e
+
+        self._read_task = asyncio.get_running_loop().create_task(self._read_loop())
+        self.unique_name = await self._call_bus("Hello")
+        for member in self._signal_handlers:
+            rule = (
+                f"type='signal',sender='{self.bus_name}',path='{self.object_path}',"
+                f"interface='{self.interface}',member='{member}'"
+            )
+            await self._call_bus("AddMatch", rule)
+
+    async def _authenticate(self):
+        """SASL EXTERNAL handshake using our uid."""
+        uid = str(os.getuid()).encode("ascii").hex()
+        self._writer.write(b"\0AUTH EXTERNAL " + uid.encode("ascii") + b"\r\n")
+        await self._writer.drain()
+        reply = await self._reader.readline()
+        if not reply.startswith(b"OK"):
+            raise ConnectionError(f"D-Bus authentication rejected: {reply!r}")
+        self._writer.write(b"BEGIN\r\n")
+
+    async def call(self, method: str, *args: Any) -> Any:
+        return await self._call(self.bus_name, self.object_path, self.interface, method, args)
+
+    async def _call_bus(self, method: str, *args: Any) -> Any:
+        return await self._call(self.BUS_DAEMON, self.BUS_DAEMON_PATH, self.BUS_DAEMON, method, args)
+
+    async def _call(self, destination: str, path: str, interface: str, member: str,
+                    args: Tuple[Any, ...]) -> Any:
+        if self._writer is None or self._writer.is_closing():
+            raise ConnectionError("Not connected to the session bus")
+        self._serial += 1
+        serial = self._serial
+        message = Message(
+            type=METHOD_CALL, serial=serial, destination=destination, path=path,
+            interface=interface, member=member,
+            signature="".join(signature_of(arg) for arg in args), body=args,
+        )
+        future = asyncio.get_running_loop().create_future()
+        self._pending[serial] = future
+        try:
+            self._writer.write(message.marshal())
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(serial, None)
+
+    async def _read_loop(self):
+        try:
+            while True:
+                prefix = await self._reader.readexactly(16)
+                rest = await self._reader.readexactly(message_length(prefix) - 16)
+                self._handle(Message.unmarshal(prefix + rest))
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            self._writer.close()
+            error = ConnectionError(f"D-Bus connection lost: {e}")
+            self._fail_pending(error)
+            self._connection_lost(error)
+        except asyncio.CancelledError:
+            self._fail_pending(ConnectionError("D-Bus connection closed"))
+            raise
+        except Exception as e:
+            # A message we cannot parse leaves the stream out of step, so the connection is unusable
+            logger.error("D-Bus read loop failure: %s", e)
+            self._writer.close()
+            error = ConnectionError(f"D-Bus connection failed: {e}")
+            self._fail_pending(error)
+            self._connection_lost(error)
+
+    def _handle(self, message: Message):
+        if message.type in (METHOD_RETURN, ERROR):
+            future = self._pending.get(message.reply_serial)
+            if future is None or future.done():
+                return
+            if message.type == ERROR:
+                text = message.body[0] if message.body and isinstance(message.body[0], str) else ""
+                future.set_exception(DBusError(message.error_name, text))
+            else:
+                future.set_result(message.body[0] if len(message.body) == 1 else
+                                  (message.body or None))
+        elif message.type == SIGNAL and message.interface == self.interface:
+            try:
+                self._dispatch_signal(message.member, message.body)
+            except Exception as e:
+                logger.error("Signal handler failure for %s: %s", message.member, e)
+        elif message.type == METHOD_CALL and not message.flags & NO_REPLY_EXPECTED:
+            self._reply_error(message, "org.freedesktop.DBus.Error.UnknownMethod")
+
+    def _reply_error(self, message: Message, error_name: str):
+        self._serial += 1
+        reply = Message(
+            type=ERROR, serial=self._serial, reply_serial=message.serial,
+            destination=message.sender, error_name=error_name,
+        )
+        self._writer.write(reply.marshal())
+
+    def _fail_pending(self, error: Exception):
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    async def close(self):
+        if self._read_task is not None:
+            self._read_task.cancel()
+            try:
+                await self._read_task
+            except asyncio.CancelledError:
+                pass
+            self._read_task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+_BACKENDS = {
+    "asyncio": AsyncioTransport,
+    "glib": GLibTransport,
+}
+
+
+def create_transport(backend: Union[str, Transport], bus_name: str, object_path: str,
+                     interface: str) -> Transport:
+    """Resolves a backend name (``"asyncio"``, ``"glib"``) or passes a Transport instance through."""
+    if isinstance(backend, Transport):
+        return backend
+    try:
+        cls = _BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown D-Bus transport {backend!r}; choose one of {sorted(_BACKENDS)}")
+    return cls(bus_name, object_path, interface)
@@ -0,0 +1,66 @@
+"""
+Shared fixtures and helpers.
+
+Wall-clock checks are marked ``perf`` and skipped unless pytest runs with
+``--run-perf``, so the default suite does not depend on machine load.
+"""
+
+import threading
+
+import pytest
+import pytest_asyncio
+from klipper_sdk.testing import FakeKlipper, FakeKlipperBus
+
+
+def pytest_addoption(parser):
+    parser.addoption("--run-perf", action="store_true", help="also run wall-clock performance tests")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "perf: wall-clock performance check (needs --run-perf)")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-perf"):
+        return
+    skip = pytest.mark.skip(reason="wall-clock check; run with --run-perf")
+    for item in items:
+        if "perf" in item.keywords:
+            item.add_marker(skip)
+
+
+class Recorder:
+    """Listener keeping every pulse it receives and the threads it ran on."""
+
+    def __init__(self):
+        self.pulses = []
+        self.threads = set()
+
+    def on_pulse(self, pulse):
+        self.pulses.append(pulse)
+        self.threads.add(threading.get_ident())
+
+    @property
+    def payloads(self):
+        return [pulse.payload for pulse in self.pulses]
+
+    @property
+    def vectors(self):
+        return [pulse.vector for pulse in self.pulses]
+
+
+@pytest.fixture(autouse=True)
+def data_home(tmp_path, monkeypatch):
+    """Keeps the default history log of every client created in a test out of the real home."""
+    path = tmp_path / "data"
+    monkeypatch.setenv("XDG_DATA_HOME", str(path))
+    return path
+
+
+@pytest_asyncio.fixture
+async def bus(tmp_path, monkeypatch):
+    """A fake Klipper on a private session bus, with clipboard content "initial"."""
+    bus = FakeKlipperBus(FakeKlipper(clipboard="initial"))
+    monkeypatch.setenv("DBUS_SESSION_BUS_ADDRESS", await bus.start(str(tmp_path / "bus")))
+    yield bus
+    await bus.close()
@@ -0,0 +1,34 @@
+"""
+Tests for the benchmark runner's regression check (not for performance itself).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+import bench  # noqa: E402
+
+
+def test_compare_flags_only_slowdowns_past_threshold():
+    results = [
+        bench.Result("fast", 1.0e-6, 1.0e6, 1),
+        bench.Result("slower", 1.2e-6, 1 / 1.2e-6, 1),
+        bench.Result("regressed", 2.0e-6, 5.0e5, 1),
+        bench.Result("new", 1.0, 1.0, 1),
+    ]
+    baseline = {"fast": 2.0e-6, "slower": 1.0e-6, "regressed": 1.0e-6}
+
+    regressions = bench.compare(results, baseline, threshold=0.25)
+    assert [r.name for r in regressions] == ["regressed"]
+    assert regressions[0].slowdown == 1.0
+
+
+def test_save_and_check_round_trip(tmp_path):
+    """A quick run checks clean against the baseline it just recorded."""
+    path = str(tmp_path / "baseline.json")
+    args = ["-k", "prism.ingest[1KB]", "--quick", "--min-time", "0.001", "--repeat", "1", "--baseline", path]
+
+    assert bench.main(args + ["--save"]) == 0
+    assert list(bench.load_baseline(path)) == ["prism.ingest[1KB]"]
+    assert bench.main(args + ["--check", "--threshold", "100"]) == 0
@@ -0,0 +1,124 @@
+"""
+Tests for the signal-invalidated clipboard cache.
+"""
+
+import time
+
+import pytest
+from klipper_sdk.cache import ClipboardCache
+from klipper_sdk.client import KlipperClient
+from klipper_sdk.transport import Transport
+
+
+class CountingTransport(Transport):
+    name = "counting"
+
+    def __init__(self):
+        super().__init__("a.b", "/a", "a.b")
+        self.clipboard = "initial"
+        self.reads = 0
+
+    async def connect(self):
+        pass
+
+    async def call(self, method, *args):
+        if method == "getClipboardContents":
+            self.reads += 1
+            return self.clipboard
+        if method == "setClipboardContents":
+            self.clipboard = args[0]
+
+    async def close(self):
+        pass
+
+
+def test_lookup_refresh_and_staleness():
+    """Refreshed values hit until they exceed max_age."""
+    cache = ClipboardCache(max_age=0.05)
+    assert cache.lookup() == (False, None)
+
+    cache.refresh("value")
+    assert cache.lookup() == (True, "value")
+
+    time.sleep(0.06)
+    assert cache.lookup() == (False, None)
+
+    stats = cache.stats
+    assert stats.hits == 1
+    assert stats.misses == 2
+    assert stats.stale == 1
+
+
+def test_fill_loses_to_newer_refresh():
+    """A D-Bus read that raced with a change signal does not overwrite it."""
+    cache = ClipboardCache()
+    generation = cache.generation
+    cache.refresh("from signal")
+
+    assert not cache.fill("older read", generation)
+    assert cache.lookup() == (True, "from signal")
+
+
+@pytest.mark.asyncio
+async def test_client_serves_reads_from_cache():
+    """Reads are served locally; signals and writes keep the cache current."""
+    transport = CountingTransport()
+    cache = ClipboardCache(max_age=None)
+    client = KlipperClient(transport=transport, clipboard_cache=cache)
+    await client.connect()
+    reads_after_connect = transport.reads
+
+    for _ in range(100):
+        assert await client.get_clipboard_contents() == "initial"
+    assert transport.reads == reads_after_connect
+
+    client._on_clipboard_changed_signal("copied elsewhere")
+    assert await client.clipboard.get_content() == "copied elsewhere"
+
+    await client.set_clipboard_contents("written")
+    assert await client.get_clipboard_contents() == "written"
+    assert transport.reads == reads_after_connect
+    assert cache.stats.hits == 102
+
+    await client.clear_history()
+    assert await client.get_clipboard_contents() == "written"
+    assert transport.reads == reads_after_connect + 1
+    await client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cache_is_opt_in():
+    """Without a cache every read goes to D-Bus."""
+    transport = CountingTransport()
+    client = KlipperClient(transport=transport)
+    await client.connect()
+    before = transport.reads
+
+    await client.get_clipboard_contents()
+    await client.get_clipboard_contents()
+    assert transport.reads == before + 2
+
+
+@pytest.mark.asyncio
+async def test_cached_and_uncached_reads_return_the_same_representation():
+    """Fills from D-Bus hold the reply string, like refreshes from signals, even for entropic text."""
+    transport = CountingTransport()
+    transport.clipboard = "Error: disk full"
+    cache = ClipboardCache(max_age=None)
+    client = KlipperClient(transport=transport, clipboard_cache=cache)
+    await client.connect()
+    assert cache.lookup() == (True, "Error: disk full")
+    assert await client.get_clipboard_contents() == "Error: disk full"
+
+    transport.clipboard = ""
+    client._on_clipboard_changed_signal("")
+    assert await client.get_clipboard_contents() == ""
+    cache.invalidate()
+    assert await client.get_clipboard_contents() == ""
+    assert cache.lookup() == (True, "")
+
+    uncached = KlipperClient(transport=transport)
+    await uncached.connect()
+    assert await uncached.get_clipboard_contents() == ""
+    await client.shutdown()
+    await uncached.shutdown()
@@ -0,0 +1,158 @@
+"""
+Tests for async listeners, concurrent fan-out and mailboxes in NeuronalCluster.
+"""
+
+import asyncio
+import random
+
+import pytest
+from klipper_sdk.bridge import NeuronalCluster
+
+
+class SlowListener:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.received = []
+
+    async def on_pulse(self, pulse):
+        await asyncio.sleep(self.delay)
+        self.received.append(pulse.payload)
+
+
+class SyncListener:
+    def __init__(self):
+        self.received = []
+
+    def on_pulse(self, pulse):
+        self.received.append(pulse.payload)
+
+
+class JitteryListener:
+    def __init__(self):
+        self.received = []
+
+    async def on_pulse(self, pulse):
+        await asyncio.sleep(random.random() / 200)
+        self.received.append(pulse.payload)
+
+
+class BrokenListener:
+    async def on_pulse(self, pulse):
+        raise RuntimeError("synapse misfire")
+
+
+class RendezvousListener:
+    """Returns only once every listener sharing its barrier has started."""
+
+    def __init__(self, barrier):
+        self.barrier = barrier
+        self.received = []
+
+    async def on_pulse(self, pulse):
+        await self.barrier.wait()
+        self.received.append(pulse.payload)
+
+
+@pytest.mark.asyncio
+async def test_emit_async_fans_out_concurrently():
+    """All listeners run at once: delivered one after another, the first would never return."""
+    cluster = NeuronalCluster(node_id="test")
+    barrier = asyncio.Barrier(30)
+    listeners = [RendezvousListener(barrier) for _ in range(30)]
+    sync = SyncListener()
+    for listener in listeners:
+        cluster.subscribe(listener)
+    cluster.subscribe(sync)
+
+    pulse = await asyncio.wait_for(cluster.emit_async("payload", vector="clipboard_change"), 5)
+
+    assert pulse.vector == "clipboard_change"
+    assert all(listener.received == ["payload"] for listener in listeners)
+    assert sync.received == ["payload"]
+
+
+@pytest.mark.asyncio
+async def test_emit_schedules_async_listeners_and_drain_waits():
+    """The sync emit path schedules coroutine listeners on the running loop."""
+    cluster = NeuronalCluster(node_id="test")
+    listener = SlowListener(0.01)
+    cluster.subscribe(listener)
+
+    cluster.emit("a")
+    cluster.emit("b")
+    assert listener.received == []
+
+    await cluster.drain()
+    assert sorted(listener.received) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_mailbox_delivers_in_order():
+    """Mailbox listeners see pulses in emit order despite variable latency."""
+    cluster = NeuronalCluster(node_id="test")
+    listener = JitteryListener()
+    cluster.subscribe(listener, mailbox=True)
+
+    for i in range(20):
+        cluster.emit(i)
+    await cluster.emit_async(20)
+    await cluster.drain()
+
+    assert listener.received == list(range(21))
+    cluster.close()
+
+
+@pytest.mark.asyncio
+async def test_bounded_mailbox_drops_oldest():
+    """A full mailbox discards its oldest undelivered pulse."""
+    cluster = NeuronalCluster(node_id="test")
+    listener = SyncListener()
+    cluster.subscribe(listener, mailbox=True, mailbox_size=3)
+
+    for i in range(10):
+        cluster.emit(i)
+    await cluster.drain()
+
+    assert listener.received == [7, 8, 9]
+    cluster.close()
+
+
+def test_mailbox_starts_after_emit_without_loop():
+    """A pulse emitted with no running loop is delivered inline and leaves the mailbox usable."""
+    cluster = NeuronalCluster(node_id="test")
+    listener = SyncListener()
+    cluster.subscribe(listener, mailbox=True)
+    cluster.emit("inline")
+    assert listener.received == ["inline"]
+
+    async def later():
+        cluster.emit("queued 1")
+        cluster.emit("queued 2")
+        await cluster.drain()
+
+    asyncio.run(later())
+    assert listener.received == ["inline", "queued 1", "queued 2"]
+    cluster.close()
+
+
+@pytest.mark.asyncio
+async def test_failing_async_listener_is_isolated():
+    """One failing listener does not prevent delivery to others."""
+    cluster = NeuronalCluster(node_id="test")
+    good = SlowListener(0)
+    cluster.subscribe(BrokenListener())
+    cluster.subscribe(good)
+
+    await cluster.emit_async("x")
+    assert good.received == ["x"]
+
+
+def test_unsubscribe():
+    cluster = NeuronalCluster(node_id="test")
+    listener = SyncListener()
+    cluster.subscribe(listener)
+    cluster.unsubscribe(listener)
+
+    cluster.emit("ignored")
+    assert listener.received == []
+    assert cluster.listeners == []
@@ -0,0 +1,89 @@
+"""
+Tests for vector-indexed subscription routing in NeuronalCluster.
+"""
+
+from conftest import Recorder
+from klipper_sdk.bridge import NeuronalCluster
+
+
+def test_exact_vector_subscription():
+    """Listeners only receive the vectors they asked for."""
+    cluster = NeuronalCluster(node_id="test")
+    clip, other, everything = Recorder(), Recorder(), Recorder()
+    cluster.subscribe(clip, vectors=["clipboard_change"])
+    cluster.subscribe(other, vectors="history_update")
+    cluster.subscribe(everything)
+
+    cluster.emit("x", vector="clipboard_change")
+    cluster.emit("y", vector="history_update")
+
+    assert clip.vectors == ["clipboard_change"]
+    assert other.vectors == ["history_update"]
+    assert everything.vectors == ["clipboard_change", "history_update"]
+
+
+def test_wildcard_and_prefix_vectors():
+    """'*' matches everything; a trailing '*' matches by prefix."""
+    cluster = NeuronalCluster(node_id="test")
+    prefixed, star = Recorder(), Recorder()
+    cluster.subscribe(prefixed, vectors=["clipboard_*"])
+    cluster.subscribe(star, vectors=["*"])
+
+    cluster.emit(1, vector="clipboard_change")
+    cluster.emit(2, vector="clipboard_clear")
+    cluster.emit(3, vector="history_update")
+
+    assert prefixed.vectors == ["clipboard_change", "clipboard_clear"]
+    assert star.vectors == ["clipboard_change", "clipboard_clear", "history_update"]
+
+
+def test_broadcast_reaches_every_subscriber():
+    """Broadcast pulses ignore vector filters."""
+    cluster = NeuronalCluster(node_id="test")
+    narrow = Recorder()
+    cluster.subscribe(narrow, vectors=["clipboard_change"])
+
+    cluster.emit("hello")
+    assert narrow.vectors == ["broadcast"]
+
+
+def test_min_intensity():
+    """Pulses weaker than a subscription's threshold are not delivered."""
+    cluster = NeuronalCluster(node_id="test")
+    important = Recorder()
+    cluster.subscribe(important, min_intensity=0.5)
+
+    cluster.emit("quiet", vector="v", intensity=0.2)
+    cluster.emit("loud", vector="v", intensity=0.8)
+    assert important.vectors == ["v"]
+
+
+def test_routes_are_rebuilt_on_subscription_changes():
+    """Cached routes pick up new and removed subscribers."""
+    cluster = NeuronalCluster(node_id="test")
+    first, second = Recorder(), Recorder()
+    cluster.subscribe(first, vectors=["v"])
+    cluster.emit(1, vector="v")
+
+    cluster.subscribe(second, vectors=["v"])
+    cluster.unsubscribe(first)
+    cluster.emit(2, vector="v")
+
+    assert first.vectors == ["v"]
+    assert second.vectors == ["v"]
+
+
+def test_targeted_emit_reaches_only_matching_listeners():
+    """Uninterested subscribers are not delivered to (timing: test_performance.py)."""
+    cluster = NeuronalCluster(node_id="test")
+    others = [Recorder() for _ in range(2000)]
+    for i, other in enumerate(others):
+        cluster.subscribe(other, vectors=[f"topic_{i}"])
+    target = Recorder()
+    cluster.subscribe(target, vectors=["clipboard_change"])
+
+    for _ in range(1000):
+        cluster.emit("x", vector="clipboard_change")
+
+    assert len(target.vectors) == 1000
+    assert not any(other.pulses for other in others)
@@ -0,0 +1,102 @@
+"""
+Tests for intensity-aware priority scheduling and load shedding.
+"""
+
+import time
+
+import pytest
+from conftest import Recorder
+from klipper_sdk.bridge import NeuronalCluster, PulseScheduler
+
+
+def _cluster(**options):
+    cluster = NeuronalCluster(node_id="test", scheduler=PulseScheduler(**options))
+    recorder = Recorder()
+    cluster.subscribe(recorder)
+    return cluster, recorder
+
+
+@pytest.mark.asyncio
+async def test_pulses_are_dispatched_by_intensity():
+    """Higher intensity first, FIFO within the same intensity."""
+    cluster, recorder = _cluster(max_latency=None)
+    cluster.emit("low", intensity=0.1)
+    cluster.emit("high-1", intensity=0.9)
+    cluster.emit("mid", intensity=0.5)
+    cluster.emit("high-2", intensity=0.9)
+    assert recorder.payloads == []
+
+    await cluster.drain()
+    assert recorder.payloads == ["high-1", "high-2", "mid", "low"]
+
+
+@pytest.mark.asyncio
+async def test_backlog_limit_sheds_lowest_intensity():
+    """A full backlog evicts its weakest pulse, or rejects a weaker newcomer."""
+    cluster, recorder = _cluster(max_backlog=2, max_latency=None)
+    cluster.emit("a", intensity=0.5)
+    cluster.emit("b", intensity=0.8)
+    cluster.emit("c", intensity=0.9)   # evicts "a"
+    cluster.emit("d", intensity=0.1)   # weaker than everything queued
+    await cluster.drain()
+
+    assert recorder.payloads == ["c", "b"]
+    stats = cluster.scheduler.stats
+    assert stats.shed == {0.5: 1, 0.1: 1}
+    assert stats.delivered == {0.9: 1, 0.8: 1}
+
+
+@pytest.mark.asyncio
+async def test_saturated_backlog_keeps_the_strongest_pulses_in_bounded_memory():
+    cluster, recorder = _cluster(max_backlog=10, max_latency=None, batch_size=4)
+    scheduler = cluster.scheduler
+    for i in range(1000):
+        cluster.emit(i, intensity=(i % 10) / 10)
+        assert len(scheduler._backlog) <= 24 and len(scheduler._lowest) <= 24
+    assert len(scheduler) == 10
+
+    await cluster.drain()
+    # The first ten strongest pulses, oldest first; later equals are shed as newest
+    assert recorder.payloads == list(range(9, 100, 10))
+    assert sum(scheduler.stats.shed.values()) == 990
+
+
+@pytest.mark.asyncio
+async def test_latency_overload_sheds_low_intensity_first():
+    """When pulses wait too long, only those above shed_below get through."""
+    cluster, recorder = _cluster(max_latency=0.005, shed_below=0.5)
+    for i in range(5):
+        cluster.emit(f"low-{i}", intensity=0.2)
+    cluster.emit("clipboard", intensity=0.8)
+    time.sleep(0.01)  # saturate the loop before dispatch
+    await cluster.drain()
+
+    assert recorder.payloads == ["clipboard"]
+    stats = cluster.scheduler.stats
+    assert stats.shed == {0.2: 5}
+    assert stats.overloaded
+
+
+@pytest.mark.asyncio
+async def test_sampling_policy_keeps_a_fraction():
+    """The sample policy keeps one in sample_every low-intensity pulses."""
+    cluster, recorder = _cluster(max_latency=0.005, shed_policy="sample", sample_every=5)
+    for i in range(20):
+        cluster.emit(i, intensity=0.1)
+    time.sleep(0.01)
+    await cluster.drain()
+
+    assert len(recorder.payloads) == 4
+    assert cluster.scheduler.stats.shed == {0.1: 16}
+
+
+def test_without_loop_dispatches_inline():
+    """Outside an event loop pulses are delivered immediately."""
+    cluster, recorder = _cluster()
+    cluster.emit("now")
+    assert recorder.payloads == ["now"]
+
+
+def test_unknown_shed_policy_is_rejected():
+    with pytest.raises(ValueError):
+        PulseScheduler(shed_policy="panic")
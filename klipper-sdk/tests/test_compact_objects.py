@@ -0,0 +1,72 @@
+"""
+Tests for the slotted event/history records and their cheap ids.
+"""
+
+import dataclasses
+import os
+import threading
+
+import pytest
+from klipper_sdk.bridge import NeuronalCluster, PrismResult, Pulse, Signal
+from klipper_sdk.controllers import EMPTY_METADATA, HistoryItem
+from klipper_sdk.ids import IdSequence
+
+
+@pytest.mark.parametrize("record", [
+    Pulse(payload="x"), Signal(raw_payload="x"), PrismResult(core_truth="x"), HistoryItem(content="x"),
+])
+def test_records_are_slotted(record):
+    assert not hasattr(record, "__dict__")
+
+
+def test_public_fields_are_unchanged():
+    names = lambda cls: [f.name for f in dataclasses.fields(cls)]  # noqa: E731
+    assert names(Pulse) == ["id", "payload", "vector", "intensity", "source_node"]
+    assert names(Signal) == ["raw_payload", "source", "timestamp"]
+    assert names(PrismResult) == ["core_truth", "entropy_wrapper", "is_coherent"]
+    assert names(HistoryItem) == ["content", "uuid", "mime_type", "timestamp", "metadata"]
+
+
+def test_ids_are_unique_across_threads_and_sequences():
+    ids = IdSequence()
+    seen = []
+
+    def take():
+        seen.extend(ids() for _ in range(1000))
+
+    threads = [threading.Thread(target=take) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seen.extend(IdSequence()() for _ in range(100))
+    assert len(set(seen)) == len(seen) == 4100
+
+    cluster = NeuronalCluster(node_id="test")
+    assert cluster.emit("a").id != cluster.emit("b").id
+    assert HistoryItem(content="a").uuid != HistoryItem(content="a").uuid
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_child_does_not_repeat_ids():
+    ids = IdSequence()
+    ids()
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.write(write, ids().encode())
+        os._exit(0)
+    os.waitpid(pid, 0)
+    child = os.read(read, 100).decode()
+    os.close(read)
+    os.close(write)
+    assert child != ids()
+    assert not child.startswith(ids.prefix)
+
+
+def test_metadata_is_shared_until_given():
+    a, b = HistoryItem(content="a"), HistoryItem(content="b")
+    assert a.metadata is b.metadata is EMPTY_METADATA
+    with pytest.raises(TypeError):
+        a.metadata["k"] = "v"
+    assert HistoryItem(content="c", metadata={"k": "v"}).metadata == {"k": "v"}
@@ -0,0 +1,106 @@
+"""
+Tests for the process-wide shared D-Bus connection.
+"""
+
+import asyncio
+
+import pytest
+from klipper_sdk.client import KlipperClient
+from klipper_sdk.connection import CONNECTIONS, ConnectionManager, SharedTransport
+from klipper_sdk.testing import FakeKlipperBus
+from klipper_sdk.transport import AsyncioTransport
+
+
+@pytest.mark.asyncio
+async def test_clients_share_one_connection(bus):
+    """N clients open one bus connection and each sees every signal exactly once."""
+    before = CONNECTIONS.stats
+    clients = [KlipperClient(app_id=f"plugin-{i}") for i in range(3)]
+    await asyncio.gather(*(client.connect() for client in clients))
+
+    assert bus._clients == 1
+    assert CONNECTIONS.stats.connections == before.connections + 1
+    assert CONNECTIONS.stats.leases == before.leases + 3
+    assert all(client.transport.shared for client in clients)
+
+    bus.service.copy("shared")
+    await asyncio.sleep(0.05)
+    for client in clients:
+        assert await client.get_history() == ["shared", "initial"]
+
+    # The connection outlives all but the last client
+    await clients[0].shutdown()
+    await clients[1].shutdown()
+    assert await clients[2].get_clipboard_contents() == "shared"
+    assert not clients[2].transport.shared
+
+    await clients[2].shutdown()
+    after = CONNECTIONS.stats
+    assert after.connections == before.connections
+    assert after.closed == before.closed + 1
+    assert bus._clients == 1
+
+
+@pytest.mark.asyncio
+async def test_reconnect_leaves_the_connection_to_remaining_leases(bus):
+    """A lease that reconnects gets a fresh connection; the old one stays open for the others."""
+    a, b = KlipperClient(app_id="a"), KlipperClient(app_id="b")
+    await a.connect()
+    await b.connect()
+    old = a.transport._connection
+
+    await a.transport.reconnect()
+    assert a.transport._connection is not old
+    assert a.transport._connection.backend is not old.backend
+    assert bus._clients == 2
+    assert old.leases == [b.transport]
+
+    bus.service.copy("after reconnect")
+    await asyncio.sleep(0.05)
+    assert await a.get_clipboard_contents() == "after reconnect"
+    assert await b.get_clipboard_contents() == "after reconnect"
+    assert await a.get_history() == await b.get_history()
+
+    # Closing the old connection's last lease leaves the new one untouched
+    await b.shutdown()
+    assert await a.get_clipboard_contents() == "after reconnect"
+    await a.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_unshared_clients_connect_separately(bus):
+    clients = [KlipperClient(share_connection=False) for _ in range(2)]
+    for client in clients:
+        await client.connect()
+    assert bus._clients == 2
+    for client in clients:
+        await client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_failed_connect_is_not_cached(tmp_path):
+    manager = ConnectionManager()
+    address = f"unix:path={tmp_path / 'missing'}"
+
+    def backend():
+        return AsyncioTransport(KlipperClient.BUS_NAME, KlipperClient.OBJECT_PATH,
+                                KlipperClient.INTERFACE, address=address)
+
+    transports = [
+        SharedTransport(backend, KlipperClient.BUS_NAME, KlipperClient.OBJECT_PATH,
+                        KlipperClient.INTERFACE, manager=manager)
+        for _ in range(2)
+    ]
+
+    results = await asyncio.gather(*(t.connect() for t in transports), return_exceptions=True)
+    assert all(isinstance(r, ConnectionError) for r in results)
+    assert manager.stats.connections == 0 and manager.stats.leases == 0
+
+    # A later attempt opens a fresh connection once the bus is up
+    bus = FakeKlipperBus()
+    await bus.start(str(tmp_path / "missing"))
+    await transports[0].connect()
+    assert manager.stats.opened == 1
+    await transports[0].close()
+    await bus.close()
+    assert manager.stats.connections == 0
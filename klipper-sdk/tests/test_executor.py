@@ -0,0 +1,154 @@
+"""
+Tests for the dedicated D-Bus call executor.
+"""
+
+import asyncio
+
+import pytest
+from klipper_sdk.client import KlipperClient
+from klipper_sdk.executor import DBusCallExecutor
+from klipper_sdk.transport import Transport
+
+
+@pytest.mark.asyncio
+async def test_in_flight_limit_and_queue_depth():
+    """No more than max_in_flight calls run concurrently; the rest queue."""
+    executor = DBusCallExecutor(max_in_flight=2)
+    release = asyncio.Event()
+    running = 0
+    peak = 0
+
+    async def call(value):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await release.wait()
+        running -= 1
+        return value
+
+    tasks = [asyncio.create_task(executor.run(call, i)) for i in range(5)]
+    await asyncio.sleep(0.01)
+
+    stats = executor.stats
+    assert stats.in_flight == 2
+    assert stats.queued == 3
+
+    release.set()
+    assert await asyncio.gather(*tasks) == [0, 1, 2, 3, 4]
+    assert peak == 2
+
+    stats = executor.stats
+    assert stats.completed == 5
+    assert stats.in_flight == 0 and stats.queued == 0
+    assert stats.max_wait > 0
+    assert stats.avg_latency > 0
+
+
+@pytest.mark.asyncio
+async def test_timeout_and_failure_counters():
+    """Slow calls time out; errors are counted and re-raised."""
+    executor = DBusCallExecutor(timeout=0.01)
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    with pytest.raises(TimeoutError):
+        await executor.run(slow)
+    with pytest.raises(RuntimeError):
+        await executor.run(broken)
+
+    stats = executor.stats
+    assert stats.timed_out == 1
+    assert stats.failed == 1
+    assert stats.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_blocking_calls_use_private_pool():
+    """The dedicated pool runs blocking work on named threads."""
+    import threading
+
+    executor = DBusCallExecutor(max_workers=1)
+    loop = asyncio.get_running_loop()
+
+    async def blocking():
+        return await loop.run_in_executor(executor.thread_pool, lambda: threading.current_thread().name)
+
+    assert (await executor.run(blocking)).startswith("KlipperSDK-DBus")
+    executor.shutdown()
+    assert (await executor.run(blocking)).startswith("KlipperSDK-DBus")
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_timed_out_blocking_call_holds_its_slot_until_the_thread_ends():
+    """A timed-out call stays in flight while its thread runs; no new call can queue behind it unseen."""
+    import threading
+
+    executor = DBusCallExecutor(max_in_flight=1, timeout=0.01)
+    unblock = threading.Event()
+
+    async def stuck():
+        return await executor.run_blocking(unblock.wait, 5)
+
+    with pytest.raises(TimeoutError):
+        await executor.run(stuck)
+    stats = executor.stats
+    assert stats.in_flight == 1 and stats.abandoned == 1
+
+    follow_up = asyncio.create_task(executor.run(executor.run_blocking, lambda: "done"))
+    await asyncio.sleep(0)
+    assert executor.stats.queued == 1
+
+    unblock.set()
+    assert await follow_up == "done"
+    assert executor.stats.in_flight == 0
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_blocking_jobs_never_queue_inside_the_pool():
+    """Jobs beyond the worker count wait on the executor, where they are counted."""
+    import threading
+
+    executor = DBusCallExecutor(max_in_flight=4, max_workers=1)
+    unblock = threading.Event()
+    first = asyncio.create_task(executor.run_blocking(unblock.wait, 5))
+    second = asyncio.create_task(executor.run_blocking(lambda: "second"))
+    await asyncio.sleep(0.01)
+    assert executor.stats.queued == 1
+
+    unblock.set()
+    assert await asyncio.gather(first, second) == [True, "second"]
+    assert DBusCallExecutor(max_in_flight=3).max_workers == 3
+    executor.shutdown()
+
+
+class EchoTransport(Transport):
+    name = "echo"
+
+    async def connect(self):
+        pass
+
+    async def call(self, method, *args):
+        return f"{method}{args}"
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_client_routes_calls_through_executor():
+    """KlipperClient exposes live call stats for its D-Bus calls."""
+    executor = DBusCallExecutor(max_in_flight=4, timeout=1.0)
+    client = KlipperClient(transport=EchoTransport("a.b", "/a", "a.b"), call_executor=executor)
+    await client.connect()
+
+    assert client.transport.executor is executor
+    assert await client._call_dbus_method("ping", "x") == "ping('x',)"
+    # connect() seeds history with one getClipboardContents call
+    assert client.call_stats.completed == 2
+    await client.shutdown()
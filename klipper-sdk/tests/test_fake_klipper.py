@@ -0,0 +1,105 @@
+"""
+Tests for the fake Klipper service, its transports and the storm load generator.
+"""
+
+import asyncio
+import time
+
+import pytest
+from klipper_sdk.client import KlipperClient
+from klipper_sdk.loadgen import percentiles, run_storm
+from klipper_sdk.testing import INJECTED_ERROR, FakeKlipper, FakeKlipperBus, FakeKlipperTransport
+from klipper_sdk.transport import AsyncioTransport, DBusError
+
+
+@pytest.mark.asyncio
+async def test_in_process_round_trip():
+    """Calls reach the service and change signals feed the client's history."""
+    service = FakeKlipper(clipboard="initial")
+    client = KlipperClient(transport=FakeKlipperTransport(service))
+    await client.connect()
+
+    await client.set_clipboard_contents("hello")
+    assert service.clipboard == "hello"
+    assert await client.get_clipboard_contents() == "hello"
+
+    service.copy("copied by user")
+    await asyncio.sleep(0)
+    assert await client.get_history() == ["copied by user", "hello", "initial"]
+
+    await client.clear_history()
+    assert list(service.history) == []
+    assert service.calls["setClipboardContents"] == 1
+    await client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_connect_with_empty_clipboard():
+    """An empty clipboard at connect time leaves the history empty."""
+    client = KlipperClient(transport=FakeKlipperTransport(FakeKlipper()))
+    await client.connect()
+    assert await client.get_history() == []
+    await client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_injected_latency_and_failures():
+    service = FakeKlipper(clipboard="x", latency=0.02, failing_methods=["clearClipboardHistory"])
+    client = KlipperClient(transport=FakeKlipperTransport(service))
+    await client.connect()
+
+    start = time.perf_counter()
+    await client.get_clipboard_contents()
+    assert time.perf_counter() - start >= 0.02
+
+    with pytest.raises(DBusError) as error:
+        await client.clear_history()
+    assert error.value.name == INJECTED_ERROR
+
+    service.latency = 0
+    service.failure_rate = 1.0
+    with pytest.raises(DBusError):
+        await client.get_clipboard_contents()
+    await client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_private_bus_serves_asyncio_transport(tmp_path):
+    """The fake bus speaks enough D-Bus for the native asyncio transport."""
+    service = FakeKlipper(clipboard="initial")
+    bus = FakeKlipperBus(service)
+    address = await bus.start(str(tmp_path / "bus"))
+    transport = AsyncioTransport(KlipperClient.BUS_NAME, KlipperClient.OBJECT_PATH,
+                                 KlipperClient.INTERFACE, address=address)
+    client = KlipperClient(transport=transport)
+    await client.connect()
+
+    await client.set_clipboard_contents("over the wire")
+    assert service.clipboard == "over the wire"
+    service.copy("storm")
+    await asyncio.sleep(0.05)
+    assert (await client.get_history())[:2] == ["storm", "over the wire"]
+
+    service.failing_methods.add("getClipboardContents")
+    with pytest.raises(DBusError) as error:
+        await client.get_clipboard_contents()
+    assert error.value.name == INJECTED_ERROR
+
+    await client.shutdown()
+    await bus.close()
+
+
+@pytest.mark.asyncio
+async def test_storm_reports_latency_percentiles():
+    report = await run_storm(copies=200, listeners=3, call_every=50)
+
+    assert report.deliveries == 600
+    assert report.delivery_ratio == 1.0
+    assert report.calls == 4 and report.call_failures == 0
+    assert 0 < report.latency["p50"] <= report.latency["p99"] <= report.latency["max"]
+
+
+def test_percentiles_nearest_rank():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentiles(samples) == {"p50": 50.0, "p90": 90.0, "p99": 99.0, "max": 100.0}
+    assert percentiles([]) == {}
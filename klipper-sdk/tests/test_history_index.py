@@ -0,0 +1,217 @@
+"""
+Tests for the in-process history search index.
+"""
+
+
+import pytest
+from klipper_sdk.client import KlipperClient
+from klipper_sdk.controllers import HistoryItem
+from klipper_sdk.index import HistoryIndex
+from klipper_sdk.store import SpilledHistoryItem
+
+
+def _index(*texts):
+    index = HistoryIndex()
+    items = [HistoryItem(content=text) for text in texts]
+    index.extend(items)
+    return index, items
+
+
+def test_substring_search_is_case_insensitive():
+    """Substring terms match anywhere, newest first."""
+    index, items = _index("Hello World", "world peace", "unrelated")
+
+    results = index.search("WORLD")
+    assert results == [items[1], items[0]]
+
+
+def test_multi_term_search_requires_all_terms():
+    """Every term must be present, in any order."""
+    index, items = _index("git commit -m fix", "git push", "commit log")
+
+    assert index.search("commit git") == [items[0]]
+    assert index.search("git zzz") == []
+
+
+def test_short_terms_are_verified():
+    """Terms shorter than a trigram still filter correctly."""
+    index, items = _index("ab cd", "abc", "xyz")
+
+    assert index.search("ab") == [items[1], items[0]]
+    assert index.search("ab cd") == [items[0]]
+
+
+def test_short_terms_match_anywhere():
+    """Terms of up to three characters are matched exactly, including at the end of a text."""
+    index, items = _index("xab", "b", "ba", "abc")
+
+    assert index.search("ab") == [items[3], items[0]]
+    assert index.search("b") == list(reversed(items))
+    assert index.search("xa") == [items[0]]
+    assert index.search("bc") == [items[3]]
+    assert index.search("cb") == []
+    assert index.search("xab") == [items[0]]
+
+
+def test_limit_returns_the_newest_matches():
+    """A common term with a limit stops at the newest matches."""
+    index, items = _index(*(f"hello {i}" for i in range(100)), "other")
+
+    assert index.search("hel", limit=3) == [items[99], items[98], items[97]]
+    assert index.search("hello 9", limit=2) == [items[99], items[98]]
+    assert index.search("h", limit=0) == []
+    assert len(index.search("hello")) == 100
+
+
+def test_prefix_search():
+    """Prefix mode matches the start of words only."""
+    index, items = _index("configuration file", "reconfigure", "config")
+
+    assert index.search("config", prefix=True) == [items[2], items[0]]
+    assert index.search("conf fi", prefix=True) == [items[0]]
+    assert index.search("nomatch", prefix=True) == []
+
+
+def test_empty_query_and_limit():
+    """An empty query matches everything; limit caps the result count."""
+    index, items = _index("a", "b", "c")
+
+    assert index.search("") == list(reversed(items))
+    assert index.search("", limit=2) == [items[2], items[1]]
+
+
+def test_remove_and_clear():
+    """Removed items are no longer returned."""
+    index, items = _index("alpha beta", "beta gamma")
+
+    assert index.remove(items[1].uuid)
+    assert not index.remove(items[1].uuid)
+    assert index.search("beta") == [items[0]]
+    assert index.search("gam", prefix=True) == []
+
+    index.clear()
+    assert len(index) == 0
+    assert index.latest() is None
+
+
+def test_oversized_documents_are_still_found():
+    """Text beyond max_indexed_chars is matched by verification."""
+    index = HistoryIndex(max_indexed_chars=16)
+    big = HistoryItem(content="x" * 100 + " needle")
+    small = HistoryItem(content="haystack")
+    index.extend([big, small])
+
+    assert index.search("needle") == [big]
+    assert index.search("hay") == [small]
+
+
+def test_prefix_search_covers_oversized_text():
+    """Words past max_indexed_chars are still prefix-searchable."""
+    index = HistoryIndex(max_indexed_chars=16)
+    big = HistoryItem(content="word " * 100 + "tailword")
+    index.add(big)
+
+    assert index.search("tail", prefix=True) == [big]
+    assert index.search("ailw", prefix=True) == []
+
+    index.remove(big.uuid)
+    assert index.search("tail", prefix=True) == []
+    assert index.search("w") == []
+
+
+def test_spilled_text_is_read_only_for_likely_matches():
+    """A spilled payload is indexed once when added and reopened only when its postings match."""
+    text = "lorem ipsum " * 20000 + "needle in the haystack"
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return text
+
+    index = HistoryIndex(max_indexed_chars=1024)
+    spilled = SpilledHistoryItem(loader, size=len(text))
+    index.add(spilled, content_hash="blob")
+    assert len(loads) == 1
+
+    assert index.search("zzzqqq") == []
+    assert index.search("ipsum lorem needle", prefix=True) == [spilled]
+    assert index.search("hay") == [spilled]
+    assert index.search("x") == []
+    assert len(loads) == 1
+
+    assert index.search("the haystack") == [spilled]
+    assert index.search("haystack needle") == [spilled]
+    assert len(loads) == 3
+
+
+def test_bytes_content_is_searchable():
+    """Binary payloads are decoded for matching."""
+    index, items = _index(b"binary payload")
+
+    assert index.search("payload") == [items[0]]
+
+
+def test_search_over_large_histories():
+    """Selective queries over tens of thousands of entries (timing: test_performance.py)."""
+    index = HistoryIndex()
+    index.extend(HistoryItem(content=f"entry number {i} token{i % 1000}") for i in range(20000))
+
+    results = index.search("token42 ", limit=20)
+    assert len(results) == 20
+    assert all("token42" in item.content for item in results)
+
+
+@pytest.mark.asyncio
+async def test_history_manager_search_uses_index():
+    """Items added or observed via the change signal are searchable."""
+    client = KlipperClient()
+
+    client._on_clipboard_changed_signal("from the signal")
+    client.history.record("recorded directly")
+    client.history.record("recorded directly")
+
+    results = await client.history.search("signal")
+    assert [item.content for item in results] == ["from the signal"]
+    assert len(await client.history.search("")) == 2
+
+
+def test_repeated_content_is_indexed_once():
+    """Re-copies of a snippet share its indexed text; it is dropped with the last of them."""
+    index = HistoryIndex()
+    snippet = "def handler(event):\n    return event.payload\n" * 1000
+    items = [HistoryItem(content=snippet) for _ in range(200)]
+    index.extend(items)
+    index.add(HistoryItem(content="other"))
+
+    assert len(index) == 201
+    assert index.unique_contents == 2
+    assert index.search("HANDLER", limit=3) == items[:-4:-1]
+
+    for item in items[:-1]:
+        index.remove(item.uuid)
+    assert index.search("handler") == [items[-1]]
+    index.remove(items[-1].uuid)
+    assert index.unique_contents == 1
+    assert index.search("handler") == []
+    assert index.search("han", prefix=True) == []
+
+
+def test_same_bytes_with_other_mime_type_are_indexed_separately():
+    index = HistoryIndex()
+    text = HistoryItem(content=b"shared bytes")
+    image = HistoryItem(content=b"shared bytes", mime_type="image/png")
+    index.extend([text, image])
+
+    assert index.unique_contents == 2
+    assert index.search("shared") == [text]
+
+
+@pytest.mark.asyncio
+async def test_history_manager_indexes_by_blob_hash():
+    client = KlipperClient()
+    for _ in range(5):
+        client.history.record("the same snippet")
+        client.history.record("another")
+
+    assert [item.content for item in await client.history.search("same")] == ["the same snippet"] * 5
+    assert client.history._index.unique_contents == 2
@@ -0,0 +1,76 @@
+"""
+Tests for cursor pagination and streaming over the history store.
+"""
+
+import pytest
+from klipper_sdk.client import KlipperClient
+from klipper_sdk.store import _SELECT, HistoryStore, decode_cursor, encode_cursor
+
+
+def _client(count):
+    client = KlipperClient()
+    for i in range(count):
+        client.history.record(f"entry {i}")
+    return client
+
+
+@pytest.mark.asyncio
+async def test_pages_cover_history_without_gaps():
+    client = _client(25)
+    seen, cursor = [], None
+    while True:
+        page = await client.history.get_page(limit=10, cursor=cursor)
+        seen.extend(item.content for item in page.items)
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+
+    assert seen == [f"entry {i}" for i in reversed(range(25))]
+
+
+@pytest.mark.asyncio
+async def test_last_full_page_has_no_next_cursor():
+    client = _client(20)
+    first = await client.history.get_page(limit=10)
+    second = await client.history.get_page(limit=10, cursor=first.next_cursor)
+    assert len(second.items) == 10
+    assert second.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_cursor_is_stable_while_history_grows():
+    """New copies arriving between pages do not shift the next page."""
+    client = _client(10)
+    first = await client.history.get_page(limit=5)
+    client.history.record("arrived meanwhile")
+    items = await client.history.get_items(limit=5, cursor=first.next_cursor)
+    assert [item.content for item in items] == [f"entry {i}" for i in (4, 3, 2, 1, 0)]
+    items = await client.history.get_items(limit=2, offset=1, cursor=first.next_cursor)
+    assert [item.content for item in items] == ["entry 3", "entry 2"]
+
+
+@pytest.mark.asyncio
+async def test_iter_items_streams_everything():
+    client = _client(23)
+    contents = [item.content async for item in client.history.iter_items(page_size=5)]
+    assert contents == [f"entry {i}" for i in reversed(range(23))]
+    assert [item async for item in KlipperClient(history_path=":memory:").history.iter_items()] == []
+
+
+def test_cursor_tokens():
+    assert decode_cursor(encode_cursor(12345)) == 12345
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor!")
+    with pytest.raises(ValueError):
+        HistoryStore().page(10, cursor="AAAA")
+
+
+def test_page_query_is_a_range_scan():
+    """Deep pages are served by a primary-key range search, not a scan and skip."""
+    store = HistoryStore()
+    plan = store._db.execute(
+        "EXPLAIN QUERY PLAN " + _SELECT + "WHERE history.seq < ? ORDER BY history.seq DESC LIMIT ?", (100, 10)
+    ).fetchall()
+    details = " | ".join(row[-1] for row in plan)
+    assert "SEARCH history USING INTEGER PRIMARY KEY" in details
+    assert "TEMP B-TREE" not in details
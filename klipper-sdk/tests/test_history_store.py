@@ -0,0 +1,236 @@
+"""
+Tests for the local, persistent history store.
+"""
+
+import asyncio
+import os
+
+import pytest
+from klipper_sdk.client import KlipperClient
+from klipper_sdk.store import HistoryStore
+from klipper_sdk.testing import FakeKlipper, FakeKlipperTransport
+
+
+def test_append_and_read_newest_first():
+    """Entries come back newest first with pagination applied."""
+    store = HistoryStore()
+    for text in ("one", "two", "three"):
+        store.append(text)
+
+    assert [item.content for item in store.items()] == ["three", "two", "one"]
+    assert [item.content for item in store.items(limit=1, offset=1)] == ["two"]
+    assert len(store) == 3
+
+
+def test_consecutive_duplicates_are_collapsed():
+    """Re-appending the newest entry returns it instead of storing a copy."""
+    store = HistoryStore()
+    first = store.append("same")
+    again = store.append("same")
+
+    assert again.uuid == first.uuid
+    assert len(store) == 1
+
+
+def test_bytes_and_mime_type_roundtrip():
+    """Binary content and MIME types are preserved."""
+    store = HistoryStore()
+    store.append(b"\x89PNG", mime_type="image/png")
+
+    item = store.items()[0]
+    assert item.content == b"\x89PNG"
+    assert item.mime_type == "image/png"
+
+
+def test_store_survives_reopen(tmp_path):
+    """A file-backed store keeps its history across restarts."""
+    path = str(tmp_path / "history" / "history.sqlite3")
+    store = HistoryStore(path)
+    store.append("persisted")
+    added = store.append("latest")
+    store.close()
+
+    reopened = HistoryStore(path)
+    assert [item.content for item in reopened.items()] == ["latest", "persisted"]
+    assert reopened.latest().uuid == added.uuid
+    # The collapse check survives the restart as well
+    assert reopened.append("latest").uuid == added.uuid
+
+
+def test_remove_and_clear():
+    """Entries can be removed individually or all at once."""
+    store = HistoryStore()
+    keep = store.append("keep")
+    drop = store.append("drop")
+
+    assert store.remove(drop.uuid)
+    assert not store.remove(drop.uuid)
+    assert store.latest().uuid == keep.uuid
+
+    store.clear()
+    assert store.items() == []
+    assert store.latest() is None
+
+
+def test_items_after():
+    """Incremental reads return only newer entries, oldest first."""
+    store = HistoryStore()
+    store.append("a")
+    store.append("b")
+    (seq, item), = store.items_after(0)[-1:]
+    store.append("c")
+
+    assert [i.content for _, i in store.items_after(seq)] == ["c"]
+
+
+@pytest.mark.asyncio
+async def test_history_is_served_without_dbus(tmp_path):
+    """Signal-fed history is readable through the client and HistoryManager."""
+    client = KlipperClient(history_path=str(tmp_path / "history.sqlite3"))
+    client._on_clipboard_changed_signal("first copy")
+    client._on_clipboard_changed_signal("second copy")
+
+    assert await client.get_history() == ["second copy", "first copy"]
+    items = await client.history.get_items(limit=1)
+    assert [item.content for item in items] == ["second copy"]
+    assert [item.content for item in await client.history.search("first")] == ["first copy"]
+
+
+def test_repeated_content_is_stored_once():
+    """Re-copies reference one refcounted blob and share one content object."""
+    store = HistoryStore()
+    payload = "snippet " * 1000
+    for _ in range(50):
+        store.append(payload)
+        store.append("other")
+
+    stats = store.stats
+    assert stats.entries == 100
+    assert stats.blobs == 2
+    assert stats.stored_bytes == len(payload) + len("other")
+    assert stats.dedup_ratio == pytest.approx(50)
+
+    items = store.items()
+    loaded = [item.content for item in items if item.content == payload]
+    assert len(loaded) == 50
+    assert all(content is loaded[0] for content in loaded)
+
+
+def test_blob_is_released_with_its_last_reference():
+    store = HistoryStore()
+    first = store.append("shared")
+    store.append("between")
+    second = store.append("shared")
+
+    assert store.remove(first.uuid)
+    assert store.stats.blobs == 2
+    assert store.remove(second.uuid)
+    assert store.stats.blobs == 1
+    assert [item.content for item in store.items()] == ["between"]
+
+
+def test_text_and_bytes_are_distinct_blobs():
+    store = HistoryStore()
+    store.append("abc")
+    store.append(b"abc")
+
+    assert [type(item.content) for item in store.items()] == [bytes, str]
+    assert store.stats.blobs == 2
+
+
+def test_bump_moves_entry_to_top_without_copying():
+    store = HistoryStore()
+    old = store.append("old favourite")
+    store.append("newer")
+
+    bumped = store.bump(old.uuid)
+    assert bumped.uuid == old.uuid
+    assert [item.content for item in store.items()] == ["old favourite", "newer"]
+    assert store.latest().uuid == old.uuid
+    assert store.stats.blobs == 2 and store.stats.entries == 2
+    assert [i.content for _, i in store.items_after(2)] == ["old favourite"]
+    assert store.bump("unknown") is None
+
+
+@pytest.mark.asyncio
+async def test_history_manager_bump_item():
+    """Bumping re-selects an old entry on the clipboard without a new blob."""
+    service = FakeKlipper()
+    client = KlipperClient(transport=FakeKlipperTransport(service))
+    await client.connect()
+    old = client.history.record("pick me")
+    client.history.record("latest")
+    assert [i.content for i in await client.history.search("pick")] == ["pick me"]
+
+    assert (await client.history.bump_item(old.uuid)).content == "pick me"
+    assert service.clipboard == "pick me"
+    await asyncio.sleep(0)  # the change signal is collapsed into the bumped entry
+    assert [i.content for i in await client.history.get_items()] == ["pick me", "latest"]
+    assert [i.uuid for i in await client.history.search("pick")] == [old.uuid]
+    assert client.history_store.stats.blobs == 2
+    await client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_history_persists_under_xdg_data_home(data_home):
+    """Without a history path the log lives in $XDG_DATA_HOME and outlives the client."""
+    client = KlipperClient(transport=FakeKlipperTransport(FakeKlipper()))
+    client.history.record("kept")
+    assert client.history_store.path == str(data_home / "klipper-sdk" / "history.sqlite3")
+
+    again = KlipperClient(transport=FakeKlipperTransport(FakeKlipper()))
+    assert await again.get_history() == ["kept"]
+    assert KlipperClient(history_path=":memory:").history_store.path is None
+
+
+def test_max_entries_prunes_oldest_and_releases_blobs(tmp_path):
+    """Entries beyond the cap go oldest first, taking their unreferenced blobs and spill files along."""
+    pruned = []
+    store = HistoryStore(str(tmp_path / "h.sqlite3"), spill_threshold=8, max_entries=2)
+    store.on_prune(pruned.extend)
+    big = store.append("spilled " * 4)
+    small = store.append("kept")
+    assert len(os.listdir(store.spill_dir)) == 1
+
+    store.append("newest")
+    assert [i.content for i in store.items()] == ["newest", "kept"]
+    assert pruned == [big.uuid] and len(store) == 2
+    assert store.stats.blobs == 2 and os.listdir(store.spill_dir) == []
+
+    store.append("kept")  # the pruned entry's blob is kept for the re-copy
+    assert pruned == [big.uuid, small.uuid]
+    assert [i.content for i in store.items()] == ["kept", "newest"] and store.stats.blobs == 2
+
+
+def test_max_age_prunes_on_open(tmp_path):
+    path = str(tmp_path / "h.sqlite3")
+    store = HistoryStore(path)
+    store.append("old")
+    store._db.execute("UPDATE history SET timestamp = timestamp - 3600")
+    store.append("new")
+    store.close()
+
+    reopened = HistoryStore(path, max_age=60)
+    assert [i.content for i in reopened.items()] == ["new"]
+    assert reopened.stats.blobs == 1
+
+
+def test_stores_on_one_file_collapse_the_same_copy(tmp_path):
+    """Clients sharing the default log record a clipboard change once."""
+    path = str(tmp_path / "h.sqlite3")
+    first, second = HistoryStore(path), HistoryStore(path)
+    first.append("a")
+    assert second.append("a").uuid == first.latest().uuid
+    second.append("b")
+    first.append("b")
+    assert [i.content for i in first.items()] == ["b", "a"] and len(first) == 2
+
+
+@pytest.mark.asyncio
+async def test_pruned_entries_leave_the_search_index():
+    client = KlipperClient(transport=FakeKlipperTransport(FakeKlipper()), history_path=":memory:",
+                           history_max_entries=2)
+    for text in ("alpha one", "alpha two", "alpha three"):
+        client.history.record(text)
+    assert [i.content for i in await client.history.search("alpha")] == ["alpha three", "alpha two"]
+    assert len(client.history._index) == 2
@@ -0,0 +1,141 @@
+"""
+Tests for cross-process pulse fan-out.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+from conftest import Recorder
+from klipper_sdk.bridge import NeuronalCluster, Pulse
+from klipper_sdk.ipc import (
+    _HEADER, FRAME_SUBSCRIBE, PAYLOAD_TEXT, PulseHub, PulseSubscriber, decode_pulse, encode_pulse,
+)
+
+
+async def wait_for(predicate, timeout=1.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not reached")
+        await asyncio.sleep(0.005)
+
+
+def test_frame_round_trip():
+    pulse = Pulse(id="p-1", payload=None, vector="clipboard_change", intensity=0.8, source_node="node")
+    frame = encode_pulse(pulse, PAYLOAD_TEXT, "héllo".encode())
+    decoded, kind, payload = decode_pulse(frame[5:])
+    assert (decoded.id, decoded.vector, decoded.intensity, decoded.source_node) == ("p-1", "clipboard_change", 0.8, "node")
+    assert kind == PAYLOAD_TEXT and str(payload, "utf-8") == "héllo"
+
+
+@pytest.mark.asyncio
+async def test_hub_fans_out_to_subscribers(tmp_path):
+    source = NeuronalCluster(node_id="klipper")
+    hub = PulseHub(source, str(tmp_path / "hub"), share_threshold=1024, shm_dir=str(tmp_path))
+    await hub.start()
+
+    workers = [NeuronalCluster(node_id=f"worker-{i}") for i in range(2)]
+    recorders = [Recorder() for _ in workers]
+    subscribers = [
+        PulseSubscriber(workers[0], hub.path),
+        PulseSubscriber(workers[1], hub.path, vectors=["clipboard_*"]),
+    ]
+    for worker, recorder, subscriber in zip(workers, recorders, subscribers):
+        worker.subscribe(recorder)
+        await subscriber.connect()
+
+    sent = source.emit("text", vector="clipboard_change", intensity=0.8)
+    source.emit({"n": 1}, vector="metrics")
+    source.emit(b"\x00" * 4096, vector="clipboard_image")
+    source.emit("x" * 4096, vector="clipboard_change")
+    await wait_for(lambda: len(recorders[0].pulses) == 4 and len(recorders[1].pulses) == 3)
+
+    first = recorders[0].pulses[0]
+    assert (first.id, first.payload, first.intensity, first.source_node) == (sent.id, "text", 0.8, "klipper")
+    assert recorders[0].pulses[1].payload == {"n": 1}
+    assert [p.vector for p in recorders[1].pulses] == ["clipboard_change", "clipboard_image", "clipboard_change"]
+
+    # Large payloads are written once and mapped by every subscriber
+    image = recorders[1].pulses[1].payload
+    assert isinstance(image, memoryview) and image == b"\x00" * 4096
+    assert recorders[1].pulses[2].payload == "x" * 4096
+    assert hub.stats.shared == 2 and hub.stats.frames == 7
+    assert subscribers[1].stats.shared == 2
+
+    for subscriber in subscribers:
+        await subscriber.close()
+    await hub.close()
+    assert not [name for name in os.listdir(tmp_path) if name.startswith("klipper-sdk-pulses-")]
+
+
+@pytest.mark.asyncio
+async def test_pulses_reach_another_process(tmp_path):
+    source = NeuronalCluster(node_id="klipper")
+    hub = PulseHub(source, str(tmp_path / "hub"), share_threshold=16)
+    await hub.start()
+    worker = (
+        "import asyncio, sys\n"
+        "from klipper_sdk.bridge import NeuronalCluster\n"
+        "from klipper_sdk.ipc import PulseSubscriber\n"
+        "async def main():\n"
+        "    cluster = NeuronalCluster(node_id='worker')\n"
+        "    stream = cluster.stream('clipboard_change')\n"
+        "    await PulseSubscriber(cluster, sys.argv[1], vectors=['clipboard_change']).connect()\n"
+        "    print('ready', flush=True)\n"
+        "    async for pulse in stream:\n"
+        "        print(len(pulse.payload), pulse.source_node, flush=True)\n"
+        "        return\n"
+        "asyncio.run(main())\n"
+    )
+    env = dict(os.environ, PYTHONPATH=os.path.join(os.path.dirname(__file__), "..", "src"))
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-c", worker, hub.path, stdout=subprocess.PIPE, env=env)
+    assert await asyncio.wait_for(process.stdout.readline(), 10) == b"ready\n"
+
+    source.emit("y" * 100, vector="clipboard_change")
+    assert await asyncio.wait_for(process.stdout.readline(), 10) == b"100 klipper\n"
+    await process.wait()
+    await hub.close()
+
+
+def shared_files(tmp_path):
+    return [name for directory in tmp_path.glob("klipper-sdk-pulses-*") for name in os.listdir(directory)]
+
+
+@pytest.mark.asyncio
+async def test_shared_files_live_until_every_subscriber_released_them(tmp_path):
+    source = NeuronalCluster(node_id="klipper")
+    hub = PulseHub(source, str(tmp_path / "hub"), share_threshold=16, shm_dir=str(tmp_path))
+    await hub.start()
+    worker = NeuronalCluster(node_id="worker")
+    recorder = Recorder()
+    worker.subscribe(recorder)
+    subscriber = PulseSubscriber(worker, hub.path)
+    await subscriber.connect()
+    # A peer that subscribes but never reads or releases anything
+    _, silent = await asyncio.open_unix_connection(hub.path)
+    silent.write(_HEADER.pack(1, FRAME_SUBSCRIBE))
+    await wait_for(lambda: hub.stats.subscribers == 2)
+    await asyncio.sleep(0.05)
+
+    # Same pulse id twice: the files must not collide
+    for payload in (b"a" * 64, b"b" * 64):
+        hub.publish(Pulse(id="same", payload=payload, vector="clipboard_image"))
+    await wait_for(lambda: len(recorder.pulses) == 2)
+    assert [bytes(p.payload) for p in recorder.pulses] == [b"a" * 64, b"b" * 64]
+    assert hub.stats.shared_files == 2 and len(shared_files(tmp_path)) == 2
+
+    silent.close()
+    await wait_for(lambda: hub.stats.shared_files == 0)
+    assert shared_files(tmp_path) == []
+    # Mappings outlive the unlinked files
+    assert bytes(recorder.pulses[1].payload) == b"b" * 64
+
+    hub.publish(Pulse(payload="c" * 64, vector="clipboard_change"))
+    await wait_for(lambda: len(recorder.pulses) == 3 and hub.stats.shared_files == 0)
+    assert shared_files(tmp_path) == []
+    await subscriber.close()
+    await hub.close()
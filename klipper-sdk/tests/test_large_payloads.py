@@ -0,0 +1,180 @@
+"""
+Tests for binary payloads, spill files and lazily loaded history content.
+"""
+
+import asyncio
+import os
+import tracemalloc
+
+import pytest
+from klipper_sdk.client import KlipperClient
+from klipper_sdk.controllers import decode_text
+from klipper_sdk.store import HistoryStore, SpilledHistoryItem, content_hash
+from klipper_sdk.testing import FakeKlipper, FakeKlipperTransport
+
+MB = 1024 * 1024
+
+
+def test_large_binary_payload_is_spilled_and_mapped():
+    store = HistoryStore(spill_threshold=1024)
+    payload = bytearray(os.urandom(64 * 1024))
+    item = store.append(memoryview(payload), mime_type="image/png")
+
+    assert isinstance(item, SpilledHistoryItem)
+    assert item.mime_type == "image/png" and item.size == len(payload)
+    assert os.listdir(store.spill_dir) == [content_hash(payload)]
+
+    loaded = store.items()[0]
+    assert isinstance(loaded, SpilledHistoryItem)
+    assert isinstance(loaded.content, memoryview)
+    assert loaded.content == payload
+    assert "size=65536" in repr(loaded)
+    assert store.stats.spilled_blobs == 1
+
+
+def test_large_text_is_spilled_and_decoded_on_access():
+    store = HistoryStore(spill_threshold=1024)
+    text = "log line ünïcode\n" * 1000
+    store.append(text)
+    store.append("small")
+
+    big = store.items()[1]
+    assert isinstance(big, SpilledHistoryItem)
+    assert big.content == text
+    assert [type(item) for item in store.items()][0] is not SpilledHistoryItem
+
+
+def test_small_buffers_are_detached_from_the_caller():
+    store = HistoryStore()
+    buffer = bytearray(b"abc")
+    item = store.append(memoryview(buffer), mime_type="application/octet-stream")
+    buffer[:] = b"xyz"
+
+    assert item.content == b"abc"
+    assert store.items()[0].content == b"abc"
+
+
+def test_spill_files_follow_blob_references(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.sqlite3"), spill_threshold=16)
+    big = b"\x00" * 1024
+    first = store.append(big, mime_type="image/png")
+    store.append(b"between", mime_type="image/png")
+    second = store.append(big, mime_type="image/png")
+    assert len(os.listdir(store.spill_dir)) == 1
+
+    store.close()
+    store = HistoryStore(str(tmp_path / "history.sqlite3"), spill_threshold=16)
+    assert store.items()[0].content == big
+
+    store.remove(first.uuid)
+    assert len(os.listdir(store.spill_dir)) == 1
+    store.remove(second.uuid)
+    assert os.listdir(store.spill_dir) == []
+
+    store.append(big, mime_type="image/png")
+    store.clear()
+    assert os.listdir(store.spill_dir) == []
+
+
+def test_temporary_spill_directory_is_removed_on_close():
+    store = HistoryStore(spill_threshold=16)
+    store.append(b"\x01" * 100, mime_type="image/png")
+    spill_dir = store.spill_dir
+    assert os.path.isdir(spill_dir)
+    store.close()
+    assert not os.path.exists(spill_dir)
+
+
+def test_memory_stays_flat_for_huge_payloads():
+    """Appending and re-reading a 32 MB buffer allocates no copy of it."""
+    store = HistoryStore(spill_threshold=MB)
+    payload = bytearray(32 * MB)
+    payload[-1] = 1
+
+    tracemalloc.start()
+    store.append(memoryview(payload), mime_type="application/octet-stream")
+    content = store.items()[0].content
+    assert content[-1] == 1 and len(content) == len(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < MB
+
+
+def test_decode_text_honours_charset_and_rejects_binary():
+    assert decode_text(memoryview("café".encode("latin-1")), "text/plain; charset=latin-1") == "café"
+    assert decode_text(b"plain") == "plain"
+    with pytest.raises(TypeError):
+        decode_text(b"\x89PNG", "image/png")
+    with pytest.raises(ValueError):
+        decode_text(b"\xff\xfe", "text/plain")
+
+
+@pytest.mark.parametrize("mime_type", [
+    "application/json", "Application/JSON; charset=utf-8", "image/svg+xml", "application/ld+json",
+    "application/xml", "application/x-custom; charset=utf-8",
+])
+def test_textual_application_types_are_text(mime_type):
+    assert decode_text(b'{"a": 1}', mime_type) == '{"a": 1}'
+
+
+def test_charset_decides_for_unknown_types():
+    assert decode_text("é".encode("utf-16"), "application/x-custom; charset=utf-16") == "é"
+    with pytest.raises(TypeError):
+        decode_text(b"\x00", "application/octet-stream; charset=binary")
+    with pytest.raises(ValueError):
+        decode_text(b"x", "text/plain; charset=no-such-charset")
+
+
+@pytest.mark.asyncio
+async def test_json_items_reach_klipper_and_the_index():
+    service = FakeKlipper()
+    client = KlipperClient(transport=FakeKlipperTransport(service), history_path=":memory:")
+    await client.connect()
+    item = await client.history.add_item(b'{"key": "value"}', "application/json")
+
+    assert service.clipboard == '{"key": "value"}'
+    assert [i.uuid for i in await client.history.search("value")] == [item.uuid]
+    await client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_added_text_is_not_recorded_again_by_its_echo():
+    """The change signal of add_item collapses into the added entry, whatever its form."""
+    service = FakeKlipper()
+    client = KlipperClient(transport=FakeKlipperTransport(service), history_path=":memory:")
+    await client.connect()
+    before = len(client.history_store)
+
+    await client.history.add_item(b"as bytes")
+    await client.history.add_item("as html", "text/html")
+    await client.history.add_item("h\u00e9".encode("latin-1"), "text/plain; charset=latin-1")
+    await asyncio.sleep(0)
+    assert len(client.history_store) == before + 3
+
+    # Copying the text again after something else is a new entry
+    await client.set_clipboard_contents("something else")
+    await asyncio.sleep(0)
+    await client.set_clipboard_contents("as html")
+    await asyncio.sleep(0)
+    assert len(client.history_store) == before + 5
+    await client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_binary_items_keep_their_mime_type_and_stay_local():
+    service = FakeKlipper(clipboard="text")
+    client = KlipperClient(transport=FakeKlipperTransport(service))
+    await client.connect()
+
+    item = await client.history.add_item(memoryview(b"\x89PNG\r\n"), mime_type="image/png")
+    assert item.mime_type == "image/png"
+    assert service.clipboard == "text"
+    assert "setClipboardContents" not in service.calls
+    assert await client.history.search("png") == []
+
+    await client.history.add_item("héllo".encode("latin-1"), mime_type="text/plain; charset=latin-1")
+    assert service.clipboard == "héllo"
+
+    with pytest.raises(TypeError):
+        await client.clipboard.set_content(b"\x89PNG", mime_type="image/png")
+    await client.shutdown()
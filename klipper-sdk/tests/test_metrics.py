@@ -0,0 +1,96 @@
+"""
+Tests for the hot-path metrics registry and its instrumentation.
+"""
+
+import json
+
+import pytest
+from klipper_sdk.bridge import NeuronalCluster, PrismProtocol
+from klipper_sdk.metrics import REGISTRY, MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    enabled = REGISTRY.enabled
+    REGISTRY.reset()
+    REGISTRY.enable()
+    yield REGISTRY
+    REGISTRY.reset()
+    REGISTRY.enabled = enabled
+
+
+class Listener:
+    def on_pulse(self, pulse):
+        pass
+
+
+class BrokenListener:
+    def on_pulse(self, pulse):
+        raise RuntimeError("misfire")
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry(enabled=True)
+    latency = registry.histogram("latency_seconds", label="op", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 2.0):
+        latency.observe("read", value)
+
+    snapshot = registry.snapshot()["histograms"]["latency_seconds"]["read"]
+    assert snapshot["count"] == 4
+    assert snapshot["sum"] == pytest.approx(3.05)
+    assert snapshot["buckets"] == {"0.1": 1, "1.0": 3, "+Inf": 4}
+
+
+def test_exports():
+    registry = MetricsRegistry(enabled=True)
+    registry.counter("calls_total", "Calls", label="method").inc('get"Contents')
+    registry.histogram("latency_seconds", label="op", buckets=(1.0,)).observe("read", 0.5)
+
+    text = registry.to_prometheus()
+    assert "# HELP calls_total Calls" in text
+    assert 'calls_total{method="get\\"Contents"} 1' in text
+    assert 'latency_seconds_bucket{op="read",le="1.0"} 1' in text
+    assert 'latency_seconds_count{op="read"} 1' in text
+    assert json.loads(registry.to_json())["counters"]["calls_total"] == {'get"Contents': 1}
+
+
+def test_disabled_registry_records_nothing():
+    REGISTRY.reset()
+    enabled = REGISTRY.enabled
+    REGISTRY.disable()
+    try:
+        prism = PrismProtocol()
+        prism.integrate(prism.ingest("text"))
+        counters = REGISTRY.snapshot()["counters"]
+        assert counters["klipper_prism_refractions_total"] == {}
+        assert counters["klipper_prism_integrations_total"] == {}
+    finally:
+        REGISTRY.enabled = enabled
+
+
+def test_prism_instrumentation(registry):
+    prism = PrismProtocol()
+    prism.integrate(prism.ingest("coherent"))
+    prism.integrate(prism.ingest(ValueError("boom")))
+    prism.integrate_many(prism.ingest_many(["a", "an error", None]))
+
+    snapshot = registry.snapshot()
+    counters = snapshot["counters"]
+    assert counters["klipper_prism_refractions_total"] == {"str": 3, "ValueError": 1, "NoneType": 1}
+    assert counters["klipper_prism_entropy_total"] == {
+        "Exception:ValueError": 1, "StringError": 1, "EmptySignal": 1,
+    }
+    assert counters["klipper_prism_integrations_total"] == {"integrated": 5}
+    assert snapshot["histograms"]["klipper_prism_ingest_seconds"]["str"]["count"] == 1
+
+
+def test_cluster_instrumentation(registry):
+    cluster = NeuronalCluster(node_id="test")
+    cluster.subscribe(Listener())
+    cluster.subscribe(BrokenListener())
+    cluster.emit("x")
+    cluster.emit("y")
+
+    snapshot = registry.snapshot()
+    assert snapshot["histograms"]["klipper_cluster_delivery_seconds"]["Listener"]["count"] == 2
+    assert snapshot["counters"]["klipper_cluster_listener_errors_total"] == {"BrokenListener": 2}
@@ -0,0 +1,142 @@
+"""
+Tests for offloading pulse listeners to a process pool.
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+from klipper_sdk.bridge import NeuronalCluster
+from klipper_sdk.offload import OffloadPool
+
+
+class WordCounter:
+    """Counts words in a worker; the parent copy collects the results."""
+
+    def __init__(self):
+        self.results = []
+        self.errors = []
+
+    def __getstate__(self):
+        return {"results": [], "errors": []}
+
+    def on_pulse(self, pulse):
+        if pulse.payload == "boom":
+            raise ValueError("cannot count")
+        return len(pulse.payload.split()), os.getpid()
+
+    def on_result(self, pulse, result):
+        self.results.append((pulse.payload, result))
+
+    def on_error(self, pulse, error):
+        self.errors.append((pulse.payload, error))
+
+
+class Sleeper(WordCounter):
+    def on_pulse(self, pulse):
+        time.sleep(0.05)
+        return pulse.payload
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = OffloadPool(max_workers=2)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_offloaded_listener_runs_in_worker(pool):
+    cluster = NeuronalCluster(node_id="test")
+    listener = WordCounter()
+    cluster.subscribe(listener, vectors=["clip"], offload=pool)
+
+    cluster.emit("one two three", vector="clip")
+    await cluster.emit_async("four", vector="clip")
+    cluster.emit("ignored", vector="other")
+    await asyncio.wait_for(cluster.drain(), 30)
+
+    results = dict((payload, result) for payload, result in listener.results)
+    assert results.keys() == {"one two three", "four"}
+    assert results["one two three"][0] == 3
+    assert all(pid != os.getpid() for _, pid in results.values())
+    assert pool.stats.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_offloaded_errors_come_back(pool):
+    cluster = NeuronalCluster(node_id="test")
+    listener = WordCounter()
+    cluster.subscribe(listener, offload=pool)
+    failed = pool.stats.failed
+
+    cluster.emit("boom")
+    cluster.emit("fine")
+    await asyncio.wait_for(cluster.drain(), 30)
+
+    assert [payload for payload, _ in listener.results] == ["fine"]
+    assert [(p, type(e)) for p, e in listener.errors] == [("boom", ValueError)]
+    assert pool.stats.failed == failed + 1
+
+
+@pytest.mark.asyncio
+async def test_pool_is_bounded_and_drops_oldest_queued():
+    pool = OffloadPool(max_workers=1, max_pending=1, max_queue=2)
+    try:
+        cluster = NeuronalCluster(node_id="test")
+        listener = Sleeper()
+        cluster.subscribe(listener, offload=pool)
+
+        for i in range(5):
+            cluster.emit(i)
+        stats = pool.stats
+        assert stats.in_flight == 1 and stats.queued == 2 and stats.dropped == 2
+
+        await asyncio.wait_for(cluster.drain(), 30)
+        assert [result for _, result in listener.results] == [0, 3, 4]
+        assert pool.stats.completed == 3
+    finally:
+        pool.shutdown()
+
+
+def test_offloaded_listener_must_be_picklable(pool):
+    class Local:
+        def on_pulse(self, pulse):
+            pass
+
+    cluster = NeuronalCluster(node_id="test")
+    with pytest.raises(TypeError):
+        cluster.subscribe(Local(), offload=pool)
+    with pytest.raises(ValueError):
+        cluster.subscribe(WordCounter(), mailbox=True, offload=pool)
+    assert cluster.listeners == []
+
+
+@pytest.mark.asyncio
+async def test_listener_is_not_sent_with_every_pulse(pool, monkeypatch):
+    """Each pulse carries the subscription id and listener file, not the pickled listener."""
+    sent = []
+    submit = pool.executor.submit
+
+    def spy(fn, *args):
+        sent.append(args)
+        return submit(fn, *args)
+
+    monkeypatch.setattr(pool.executor, "submit", spy)
+    cluster = NeuronalCluster(node_id="test")
+    listener = WordCounter()
+    cluster.subscribe(listener, offload=pool)
+    for word in ("a", "b c", "d e f"):
+        cluster.emit(word)
+    await asyncio.wait_for(cluster.drain(), 30)
+
+    assert sorted(result[0] for _, result in listener.results) == [1, 2, 3]
+    assert all(not isinstance(arg, bytes) for args in sent for arg in args)
+    keys, paths = {args[0] for args in sent}, {args[1] for args in sent}
+    assert len(keys) == 1 and len(paths) == 1
+    path = paths.pop()
+    assert os.path.exists(path)
+
+    cluster.close()
+    assert not os.path.exists(path)
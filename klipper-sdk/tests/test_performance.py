@@ -0,0 +1,131 @@
+"""
+Wall-clock checks, skipped unless pytest runs with ``--run-perf``.
+
+They compare timings against fixed limits or against each other, so they
+only mean something on a quiet machine; the behaviour behind each of them
+is covered by a deterministic test elsewhere. benchmarks/bench.py tracks the
+same hot paths against a recorded baseline.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+from conftest import Recorder
+from klipper_sdk.bridge import NeuronalCluster, PrismProtocol
+from klipper_sdk.client import KlipperClient
+from klipper_sdk.controllers import HistoryItem
+from klipper_sdk.index import HistoryIndex
+from klipper_sdk.resilience import Backoff, CircuitBreaker, CircuitOpenError
+from klipper_sdk.testing import INJECTED_ERROR, FakeKlipper, FakeKlipperTransport
+from klipper_sdk.transport import DBusError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+import startup  # noqa: E402
+
+pytestmark = pytest.mark.perf
+
+
+class SlowListener:
+    def __init__(self, delay):
+        self.delay = delay
+
+    async def on_pulse(self, pulse):
+        await asyncio.sleep(self.delay)
+
+
+@pytest.mark.parametrize("stage", list(startup.STAGES))
+def test_startup_within_budget(stage):
+    result = startup.measure(stage, repeat=3)
+    assert not result.over_budget, f"{stage} took {result.milliseconds:.1f} ms (budget {result.budget:.0f} ms)"
+
+
+@pytest.mark.asyncio
+async def test_emit_async_takes_as_long_as_the_slowest_listener():
+    cluster = NeuronalCluster(node_id="test")
+    for _ in range(30):
+        cluster.subscribe(SlowListener(0.05))
+
+    start = time.perf_counter()
+    await cluster.emit_async("payload")
+    assert time.perf_counter() - start < 0.5
+
+
+def test_emit_cost_tracks_matching_listeners():
+    """Hundreds of uninterested subscribers barely affect a targeted emit."""
+    cluster = NeuronalCluster(node_id="test")
+    for i in range(2000):
+        cluster.subscribe(Recorder(), vectors=[f"topic_{i}"])
+    cluster.subscribe(Recorder(), vectors=["clipboard_change"])
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        cluster.emit("x", vector="clipboard_change")
+    # Scanning 2000 subscribers per emit would take far longer than this
+    assert time.perf_counter() - start < 0.05
+
+
+def test_search_scales_to_large_histories():
+    """Selective queries stay fast over tens of thousands of entries."""
+    index = HistoryIndex()
+    index.extend(HistoryItem(content=f"entry number {i} token{i % 1000}") for i in range(20000))
+
+    start = time.perf_counter()
+    for _ in range(100):
+        index.search("token42 ", limit=20)
+    assert (time.perf_counter() - start) / 100 < 0.005
+
+
+def test_batch_replay_scales_linearly():
+    """Replaying a large history costs no more per item than a small one."""
+    prism = PrismProtocol()
+    small = [f"clip {i}" for i in range(1000)]
+    large = small * 50
+
+    start = time.perf_counter()
+    prism.integrate_many(prism.ingest_many(small))
+    per_item_small = (time.perf_counter() - start) / len(small)
+
+    start = time.perf_counter()
+    prism.integrate_many(prism.ingest_many(large))
+    per_item_large = (time.perf_counter() - start) / len(large)
+
+    assert per_item_large < per_item_small * 3
+
+
+def test_classification_cost_stays_flat():
+    """With a scan window, a 10 MB paste classifies about as fast as 1 KB."""
+    prism = PrismProtocol(scan_window=4096)
+    small, large = "a" * 1024, "a" * (10 * 1024 * 1024)
+
+    def timed(payload):
+        start = time.perf_counter()
+        for _ in range(200):
+            prism.ingest(payload)
+        return time.perf_counter() - start
+
+    timed(small)
+    assert timed(large) < timed(small) * 5 + 0.01
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast():
+    service = FakeKlipper()
+    client = KlipperClient(transport=FakeKlipperTransport(service), history_path=":memory:",
+                           circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60,
+                                                          unavailable_dbus_errors={INJECTED_ERROR}),
+                           reconnect_backoff=Backoff(initial=60))
+    await client.connect()
+    service.failing_methods.add("getClipboardContents")
+    for _ in range(2):
+        with pytest.raises(DBusError):
+            await client.get_clipboard_contents()
+
+    start = time.perf_counter()
+    with pytest.raises(CircuitOpenError):
+        await client.get_clipboard_contents()
+    assert time.perf_counter() - start < 0.01
+    await client.shutdown()
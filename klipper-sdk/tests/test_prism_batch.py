@@ -0,0 +1,59 @@
+"""
+Tests for batch and streaming ingestion in PrismProtocol.
+"""
+
+import pytest
+from klipper_sdk.bridge import IntegrationSummary, PrismProtocol, Signal
+
+
+MIXED = ["text", 42, None, "an error here", ValueError("bad"), [], {"k": "v"}, Signal(raw_payload="wrapped"), (1,)]
+
+
+def test_ingest_many_matches_ingest():
+    """Batch results are identical to one-at-a-time results, in order."""
+    prism = PrismProtocol()
+    expected = [prism.ingest(signal) for signal in MIXED]
+
+    assert list(prism.ingest_many(MIXED, batch_size=4)) == expected
+
+
+def test_ingest_many_is_lazy():
+    """Results are produced as the input is consumed."""
+    prism = PrismProtocol()
+    consumed = []
+
+    def source():
+        for i in range(10):
+            consumed.append(i)
+            yield i
+
+    results = prism.ingest_many(source(), batch_size=3)
+    first = next(results)
+    assert first.core_truth == 0
+    assert consumed == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_ingest_stream():
+    """Async streams are classified in batches and yielded in order."""
+    prism = PrismProtocol()
+
+    async def source():
+        for signal in MIXED:
+            yield signal
+
+    results = [result async for result in prism.ingest_stream(source(), batch_size=2)]
+    assert results == [prism.ingest(signal) for signal in MIXED]
+
+
+def test_integrate_many_counts():
+    """integrate_many returns aggregate counts per outcome and entropy type."""
+    prism = PrismProtocol()
+    summary = prism.integrate_many(prism.ingest_many(MIXED))
+
+    assert isinstance(summary, IntegrationSummary)
+    assert summary.total == len(MIXED)
+    assert summary.coherent == 5
+    assert summary.entropy == {"EmptySignal": 2, "StringError": 1, "Exception:ValueError": 1}
+    assert summary.integrated == sum(prism.integrate(prism.ingest(s)) for s in MIXED)
+    assert summary.rejected == summary.total - summary.integrated
@@ -0,0 +1,105 @@
+"""
+Tests for the thread-safe PulseBridge between the signal thread and the loop.
+"""
+
+import asyncio
+import threading
+
+import pytest
+from conftest import Recorder
+from klipper_sdk.bridge import NeuronalCluster, PulseBridge
+
+
+def _cluster():
+    cluster = NeuronalCluster(node_id="test")
+    recorder = Recorder()
+    cluster.subscribe(recorder)
+    return cluster, recorder
+
+
+def _submit_from_thread(bridge, count, vector="clipboard_change"):
+    def produce():
+        for i in range(count):
+            bridge.submit(i, vector=vector)
+    thread = threading.Thread(target=produce)
+    thread.start()
+    thread.join()
+
+
+def test_without_loop_emits_inline():
+    """An unattached bridge delivers synchronously."""
+    cluster, recorder = _cluster()
+    bridge = PulseBridge(cluster)
+
+    bridge.submit("x", vector="v", intensity=0.5)
+    assert [(p.payload, p.vector, p.intensity) for p in recorder.pulses] == [("x", "v", 0.5)]
+
+
+@pytest.mark.asyncio
+async def test_thread_pulses_are_delivered_on_the_loop():
+    """Listeners run on the loop thread, not on the producer thread."""
+    cluster, recorder = _cluster()
+    bridge = PulseBridge(cluster)
+    bridge.attach(asyncio.get_running_loop())
+
+    _submit_from_thread(bridge, 5)
+    await asyncio.sleep(0.01)
+
+    assert [p.payload for p in recorder.pulses] == [0, 1, 2, 3, 4]
+    assert recorder.threads == {threading.get_ident()}
+    stats = bridge.stats
+    assert stats.delivered == 5 and stats.depth == 0
+    assert stats.max_lag >= 0
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_bounds_the_queue():
+    """While the loop is busy, only the newest maxsize pulses are kept."""
+    cluster, recorder = _cluster()
+    bridge = PulseBridge(cluster, maxsize=10, overflow="drop_oldest")
+    bridge.attach(asyncio.get_running_loop())
+
+    _submit_from_thread(bridge, 100)  # the loop cannot drain while we join
+    assert bridge.stats.depth == 10
+    await asyncio.sleep(0.01)
+
+    assert [p.payload for p in recorder.pulses] == list(range(90, 100))
+    assert bridge.stats.dropped == 90
+
+
+@pytest.mark.asyncio
+async def test_coalesce_keeps_latest_per_vector():
+    """A copy storm collapses into its latest value."""
+    cluster, recorder = _cluster()
+    bridge = PulseBridge(cluster, overflow="coalesce")
+    bridge.attach(asyncio.get_running_loop())
+
+    _submit_from_thread(bridge, 50)
+    bridge.submit("other", vector="other_vector")
+    await asyncio.sleep(0.01)
+
+    assert [p.payload for p in recorder.pulses] == [49, "other"]
+    assert bridge.stats.coalesced == 49
+
+
+@pytest.mark.asyncio
+async def test_block_applies_backpressure():
+    """A blocking producer waits for the loop to drain instead of dropping."""
+    cluster, recorder = _cluster()
+    bridge = PulseBridge(cluster, maxsize=2, overflow="block", block_timeout=5.0)
+    bridge.attach(asyncio.get_running_loop())
+
+    thread = threading.Thread(target=lambda: [bridge.submit(i) for i in range(20)])
+    thread.start()
+    while thread.is_alive():
+        await asyncio.sleep(0.001)
+    await asyncio.sleep(0.01)
+
+    assert [p.payload for p in recorder.pulses] == list(range(20))
+    assert bridge.stats.dropped == 0
+    assert bridge.stats.blocked > 0
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        PulseBridge(NeuronalCluster(node_id="x"), overflow="explode")
@@ -0,0 +1,60 @@
+"""
+Tests for the pluggable refraction rule engine.
+"""
+
+import tracemalloc
+
+from klipper_sdk.bridge import PrismProtocol
+from klipper_sdk.refraction import KeywordRule, PredicateRule, RuleEngine
+
+
+def test_keyword_rule_is_case_insensitive():
+    """Keywords match regardless of case, like the old lower() check."""
+    prism = PrismProtocol()
+    assert prism.ingest("FATAL ERROR").entropy_wrapper["type"] == "StringError"
+    assert prism.ingest("Unhandled Exception").entropy_wrapper["type"] == "StringError"
+    assert prism.ingest("all good").is_coherent
+
+
+def test_scan_window_bounds_the_search():
+    """Keywords beyond the scan window are not inspected."""
+    payload = "x" * 1000 + " error"
+    assert PrismProtocol(scan_window=100).ingest(payload).is_coherent
+    assert not PrismProtocol().ingest(payload).is_coherent
+
+
+def test_large_payloads_are_not_copied():
+    """Classifying a multi-megabyte string allocates no lowercased copy."""
+    prism = PrismProtocol(scan_window=4096)
+    payload = "A" * (8 * 1024 * 1024)
+
+    tracemalloc.start()
+    result = prism.ingest(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert result.core_truth is payload
+    assert peak < 1024 * 1024
+
+
+def test_register_custom_rule():
+    """User rules add new entropy types."""
+    prism = PrismProtocol()
+    prism.register_rule(KeywordRule("SecretLeak", ["password", "api_key"]), first=True)
+    prism.register_rule(PredicateRule("NegativeNumber", lambda n: n < 0, types=int))
+
+    assert prism.ingest("my Password is hunter2").entropy_wrapper["type"] == "SecretLeak"
+    assert prism.ingest(-5).entropy_wrapper["type"] == "NegativeNumber"
+    assert prism.ingest(5).is_coherent
+
+
+def test_type_dispatch_cache():
+    """Rules are resolved once per payload type and refreshed on registration."""
+    engine = RuleEngine()
+    assert engine.rules_for(int) == ()
+    assert [type(r).__name__ for r in engine.rules_for(str)] == ["KeywordRule", "EmptyRule"]
+    assert [type(r).__name__ for r in engine.rules_for(KeyError)] == ["ExceptionRule"]
+
+    engine.register(PredicateRule("Odd", lambda n: n % 2, types=int))
+    assert engine.classify(3) == "Odd"
+    assert engine.classify(4) is None
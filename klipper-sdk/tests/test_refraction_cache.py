@@ -0,0 +1,122 @@
+"""
+Tests for memoized Prism refraction.
+"""
+
+import json
+import time
+
+import pytest
+from klipper_sdk.bridge import PrismProtocol
+from klipper_sdk.cache import RefractionCache
+from klipper_sdk.client import KlipperClient
+from klipper_sdk.refraction import RefractionRule
+
+
+def test_repeated_payloads_are_served_from_cache():
+    prism = PrismProtocol(cache_size=8)
+    first = prism.ingest("Error: disk full")
+    again = prism.ingest("Error: " + "disk full")
+
+    assert again == first
+    assert not again.is_coherent
+    stats = prism.cache.stats
+    assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+    assert stats.hit_rate == 0.5
+
+
+def test_exceptions_are_keyed_by_type_and_message():
+    prism = PrismProtocol(cache_size=8)
+    first = prism.ingest(ConnectionError("gone"))
+    assert prism.ingest(ConnectionError("gone")) == first
+    assert prism.cache.stats.hits == 1
+    assert prism.ingest(ConnectionError("other")) != first
+    assert prism.ingest(TimeoutError("gone")).entropy_wrapper["type"] == "Exception:TimeoutError"
+
+
+def test_values_of_different_types_do_not_collide():
+    prism = PrismProtocol(cache_size=8)
+    assert prism.ingest(1).core_truth == 1
+    assert prism.ingest(True).core_truth is True
+    assert prism.ingest(b"x").core_truth == b"x"
+    assert prism.ingest("x").core_truth == "x"
+    assert prism.cache.stats.hits == 0
+
+
+def test_coherent_non_strings_are_not_cached():
+    prism = PrismProtocol(cache_size=8)
+    prism.ingest(b"payload")
+    prism.ingest(42)
+    assert len(prism.cache) == 0
+    # Incoherent values still are
+    assert not prism.ingest(None).is_coherent
+    assert len(prism.cache) == 1
+
+
+def test_mutable_and_oversized_payloads_are_not_cached():
+    cache = RefractionCache(maxsize=8, max_payload=4)
+    assert cache.key({"a": 1}) is None
+    assert cache.key(["a"]) is None
+    assert cache.key("12345") is None
+    assert cache.key("1234") == (str, "1234")
+    assert cache.stats.uncacheable == 3
+
+
+def test_least_recently_used_entry_is_evicted():
+    prism = PrismProtocol(cache_size=2)
+    a = prism.ingest("a")
+    prism.ingest("b")
+    prism.ingest("a")
+    prism.ingest("c")  # evicts "b"
+
+    assert prism.ingest("a") == a
+    assert prism.cache.stats.evictions == 1
+    misses = prism.cache.stats.misses
+    prism.ingest("b")
+    assert prism.cache.stats.misses == misses + 1
+
+
+def test_entries_expire_after_ttl():
+    prism = PrismProtocol(cache_size=8, cache_ttl=0.01)
+    prism.ingest("Error: flaky")
+    time.sleep(0.02)
+    prism.ingest("Error: flaky")
+    assert prism.cache.stats.expired == 1
+    assert prism.cache.stats.hits == 0
+
+
+def test_registering_a_rule_clears_the_cache():
+    class Secrets(RefractionRule):
+        entropy_type = "Secret"
+        types = (str,)
+
+        def matches(self, payload):
+            return "password" in payload
+
+    prism = PrismProtocol(cache_size=8)
+    assert prism.ingest("password=1").is_coherent
+    prism.register_rule(Secrets())
+    assert not prism.ingest("password=1").is_coherent
+
+
+def test_caching_is_off_by_default_and_on_in_the_client():
+    assert PrismProtocol().cache is None
+    with pytest.raises(ValueError):
+        RefractionCache(maxsize=0)
+    assert KlipperClient().prism.cache.maxsize == KlipperClient.PRISM_CACHE_SIZE
+
+
+def test_callers_may_change_cached_results():
+    """A caller changing a hit does not change what the next caller gets."""
+    prism = PrismProtocol(cache_size=8)
+    for _ in range(2):
+        hit = prism.ingest("Error: disk full")
+        assert json.loads(json.dumps(hit.entropy_wrapper))["type"] == "StringError"
+        hit.is_coherent = True
+        hit.entropy_wrapper["type"] = "Coherent"
+        hit.core_truth["message"] = "fine"
+
+    again = prism.ingest("Error: disk full")
+    assert prism.cache.stats.hits == 2
+    assert not again.is_coherent
+    assert again.entropy_wrapper["type"] == "StringError"
+    assert again.core_truth["message"] == "Error: disk full"
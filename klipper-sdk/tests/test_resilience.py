@@ -0,0 +1,163 @@
+"""
+Tests for the per-method circuit breaker and background reconnect.
+"""
+
+import asyncio
+import time
+
+import pytest
+from klipper_sdk.client import KlipperClient
+from klipper_sdk.resilience import CLOSED, HALF_OPEN, OPEN, Backoff, CircuitBreaker, CircuitOpenError
+from klipper_sdk.testing import INJECTED_ERROR, FakeKlipper, FakeKlipperTransport
+from klipper_sdk.transport import DBusError
+
+UNAVAILABLE = "Exception:ConnectionError"
+
+
+def test_circuit_opens_after_consecutive_unavailability():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    for _ in range(2):
+        breaker.before_call("get")
+        assert not breaker.record_failure("get", UNAVAILABLE)
+    breaker.before_call("get")
+    assert breaker.record_failure("get", UNAVAILABLE)
+    assert breaker.state("get") == OPEN
+
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.before_call("get")
+    assert error.value.method == "get" and error.value.retry_in > 59
+    # Circuits are per method
+    breaker.before_call("set")
+    assert breaker.stats.rejected == 1 and breaker.stats.opened == 1
+
+
+def test_other_failures_do_not_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure("get", UNAVAILABLE)
+    # An error reply proves Klipper is reachable and restarts the count
+    breaker.record_failure("get", "Exception:DBusError", DBusError(INJECTED_ERROR))
+    breaker.record_failure("get", UNAVAILABLE)
+    assert breaker.state("get") == CLOSED
+
+    breaker.record_failure("get", "Exception:DBusError", DBusError("org.freedesktop.DBus.Error.ServiceUnknown"))
+    assert breaker.state("get") == OPEN
+
+
+def test_half_open_admits_one_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure("get", UNAVAILABLE)
+    time.sleep(0.02)
+
+    breaker.before_call("get")
+    assert breaker.state("get") == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("get")
+
+    # A failed probe re-opens, a successful one closes
+    assert breaker.record_failure("get", UNAVAILABLE)
+    time.sleep(0.02)
+    breaker.before_call("get")
+    breaker.record_success("get")
+    assert breaker.state("get") == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_frees_the_half_open_circuit():
+    service = FakeKlipper()
+    client = KlipperClient(transport=FakeKlipperTransport(service),
+                           circuit_breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.01,
+                                                          unavailable_dbus_errors={INJECTED_ERROR}),
+                           reconnect_backoff=Backoff(initial=60))
+    await client.connect()
+    service.failing_methods.add("getClipboardContents")
+    with pytest.raises(DBusError):
+        await client.get_clipboard_contents()
+    service.failing_methods.clear()
+    await asyncio.sleep(0.02)
+
+    service.latency = 60
+    probe = asyncio.ensure_future(client.get_clipboard_contents())
+    await asyncio.sleep(0.01)
+    assert client.circuit_breaker.state("getClipboardContents") == HALF_OPEN
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    service.latency = 0
+    assert await client.get_clipboard_contents() == service.clipboard
+    assert client.circuit_breaker.state("getClipboardContents") == CLOSED
+    await client.shutdown()
+
+
+def test_backoff_is_jittered_and_capped():
+    backoff = Backoff(initial=0.1, maximum=1.0)
+    for attempt in range(100):
+        assert 0 <= backoff.delay(attempt) <= min(1.0, 0.1 * 2 ** attempt)
+    assert len({backoff.delay(10) for _ in range(10)}) > 1
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_without_calling():
+    service = FakeKlipper()
+    client = KlipperClient(transport=FakeKlipperTransport(service),
+                           circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60,
+                                                          unavailable_dbus_errors={INJECTED_ERROR}),
+                           reconnect_backoff=Backoff(initial=60))
+    await client.connect()
+    service.failing_methods.add("getClipboardContents")
+    for _ in range(2):
+        with pytest.raises(DBusError):
+            await client.get_clipboard_contents()
+    calls = service.calls["getClipboardContents"]
+
+    with pytest.raises(CircuitOpenError):
+        await client.get_clipboard_contents()
+    assert service.calls["getClipboardContents"] == calls
+    await client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_reconnects_once_klipper_is_back(bus):
+    """Traffic fails fast while the bus is gone and resumes, signals included, once it returns."""
+    client = KlipperClient(circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+                           reconnect_backoff=Backoff(initial=0.01, maximum=0.05))
+    await client.connect()
+    path = bus.path
+    await bus.close()
+    await asyncio.sleep(0.01)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await client.get_clipboard_contents()
+    with pytest.raises(CircuitOpenError):
+        await client.get_clipboard_contents()
+
+    await bus.start(path)
+    for _ in range(100):
+        if client.circuit_breaker.state("getClipboardContents") == CLOSED:
+            break
+        await asyncio.sleep(0.01)
+    assert await client.get_clipboard_contents() == "initial"
+
+    bus.service.copy("after restart")
+    await asyncio.sleep(0.05)
+    assert (await client.get_history())[0] == "after restart"
+    await client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_signal_only_consumer_reconnects(bus):
+    """A lost connection is re-established without any call noticing it."""
+    client = KlipperClient(reconnect_backoff=Backoff(initial=0.01, maximum=0.05))
+    await client.connect()
+    path = bus.path
+    await bus.close()
+    await asyncio.sleep(0.02)
+    assert client._reconnect_task is not None and not client._reconnect_task.done()
+
+    await bus.start(path)
+    await asyncio.wait_for(client._reconnect_task, 5)
+    bus.service.copy("heard again")
+    await asyncio.sleep(0.05)
+    assert (await client.get_history())[0] == "heard again"
+    await client.shutdown()
@@ -0,0 +1,46 @@
+"""
+Startup cost: importing the SDK and constructing a client must stay cheap
+for short-lived processes. See benchmarks/startup.py.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+import startup  # noqa: E402
+from klipper_sdk.client import KlipperClient  # noqa: E402
+from klipper_sdk.store import HistoryStore  # noqa: E402
+from klipper_sdk.testing import FakeKlipper, FakeKlipperTransport  # noqa: E402
+
+
+@pytest.mark.parametrize("stage", list(startup.STAGES))
+def test_startup_loads_no_heavy_modules(stage):
+    """The import-time half of the budget; the timing half is in test_performance.py."""
+    result = startup.measure(stage, repeat=1)
+    assert result.forbidden_modules == []
+    assert not result.over_module_budget, f"{stage} loaded {len(result.modules)} modules (budget {result.module_budget})"
+
+
+def test_components_are_built_on_first_use():
+    client = KlipperClient(transport=FakeKlipperTransport(FakeKlipper()))
+    assert client._prism is None and client._history_store is None and client._history is None
+
+    assert client.history is client.history
+    assert client.history_store is client.history_store
+    # The pulse bridge feeds the cluster it builds on demand
+    assert client.pulse_bridge.cluster is client.cluster
+    assert client._prism is None
+
+
+def test_shutdown_leaves_unused_components_unbuilt():
+    client = KlipperClient(transport=FakeKlipperTransport(FakeKlipper()))
+    asyncio.run(client.shutdown())
+    assert client._cluster is None and client._pulse_bridge is None
+
+
+def test_spill_threshold_default_matches_store():
+    assert KlipperClient.HISTORY_SPILL_THRESHOLD == HistoryStore.SPILL_THRESHOLD
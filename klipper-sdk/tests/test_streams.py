@@ -0,0 +1,112 @@
+"""
+Tests for async pulse streams and their operators.
+"""
+
+import asyncio
+
+import pytest
+from klipper_sdk.bridge import NeuronalCluster
+
+
+async def collect(stream, count, timeout=1.0):
+    values = []
+
+    async def run():
+        async for value in stream:
+            values.append(value)
+            if len(values) == count:
+                return
+
+    await asyncio.wait_for(run(), timeout)
+    return values
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_matching_pulses():
+    cluster = NeuronalCluster(node_id="test")
+    stream = cluster.stream("clipboard_change")
+    cluster.emit("a", vector="clipboard_change")
+    cluster.emit("ignored", vector="other")
+    cluster.emit("b", vector="clipboard_change")
+
+    pulses = await collect(stream, 2)
+    assert [p.payload for p in pulses] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_filter_map_distinct_run_on_emit():
+    cluster = NeuronalCluster(node_id="test")
+    stream = (cluster.stream("clip")
+              .map(lambda p: p.payload)
+              .filter(lambda text: not text.startswith("#"))
+              .distinct_until_changed(key=str.lower))
+    for text in ["a", "A", "#secret", "a", "b", "b", "c"]:
+        cluster.emit(text, vector="clip")
+    # Only surviving values are queued for the consumer
+    assert list(stream._sink.queue) == ["a", "b", "c"]
+    assert await collect(stream, 3) == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_debounce_collapses_a_burst():
+    cluster = NeuronalCluster(node_id="test")
+    stream = cluster.stream("clip").map(lambda p: p.payload).debounce(0.05)
+    for i in range(100):
+        cluster.emit(i, vector="clip")
+        if i % 10 == 0:
+            await asyncio.sleep(0.001)
+    assert await collect(stream, 1) == [99]
+    await asyncio.sleep(0.08)
+    assert not stream._sink.queue
+
+
+@pytest.mark.asyncio
+async def test_throttle_emits_leading_and_trailing():
+    cluster = NeuronalCluster(node_id="test")
+    stream = cluster.stream("clip").map(lambda p: p.payload).throttle(0.05)
+    for i in range(5):
+        cluster.emit(i, vector="clip")
+    assert await collect(stream, 2) == [0, 4]
+
+    leading_only = cluster.stream("clip").map(lambda p: p.payload).throttle(0.05, trailing=False)
+    for i in range(5):
+        cluster.emit(i, vector="clip")
+    await asyncio.sleep(0.08)
+    assert list(leading_only._sink.queue) == [0]
+
+
+@pytest.mark.asyncio
+async def test_batch_by_size_and_timeout():
+    cluster = NeuronalCluster(node_id="test")
+    stream = cluster.stream("clip").map(lambda p: p.payload).batch(3, timeout=0.05)
+    for i in range(7):
+        cluster.emit(i, vector="clip")
+    assert await collect(stream, 3) == [[0, 1, 2], [3, 4, 5], [6]]
+
+    with pytest.raises(ValueError):
+        cluster.stream().batch(0)
+
+
+@pytest.mark.asyncio
+async def test_close_ends_iteration_and_unsubscribes():
+    cluster = NeuronalCluster(node_id="test")
+    stream = cluster.stream("clip").debounce(10)
+    consumer = asyncio.ensure_future(collect(stream, 1))
+    cluster.emit("pending", vector="clip")
+    await asyncio.sleep(0)
+
+    cluster.close()
+    assert await consumer == []
+    assert stream.closed and stream not in cluster.listeners
+    with pytest.raises(RuntimeError):
+        stream.map(str)
+
+
+@pytest.mark.asyncio
+async def test_bounded_stream_drops_oldest():
+    cluster = NeuronalCluster(node_id="test")
+    async with cluster.stream("clip", maxsize=2) as stream:
+        for i in range(5):
+            cluster.emit(i, vector="clip")
+        assert stream.dropped == 3
+        assert [p.payload for p in await collect(stream, 2)] == [3, 4]
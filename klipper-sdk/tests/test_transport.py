@@ -0,0 +1,157 @@
+"""
+Tests for the D-Bus wire protocol and the pure-asyncio transport.
+"""
+
+import asyncio
+import struct
+import threading
+
+import pytest
+from klipper_sdk.client import KlipperClient
+from klipper_sdk.dbus_wire import (
+    ERROR, METHOD_CALL, METHOD_RETURN, SIGNAL,
+    Message, Variant, message_length, signature_of, split_signature,
+)
+from klipper_sdk.transport import AsyncioTransport, DBusError, GLibTransport, create_transport
+
+
+def test_split_and_infer_signatures():
+    """Complete types are split correctly and inferred from Python values."""
+    assert split_signature("sa{sv}(ix)ay") == ["s", "a{sv}", "(ix)", "ay"]
+    assert signature_of("x") == "s"
+    assert signature_of(["a", "b"]) == "as"
+    assert signature_of({"k": 1}) == "a{si}"
+    assert signature_of(b"raw") == "ay"
+    assert signature_of((1, True, 2.5)) == "(ibd)"
+
+
+def test_message_roundtrip():
+    """A marshalled message unmarshals to the same fields and body."""
+    message = Message(
+        type=METHOD_CALL, serial=7, destination="org.kde.klipper", path="/klipper",
+        interface="org.kde.klipper.klipper", member="setClipboardContents",
+        signature="sa{sv}(ix)ayvb",
+        body=("héllo", {"k": Variant("s", "v")}, (-3, 2**40), b"\x00\x01", Variant("u", 5), True),
+    )
+    data = message.marshal()
+
+    assert message_length(data[:16]) == len(data)
+    decoded = Message.unmarshal(data)
+    assert decoded.member == "setClipboardContents"
+    assert decoded.serial == 7
+    assert decoded.body == ("héllo", {"k": "v"}, (-3, 2**40), b"\x00\x01", 5, True)
+
+
+def test_create_transport():
+    """Backends are selectable by name or passed through as instances."""
+    assert isinstance(create_transport("glib", "a.b", "/a", "a.b"), GLibTransport)
+    transport = AsyncioTransport("a.b", "/a", "a.b")
+    assert create_transport(transport, "x", "/x", "x") is transport
+    with pytest.raises(ValueError):
+        create_transport("carrier-pigeon", "a.b", "/a", "a.b")
+
+
+def test_client_init_does_not_capture_a_loop():
+    """Constructing a client outside a running loop is fine."""
+    client = KlipperClient(transport="asyncio")
+    assert client.transport.name == "asyncio"
+
+
+class FakeBus:
+    """A tiny session bus that serves a Klipper object on a unix socket."""
+
+    def __init__(self):
+        self.clipboard = "initial"
+        self.calls = []
+        self._serial = 1000
+
+    async def handle(self, reader, writer):
+        await reader.readexactly(1)
+        assert (await reader.readline()).startswith(b"AUTH EXTERNAL ")
+        writer.write(b"OK 0123456789abcdef\r\n")
+        assert await reader.readline() == b"BEGIN\r\n"
+        try:
+            while True:
+                prefix = await reader.readexactly(16)
+                rest = await reader.readexactly(message_length(prefix) - 16)
+                self._dispatch(Message.unmarshal(prefix + rest), writer)
+        except asyncio.IncompleteReadError:
+            writer.close()
+
+    def _send(self, writer, **fields):
+        self._serial += 1
+        writer.write(Message(serial=self._serial, sender="org.kde.klipper", **fields).marshal())
+
+    def _dispatch(self, call, writer):
+        self.calls.append(call.member)
+        if call.member == "Hello":
+            self._send(writer, type=METHOD_RETURN, reply_serial=call.serial, signature="s", body=(":1.42",))
+        elif call.member == "AddMatch":
+            self._send(writer, type=METHOD_RETURN, reply_serial=call.serial)
+        elif call.member == "getClipboardContents":
+            self._send(writer, type=METHOD_RETURN, reply_serial=call.serial, signature="s", body=(self.clipboard,))
+        elif call.member == "sendGarbage":
+            # A header field of an unknown type
+            writer.write(b"l\x02\x00\x01" + struct.pack("<III", 0, 1, 8) + b"\x01\x01Z\x00\x00\x00\x00\x00")
+        elif call.member == "setClipboardContents":
+            self.clipboard = call.body[0]
+            self._send(writer, type=METHOD_RETURN, reply_serial=call.serial)
+            self._send(writer, type=SIGNAL, path="/klipper", interface="org.kde.klipper.klipper",
+                       member="clipboardContentChanged", signature="s", body=(self.clipboard,))
+        else:
+            self._send(writer, type=ERROR, reply_serial=call.serial,
+                       error_name="org.freedesktop.DBus.Error.UnknownMethod", signature="s",
+                       body=(f"No such method {call.member}",))
+
+
+@pytest.mark.asyncio
+async def test_asyncio_transport_against_fake_bus(tmp_path):
+    """Calls and signals round-trip over the socket without helper threads."""
+    bus = FakeBus()
+    path = str(tmp_path / "bus")
+    server = await asyncio.start_unix_server(bus.handle, path=path)
+    threads_before = threading.active_count()
+
+    transport = AsyncioTransport(KlipperClient.BUS_NAME, KlipperClient.OBJECT_PATH,
+                                 KlipperClient.INTERFACE, address=f"unix:path={path}")
+    client = KlipperClient(transport=transport)
+    await client.connect()
+
+    assert transport.unique_name == ":1.42"
+    assert bus.calls[:2] == ["Hello", "AddMatch"]
+    assert await client.get_history() == ["initial"]
+
+    await client.set_clipboard_contents("from sdk")
+    assert await client.get_clipboard_contents() == "from sdk"
+    await asyncio.sleep(0)
+    assert await client.get_history() == ["from sdk", "initial"]
+
+    with pytest.raises(DBusError):
+        await client._call_dbus_method("noSuchMethod")
+
+    assert threading.active_count() == threads_before
+    await client.shutdown()
+    server.close()
+    await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_unparseable_message_fails_pending_calls_and_reports_the_loss(tmp_path):
+    bus = FakeBus()
+    path = str(tmp_path / "bus")
+    server = await asyncio.start_unix_server(bus.handle, path=path)
+    transport = AsyncioTransport(KlipperClient.BUS_NAME, KlipperClient.OBJECT_PATH,
+                                 KlipperClient.INTERFACE, address=f"unix:path={path}")
+    lost = []
+    transport.on_disconnect(lost.append)
+    await transport.connect()
+
+    with pytest.raises(ConnectionError):
+        await transport.call("sendGarbage")
+    assert len(lost) == 1 and isinstance(lost[0], ConnectionError)
+    with pytest.raises(ConnectionError):
+        await transport.call("getClipboardContents")
+
+    await transport.close()
+    server.close()
+    await server.wait_closed()